@@ -0,0 +1,231 @@
+"""
+Distances entre tous les couples de sommets (matrices λ et prédécesseurs)
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .engine import arc_sources, index_graph, dantzig_tree, typecode
+    from .bellman_ford import search_negative
+    from .dag import longest_path_index, reachable_cycle
+except ImportError:
+    from engine import arc_sources, index_graph, dantzig_tree, typecode
+    from bellman_ford import search_negative
+    from dag import longest_path_index, reachable_cycle
+
+METHODS = ('auto', 'numpy', 'heap')
+
+# Au-delà, la matrice V×V de Floyd-Warshall (float64) ne tient plus raisonnablement en mémoire
+NUMPY_MAX_NODES = 4000
+# Jusque-là, Floyd-Warshall quelle que soit la densité : les deux méthodes sont immédiates
+NUMPY_SMALL_NODES = 300
+# Floyd-Warshall (V³ vectorisé) bat V passes du moteur indexé (V·A log V) tant que A ≥ V² / NUMPY_DENSITY
+NUMPY_DENSITY = 200
+
+# Éléments par bloc de lignes relaxé à la fois (float64 : 4 Mo de temporaire)
+BLOCK_ELEMENTS = 1 << 19
+
+
+def choose_method(graph, mode='min', method='auto'):
+    """
+    Choisit la méthode de calcul
+
+    'numpy' (Floyd-Warshall vectorisé) ne sert qu'aux plus courts chemins à
+    poids positifs. 'heap' calcule source par source : marquage de Dantzig,
+    ou Bellman-Ford en mode min si un arc est négatif (comme init_dantzig_min) ;
+    l'appelant vérifie alors l'absence de circuit négatif (check_negative_cycles)
+    avant de diffuser les lignes. En mode max, chaque source sans circuit
+    atteignable est traitée par l'ordre topologique (exact), les autres par le
+    marquage glouton (voir greedy_sources).
+
+    'auto' retient Floyd-Warshall pour les petits graphes et, jusqu'à
+    NUMPY_MAX_NODES sommets, pour les graphes assez denses (A ≥ V² / NUMPY_DENSITY).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue: {method}")
+    numpy_ok = (
+        np is not None
+        and mode == 'min'
+        and not index_graph(graph)['negative']
+    )
+    if method == 'numpy':
+        if not numpy_ok:
+            raise ValueError("Méthode numpy indisponible pour ce graphe")
+        return 'numpy'
+    if method == 'auto' and numpy_ok:
+        index = index_graph(graph)
+        n, arcs = len(index['nodes']), len(index['targets'])
+        if n <= NUMPY_SMALL_NODES or (n <= NUMPY_MAX_NODES and arcs * NUMPY_DENSITY >= n * n):
+            return 'numpy'
+    return 'heap'
+
+
+def greedy_sources(graph, mode='min'):
+    """
+    Sources dont la ligne max vient du marquage glouton, faute d'ordre topologique
+
+    Returns:
+        list: Sources depuis lesquelles un circuit est atteignable (toujours vide en min)
+    """
+    if mode != 'max':
+        return []
+    return [node for node in index_graph(graph)['nodes'] if reachable_cycle(graph, node) is not None]
+
+
+def floyd_warshall(graph):
+    """
+    Plus courts chemins entre tous les couples, relaxation min-plus vectorisée
+
+    Chaque passe k relaxe la matrice par blocs de lignes, en place : le
+    temporaire reste borné par BLOCK_ELEMENTS au lieu d'une matrice V×V par k.
+
+    Returns:
+        tuple: (nodes, dist, pred) avec dist (inf si inaccessible ; int64 si les
+               coûts sont entiers et tous les couples accessibles, float64 sinon)
+               et pred (int32, -1 si aucun prédécesseur) de taille V×V
+    """
+    index = index_graph(graph)
+    nodes = index['nodes']
+    n = len(nodes)
+
+    dist = np.full((n, n), np.inf)
+    pred = np.full((n, n), -1, dtype=np.int32)
+    if len(index['targets']):
+        us = np.array(arc_sources(index), dtype=np.int64)
+        vs = np.array(index['targets'], dtype=np.int64)
+        ws = np.array(index['costs'], dtype=np.float64)
+        np.minimum.at(dist, (us, vs), ws)
+        hit = dist[us, vs] == ws
+        pred[us[hit], vs[hit]] = us[hit]
+    np.fill_diagonal(dist, 0)
+    np.fill_diagonal(pred, -1)
+
+    rows = max(1, BLOCK_ELEMENTS // max(n, 1))
+    for k in range(n):
+        dist_k, pred_k = dist[k].copy(), pred[k].copy()
+        for lo in range(0, n, rows):
+            block = dist[lo:lo + rows]
+            through_k = block[:, k, None] + dist_k
+            better = through_k < block
+            np.copyto(block, through_k, where=better)
+            np.copyto(pred[lo:lo + rows], pred_k, where=better)
+
+    if typecode(index['costs']) == 'q' and np.isfinite(dist).all():
+        dist = dist.astype(np.int64)
+    return nodes, dist, pred
+
+
+def _matrix_row(row, integral):
+    """Ligne de la matrice en liste, entiers comme le moteur indexé si les coûts le sont"""
+    values = row.tolist()
+    if integral and row.dtype.kind == 'f':
+        return [int(value) if value != float('inf') else value for value in values]
+    return values
+
+
+def iter_all_pairs(graph, mode='min', method='auto'):
+    """
+    Produit les lignes de la matrice source par source
+
+    Avec le moteur indexé chaque ligne est calculée à la demande, ce qui permet
+    de diffuser le résultat sans garder la matrice complète en mémoire.
+
+    Yields:
+        tuple: (source, distances, predecessors) alignés sur index_graph(graph)['nodes'],
+               predecessors contenant des positions entières (-1 si aucun)
+    """
+    method = choose_method(graph, mode, method)
+    if method == 'numpy':
+        nodes, dist, pred = floyd_warshall(graph)
+        integral = typecode(index_graph(graph)['costs']) == 'q'
+        for i, source in enumerate(nodes):
+            yield source, _matrix_row(dist[i], integral), pred[i].tolist()
+        return
+
+    index = index_graph(graph)
+    nodes = index['nodes']
+    for s, source in enumerate(nodes):
+        if mode == 'min' and index['negative']:
+            lam, pred, _ = search_negative(index, s)
+        elif mode == 'max' and reachable_cycle(graph, source) is None:
+            lam, pred, _ = longest_path_index(index, s)
+        else:
+            _, lam, pred, _ = dantzig_tree(graph, source, mode)
+        yield source, lam, pred
+
+
+def all_pairs(graph, mode='min', method='auto'):
+    """
+    Matrices complètes des distances et des prédécesseurs
+
+    Returns:
+        tuple: (nodes, distances, predecessors) en listes de lignes
+    """
+    nodes = index_graph(graph)['nodes']
+    distances, predecessors = [], []
+    for _, row, pred in iter_all_pairs(graph, mode, method):
+        distances.append(row)
+        predecessors.append(pred)
+    return nodes, distances, predecessors
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "∞"
+    if value == float('-inf'):
+        return "-∞"
+    return value
+
+
+def format_row(nodes, row, pred):
+    """Ligne lisible : λ avec ∞/-∞ et prédécesseurs par identifiant"""
+    return {
+        'lambda': [_format_value(value) for value in row],
+        'predecessors': [nodes[p] if p >= 0 else None for p in pred],
+    }
+
+
+def encode_ndjson(graph, mode='min', method='auto'):
+    """
+    Flux NDJSON : une ligne d'en-tête {"nodes": [...], "greedy_sources": [...]} puis une ligne par source
+    """
+    nodes = index_graph(graph)['nodes']
+    header = {'mode': mode, 'nodes': nodes, 'greedy_sources': greedy_sources(graph, mode)}
+    yield json.dumps(header, ensure_ascii=False) + '\n'
+    for source, row, pred in iter_all_pairs(graph, mode, method):
+        line = {'source': source, **format_row(nodes, row, pred)}
+        yield json.dumps(line, ensure_ascii=False) + '\n'
+
+
+def encode_binary(graph, mode='min', method='auto'):
+    """
+    Flux binaire compact (petit-boutiste)
+
+    uint32 longueur de l'en-tête, en-tête JSON UTF-8 {"nodes", "mode", "greedy_sources", ...},
+    puis pour chaque source dans l'ordre de "nodes" : V float64 (distances)
+    suivis de V int32 (positions des prédécesseurs, -1 si aucun).
+    """
+    nodes = index_graph(graph)['nodes']
+    header = json.dumps({
+        'mode': mode,
+        'nodes': nodes,
+        'greedy_sources': greedy_sources(graph, mode),
+        'distance_dtype': '<f8',
+        'predecessor_dtype': '<i4',
+    }).encode('utf-8')
+    yield struct.pack('<I', len(header)) + header
+    for _, row, pred in iter_all_pairs(graph, mode, method):
+        distances = array('d', row)
+        predecessors = array('i', pred)
+        if sys.byteorder == 'big':
+            distances.byteswap()
+            predecessors.byteswap()
+        yield distances.tobytes() + predecessors.tobytes()
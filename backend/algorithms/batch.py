@@ -0,0 +1,175 @@
+"""
+Exécution de Dantzig depuis de nombreux sommets de départ, répartie sur plusieurs processus
+"""
+
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+
+try:
+    from .engine import index_graph, search_index, typecode
+    from .bellman_ford import search_negative
+except ImportError:
+    from engine import index_graph, search_index, typecode
+    from bellman_ford import search_negative
+
+# Tableaux CSR de l'index copiés une seule fois en mémoire partagée
+SHARED_ARRAYS = ('offsets', 'targets', 'costs', 'arc_ids', 'rank')
+
+# En dessous, lancer un pool coûte plus cher que le calcul lui-même
+MIN_PARALLEL_STARTS = 8
+
+# Taille du pool partagé par toutes les requêtes : borne aussi le paramètre workers
+MAX_WORKERS = os.cpu_count() or 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def share_index(index):
+    """
+    Copie les tableaux CSR de l'index dans un segment de mémoire partagée
+
+    Returns:
+        tuple: (segment, layout) où layout donne (typecode, décalage, longueur)
+               par tableau ; seul le layout est transmis aux processus. Le
+               segment est libéré (unlink) si la copie échoue.
+    """
+    layout = {}
+    size = 0
+    for name in SHARED_ARRAYS:
+        values = index[name]
+        size = -(-size // 8) * 8  # alignement sur 8 octets
+        layout[name] = (typecode(values), size, len(values))
+        size += values.itemsize * len(values)
+
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for name in SHARED_ARRAYS:
+            _, offset, length = layout[name]
+            data = index[name].tobytes()
+            segment.buf[offset:offset + len(data)] = data
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    return segment, layout
+
+
+def attach_index(segment, layout):
+    """Reconstruit un index CSR en vues sur la mémoire partagée (sans copie)"""
+    index = {}
+    for name, (code, offset, length) in layout.items():
+        itemsize = array(code).itemsize
+        index[name] = segment.buf[offset:offset + itemsize * length].cast(code)
+    return index
+
+
+def get_pool():
+    """
+    Retourne le pool de processus du module, créé au premier appel
+
+    Les processus sont lancés en mode spawn : un fork depuis un serveur
+    multi-thread pourrait hériter de verrous tenus par d'autres threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=get_context('spawn'))
+        return _pool
+
+
+def _discard_pool(pool):
+    """Oublie un pool cassé (processus tué) pour que l'appel suivant en recrée un"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_sources(task):
+    """Calcule les arbres d'un lot de sources sur l'index en mémoire partagée"""
+    segment_name, layout, total_nodes, mode, sources = task
+    segment = shared_memory.SharedMemory(name=segment_name)
+    try:
+        index = attach_index(segment, layout)
+        trees = [search_index(index, s, mode, total_nodes) for s in sources]
+        for view in index.values():
+            view.release()
+        return trees
+    finally:
+        segment.close()
+
+
+def _to_dicts(graph, nodes, start, lam, pred, mode):
+    infinity = float('inf') if mode == 'min' else float('-inf')
+    lambda_values = {node: infinity for node in graph['sommet']}
+    predecessors = {node: None for node in graph['sommet']}
+    lambda_values[start] = 0
+    for v, value in enumerate(lam):
+        if pred[v] >= 0:
+            lambda_values[nodes[v]] = value
+            predecessors[nodes[v]] = nodes[pred[v]]
+    return lambda_values, predecessors
+
+
+def run_batch(graph, starts, mode='min', workers=None):
+    """
+    Exécute Dantzig depuis chaque sommet de starts
+
+    Le graphe est indexé une fois puis placé en mémoire partagée : les
+    sources sont réparties en workers lots, chacun envoyé au pool du module
+    avec le nom du segment, auquel le processus s'attache le temps du lot.
+
+    Args:
+        graph: Dictionnaire avec 'sommet' et 'arc'
+        starts: Liste des nœuds de départ
+        mode: 'min' ou 'max'
+        workers: Nombre de processus du pool partagé à occuper
+                 (par défaut et au plus MAX_WORKERS)
+
+    Returns:
+        dict: {start: (lambda_values, predecessors)}
+    """
+    index = index_graph(graph)
+    nodes, position = index['nodes'], index['position']
+    total_nodes = len(graph['sommet'])
+    starts = list(dict.fromkeys(starts))
+    sources = [position[start] for start in starts]
+    workers = min(workers or MAX_WORKERS, MAX_WORKERS, len(sources))
+
+    if mode == 'min' and index['negative']:
+        # Arcs négatifs : Bellman-Ford, dans ce processus
+        trees = [search_negative(index, s) for s in sources]
+    elif workers == 1 or len(starts) < MIN_PARALLEL_STARTS:
+        trees = [search_index(index, s, mode, total_nodes) for s in sources]
+    else:
+        segment, layout = share_index(index)
+        # Tout ce qui suit la création du segment est sous try : il est toujours libéré
+        pool = None
+        try:
+            pool = get_pool()
+            # Lots entrelacés : au plus workers processus occupés par la requête
+            futures = [
+                pool.submit(_run_sources, (segment.name, layout, total_nodes, mode, sources[i::workers]))
+                for i in range(workers)
+            ]
+            trees = [None] * len(sources)
+            for i, future in enumerate(futures):
+                trees[i::workers] = future.result()
+        except BrokenProcessPool:
+            if pool is not None:
+                _discard_pool(pool)
+            raise
+        finally:
+            segment.close()
+            segment.unlink()
+
+    return {
+        start: _to_dicts(graph, nodes, start, lam, pred, mode)
+        for start, (lam, pred, _) in zip(starts, trees)
+    }
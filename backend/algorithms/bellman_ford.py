@@ -0,0 +1,260 @@
+"""
+Plus courts chemins avec arcs négatifs : Bellman-Ford à file (SPFA) et relaxation vectorisée NumPy
+"""
+
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .engine import count, directed_index, index_graph, phase, tree_to_result, typecode
+except ImportError:
+    from engine import count, directed_index, index_graph, phase, tree_to_result, typecode
+
+# Au-delà de ce nombre d'arcs, une passe NumPy sur tous les arcs coûte moins
+# cher que la file de SPFA en Python
+NUMPY_MIN_ARCS = 20000
+
+# Moteurs min forçant Bellman-Ford : 'spfa' (file Python) ou 'numpy' (passes vectorisées)
+NEGATIVE_ENGINES = ('spfa', 'numpy')
+
+
+class NegativeCycleError(ValueError):
+    """Circuit de coût négatif atteignable depuis le départ : les plus courts chemins ne sont pas définis"""
+
+    def __init__(self, cycle, cost):
+        super().__init__(f"Circuit absorbant détecté (coût {cost}): {' → '.join(str(node) for node in cycle)}")
+        self.cycle = cycle
+        self.cost = cost
+
+
+def _pred_cycle(pred, v):
+    """Circuit du graphe des prédécesseurs rencontré en remontant depuis v (positions), ou None"""
+    seen = {}
+    path = []
+    while v >= 0 and v not in seen:
+        seen[v] = len(path)
+        path.append(v)
+        v = pred[v]
+    if v < 0:
+        return None
+    # Remonter les prédécesseurs parcourt le circuit à l'envers
+    cycle = path[seen[v]:] + [v]
+    cycle.reverse()
+    return cycle
+
+
+def _raise_cycle(index, cycle):
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    cost = 0
+    for u, v in zip(cycle, cycle[1:]):
+        cost += min(costs[k] for k in range(offsets[u], offsets[u + 1]) if targets[k] == v)
+    raise NegativeCycleError([index['nodes'][x] for x in cycle], cost)
+
+
+def spfa(index, s):
+    """
+    Bellman-Ford à file (SPFA) depuis s, sur un index CSR
+
+    Seuls les sommets dont λ vient de baisser sont (re)mis en file, et la
+    recherche s'arrête dès que la file est vide. Un sommet atteint par un
+    chemin d'au moins n arcs trahit un circuit négatif : le circuit du graphe
+    des prédécesseurs qui le contient sert de témoin.
+
+    Args:
+        index: Index produit par index_graph
+        s: Position du sommet de départ
+
+    Returns:
+        tuple: (lam, pred, order) comme search_index, order listant s puis
+               les sommets atteints par λ croissant
+
+    Raises:
+        NegativeCycleError: si un circuit négatif est atteignable depuis s
+    """
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    n = len(offsets) - 1
+    infinity = float('inf')
+
+    lam = [infinity] * n
+    lam[s] = 0
+    pred = [-1] * n
+    hops = [0] * n
+    queued = bytearray(n)
+    queued[s] = 1
+    queue = deque([s])
+    pops = scanned = 0
+
+    while queue:
+        x = queue.popleft()
+        queued[x] = 0
+        lam_x = lam[x]
+        first, last = offsets[x], offsets[x + 1]
+        pops += 1
+        scanned += last - first
+        for k in range(first, last):
+            y = targets[k]
+            d_y = lam_x + costs[k]
+            if d_y < lam[y]:
+                lam[y] = d_y
+                pred[y] = x
+                hops[y] = hops[x] + 1
+                if hops[y] >= n:
+                    _count_spfa(pops, scanned)
+                    cycle = _pred_cycle(pred, y)
+                    if cycle:
+                        _raise_cycle(index, cycle)
+                if not queued[y]:
+                    queued[y] = 1
+                    queue.append(y)
+
+    _count_spfa(pops, scanned)
+    return lam, pred, _order(s, lam, pred)
+
+
+def _count_spfa(pops, scanned):
+    # Chaque sommet mis en file est un candidat, dépilé une fois
+    count('iterations', pops, algorithm='spfa', mode='min')
+    count('arcs_scanned', scanned, algorithm='spfa', mode='min')
+    count('candidates', pops, algorithm='spfa', mode='min')
+
+
+def bellman_ford_numpy(index, s):
+    """
+    Bellman-Ford par passes vectorisées sur les tableaux d'arcs (NumPy)
+
+    Chaque passe relâche d'un coup les arcs issus des sommets améliorés à la
+    passe précédente ; l'algorithme s'arrête à la première passe sans
+    amélioration. Une amélioration à la n-ième passe signale un circuit négatif.
+
+    Returns:
+        tuple: (lam, pred, order), voir spfa
+
+    Raises:
+        NegativeCycleError: si un circuit négatif est atteignable depuis s
+    """
+    offsets = np.frombuffer(index['offsets'], dtype=np.int64)
+    targets = np.frombuffer(index['targets'], dtype=np.int32)
+    integral = typecode(index['costs']) == 'q'
+    costs = np.frombuffer(index['costs'], dtype=np.int64 if integral else np.float64)
+    n = len(offsets) - 1
+    sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(offsets))
+
+    dist = np.full(n, np.inf)
+    dist[s] = 0
+    pred = np.full(n, -1, dtype=np.int64)
+    changed = np.zeros(n, dtype=bool)
+    changed[s] = True
+
+    rounds = scanned = improving = 0
+    while True:
+        arcs = np.flatnonzero(changed[sources])
+        scanned += arcs.size
+        candidates = dist[sources[arcs]] + costs[arcs]
+        better = candidates < dist[targets[arcs]]
+        arcs, candidates = arcs[better], candidates[better]
+        if not arcs.size:
+            break
+        rounds += 1
+        improving += arcs.size
+        relaxed = dist.copy()
+        np.minimum.at(relaxed, targets[arcs], candidates)
+        winners = arcs[candidates == relaxed[targets[arcs]]]
+        pred[targets[winners]] = sources[winners]
+        changed = relaxed < dist
+        dist = relaxed
+        if rounds >= n:
+            _count_numpy(rounds, scanned, improving)
+            pred_list = pred.tolist()
+            for v in np.flatnonzero(changed).tolist():
+                cycle = _pred_cycle(pred_list, v)
+                if cycle:
+                    _raise_cycle(index, cycle)
+
+    _count_numpy(rounds, scanned, improving)
+    if integral:
+        lam = [int(d) if d != np.inf else float('inf') for d in dist.tolist()]
+    else:
+        lam = dist.tolist()
+    pred = pred.tolist()
+    return lam, pred, _order(s, lam, pred)
+
+
+def _count_numpy(rounds, scanned, improving):
+    count('iterations', rounds, algorithm='numpy', mode='min')
+    count('arcs_scanned', scanned, algorithm='numpy', mode='min')
+    count('candidates', improving, algorithm='numpy', mode='min')
+
+
+def _order(s, lam, pred):
+    reached = [v for v in range(len(pred)) if pred[v] >= 0 and v != s]
+    reached.sort(key=lambda v: lam[v])
+    return [s] + reached
+
+
+def search_negative(index, s, method='auto'):
+    """Plus courts chemins depuis s malgré des arcs négatifs ('auto' : NumPy sur les grands graphes)"""
+    if method == 'auto':
+        method = 'numpy' if np is not None and len(index['targets']) >= NUMPY_MIN_ARCS else 'spfa'
+    if method == 'numpy':
+        if np is None:
+            raise ValueError("Méthode numpy indisponible : NumPy n'est pas installé")
+        return bellman_ford_numpy(index, s)
+    return spfa(index, s)
+
+
+def check_negative_cycles(index, method='auto'):
+    """
+    Vérifie qu'aucun circuit négatif n'existe, où qu'il soit dans le graphe
+
+    Une seule recherche depuis un sommet fictif relié à tous les sommets par
+    un arc de coût nul : tout circuit du graphe est atteignable depuis lui.
+
+    Raises:
+        NegativeCycleError: avec un circuit négatif témoin
+    """
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    n, m = len(offsets) - 1, len(targets)
+    code = typecode(costs)
+    virtual = {
+        'nodes': index['nodes'],
+        'offsets': array('q', offsets) + array('q', [m + n]),
+        'targets': array('i', targets) + array('i', range(n)),
+        'costs': array(code, costs) + array(code, [0]) * n,
+    }
+    # Le sommet fictif n'a aucun arc entrant : il n'apparaît jamais dans un circuit
+    search_negative(virtual, n, method)
+
+
+def bellman_ford(graph, start, method='auto', direction='forward'):
+    """
+    Plus courts chemins exacts depuis start, coûts négatifs compris
+
+    Args:
+        graph: Dictionnaire avec 'sommet' et 'arc'
+        start: Nœud de départ
+        method: 'auto', 'spfa' (file Python) ou 'numpy' (passes vectorisées)
+        direction: 'reverse' pour les plus courts chemins de chaque sommet vers start
+
+    Returns:
+        tuple: (lambda_values, predecessors, Ek_steps), E suivant l'ordre des λ croissants
+
+    Raises:
+        NegativeCycleError: si un circuit négatif est atteignable depuis start
+                            (ou, en 'reverse', peut atteindre start)
+    """
+    index = index_graph(graph)
+    view = directed_index(index, direction)
+    with phase('bellman_ford'):
+        try:
+            lam, pred, order = search_negative(view, index['position'][start], method)
+        except NegativeCycleError as e:
+            if direction == 'forward':
+                raise
+            # Le témoin a été trouvé sur le graphe retourné
+            raise NegativeCycleError(e.cycle[::-1], e.cost) from None
+    return tree_to_result(graph, index, start, lam, pred, order, mode='min')
@@ -0,0 +1,132 @@
+"""
+Plus longs chemins sur graphe sans circuit (relaxation dans l'ordre topologique)
+"""
+
+try:
+    from .engine import index_graph, phase, tree_to_result
+except ImportError:
+    from engine import index_graph, phase, tree_to_result
+
+
+class CycleError(ValueError):
+    """Circuit atteignable depuis le départ : les plus longs chemins ne sont pas définis"""
+
+    def __init__(self, cycle):
+        super().__init__(f"Circuit détecté: {' → '.join(str(node) for node in cycle)}")
+        self.cycle = cycle
+
+
+def topological_order(index, s):
+    """
+    Ordre topologique des sommets atteignables depuis s (parcours en profondeur itératif)
+
+    Args:
+        index: Index produit par index_graph
+        s: Position du sommet de départ
+
+    Returns:
+        list: Positions dans l'ordre topologique, s en tête
+
+    Raises:
+        CycleError: si un circuit est atteignable depuis s
+    """
+    offsets, targets = index['offsets'], index['targets']
+    state = bytearray(len(offsets) - 1)  # 0 : non visité, 1 : en cours, 2 : terminé
+    postorder = []
+    stack = [(s, offsets[s])]
+    state[s] = 1
+
+    while stack:
+        v, k = stack[-1]
+        if k == offsets[v + 1]:
+            stack.pop()
+            state[v] = 2
+            postorder.append(v)
+            continue
+        stack[-1] = (v, k + 1)
+        j = targets[k]
+        if state[j] == 1:
+            path = [u for (u, _) in stack]
+            cycle = path[path.index(j):] + [j]
+            raise CycleError([index['nodes'][u] for u in cycle])
+        if state[j] == 0:
+            state[j] = 1
+            stack.append((j, offsets[j]))
+
+    postorder.reverse()
+    return postorder
+
+
+def reachable_cycle(graph, start):
+    """
+    Circuit atteignable depuis start (premier sommet répété en fin), None s'il n'y en a pas
+
+    Mémorisé par départ dans index['cycles'] : la réponse ne dépend que de la
+    structure, partagée par les index dont seuls les coûts changent (copy_costs).
+    """
+    index = index_graph(graph)
+    s = index['position'][start]
+    cycles = index.setdefault('cycles', {})
+    if s not in cycles:
+        try:
+            topological_order(index, s)
+            cycles[s] = None
+        except CycleError as e:
+            cycles[s] = e.cycle
+    return cycles[s]
+
+
+def is_acyclic_from(graph, start):
+    """Vrai si aucun circuit n'est atteignable depuis start"""
+    return reachable_cycle(graph, start) is None
+
+
+def longest_path_dag(graph, start):
+    """
+    Plus longs chemins depuis start en temps linéaire O(V + A)
+
+    Chaque sommet est traité une fois, dans l'ordre topologique, en relâchant
+    ses arcs sortants avec max ; le résultat est exact dès que la partie du
+    graphe atteignable depuis start est sans circuit.
+
+    Args:
+        graph: Dictionnaire avec 'sommet' et 'arc'
+        start: Nœud de départ
+
+    Returns:
+        tuple: (lambda_values, predecessors, Ek_steps), E suivant l'ordre topologique
+
+    Raises:
+        CycleError: si un circuit est atteignable depuis start
+    """
+    index = index_graph(graph)
+    s = index['position'][start]
+    with phase('dag'):
+        lam, pred, order = longest_path_index(index, s)
+    return tree_to_result(graph, index, start, lam, pred, order, mode='max')
+
+
+def longest_path_index(index, s):
+    """
+    Plus longs chemins depuis la position s, sur l'index
+
+    Returns:
+        tuple: (lam, pred, order) alignés sur les positions (-inf / -1 si inaccessible)
+
+    Raises:
+        CycleError: si un circuit est atteignable depuis s
+    """
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    order = topological_order(index, s)
+
+    lam = [float('-inf')] * (len(offsets) - 1)
+    lam[s] = 0
+    pred = [-1] * (len(offsets) - 1)
+    for u in order:
+        lam_u = lam[u]
+        for k in range(offsets[u], offsets[u + 1]):
+            j = targets[k]
+            if lam_u + costs[k] > lam[j]:
+                lam[j] = lam_u + costs[k]
+                pred[j] = u
+    return lam, pred, order
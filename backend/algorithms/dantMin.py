@@ -1,4 +1,46 @@
-def init_dantzig_min(graph, start):
+try:
+    from .engine import DIRECTIONS, ENGINES, index_graph, reversed_graph, run_bounded, run_dantzig
+    from .bellman_ford import NEGATIVE_ENGINES, bellman_ford
+    from .steps import iter_dantzig_steps, collect_detailed_steps
+except ImportError:
+    from engine import DIRECTIONS, ENGINES, index_graph, reversed_graph, run_bounded, run_dantzig
+    from bellman_ford import NEGATIVE_ENGINES, bellman_ford
+    from steps import iter_dantzig_steps, collect_detailed_steps
+
+# 'spfa' / 'numpy' : Bellman-Ford exact même avec des arcs négatifs (erreur si circuit négatif) ;
+# 'heap' y bascule de lui-même quand l'index du graphe contient un arc négatif
+MIN_ENGINES = ENGINES + NEGATIVE_ENGINES
+
+
+def init_dantzig_min(graph, start, engine='heap', max_cost=None, max_hops=None, direction='forward'):
+    """
+    Point d'entrée : moteur indexé par défaut, engine='reference' pour la version d'origine
+
+    Avec max_cost ou max_hops, seul le voisinage de start est exploré (voir
+    engine.run_bounded) et seuls les sommets atteints figurent dans les résultats.
+    Avec direction='reverse', start est l'arrivée : λ(v) est la distance de v à
+    start et predecessors[v] le sommet qui suit v vers start, en un seul marquage.
+    """
+    if engine not in MIN_ENGINES:
+        raise ValueError(f"Moteur inconnu: {engine}")
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Direction inconnue: {direction}")
+    if max_cost is not None or max_hops is not None:
+        if engine != 'heap':
+            raise ValueError("Les bornes max_cost / max_hops ne sont disponibles qu'avec le moteur 'heap'")
+        return run_bounded(graph, start, max_cost, max_hops, direction)
+    if engine == 'reference':
+        return init_dantzig_min_reference(graph if direction == 'forward' else reversed_graph(graph), start)
+    if engine in NEGATIVE_ENGINES:
+        return bellman_ford(graph, start, engine, direction)
+    if index_graph(graph)['negative']:
+        # Le marquage glouton ne donne pas les bons λ avec des arcs négatifs
+        return bellman_ford(graph, start, direction=direction)
+    return run_dantzig(graph, start, mode='min', direction=direction)
+
+
+def init_dantzig_min_reference(graph, start):
+    """Version de référence : balaye tous les arcs depuis E à chaque itération"""
     lambda_values = {node: float('inf') for node in graph['sommet']}
     predecessors = {node: None for node in graph['sommet']}
     lambda_values[start] = 0
@@ -39,138 +81,12 @@ def init_dantzig_min(graph, start):
 
 def init_dantzig_min_detailed(graph, start):
     """Version détaillée de l'algorithme conforme au format du fichier PDF"""
-    lambda_values = {node: float('inf') for node in graph['sommet']}
-    predecessors = {node: None for node in graph['sommet']}
-    lambda_values[start] = 0
-    E = [start]
-    
-    detailed_steps = []
-    step_number = 1
-    
-    # Étape initiale (Étape 0)
-    detailed_steps.append({
-        'step': 0,
-        'step_name': 'Initialisation',
-        'description': f'Initialisation: Poser λ({start}) = 0, E₁ = {{{start}}}',
-        'E_current': E.copy(),
-        'lambda_values': {k: ("∞" if v == float('inf') else v) for k, v in lambda_values.items()},
-        'action': 'Initialisation',
-        'candidates': [],
-        'selected': None,
-        'calculations': [],
-        'highlight_nodes': [start],
-        'highlight_edges': []
-    })
-
-    while len(E) < len(graph['sommet']):
-        candidates = []
-        calculations = []
-        all_candidates_details = []
-
-        # Phase 1: Pour chaque sommet marqué xi ∈ E, trouver xi* ∉ E avec coût minimal
-        for xi in E:
-            min_arc = None
-            min_cost = float('inf')
-            node_arcs = []
-            
-            for (u, v, cost) in graph['arc']:
-                if u == xi and v not in E:
-                    node_arcs.append((v, cost))
-                    if cost < min_cost:
-                        min_arc = (u, v, cost)
-                        min_cost = cost
+    return collect_detailed_steps(graph, start, mode='min')
 
-            if min_arc:
-                u, v, cost = min_arc
-                total = lambda_values[u] + cost
-                candidates.append((total, u, v, cost))
-                
-                # Détails pour l'affichage
-                calculation_text = f"De {u}: min{{arcs sortants vers non-marqués}} = {v} (coût {cost})"
-                lambda_calc = f"λ({v}) = λ({u}) + {cost} = {lambda_values[u]} + {cost} = {total}"
-                
-                calculations.append({
-                    'from_node': u,
-                    'available_targets': node_arcs,
-                    'selected_target': v,
-                    'edge_cost': cost,
-                    'calculation_text': calculation_text,
-                    'lambda_calculation': lambda_calc
-                })
-                
-                all_candidates_details.append({
-                    'from_node': u,
-                    'to_node': v,
-                    'edge_cost': cost,
-                    'lambda_from': lambda_values[u],
-                    'total_cost': total,
-                    'calculation': lambda_calc
-                })
 
-        if not candidates:
-            detailed_steps.append({
-                'step': step_number,
-                'step_name': 'Terminaison',
-                'description': 'Aucun arc sortant disponible - Algorithme terminé',
-                'E_current': E.copy(),
-                'lambda_values': {k: ("∞" if v == float('inf') else v) for k, v in lambda_values.items()},
-                'action': 'Terminaison',
-                'candidates': [],
-                'selected': None,
-                'calculations': [],
-                'highlight_nodes': E.copy(),
-                'highlight_edges': []
-            })
-            break
-
-        # Phase 2: Sélectionner le candidat avec λ minimal
-        candidates.sort()
-        min_total, best_u, best_v, best_cost = candidates[0]
-        
-        # Avant la mise à jour des valeurs
-        step_before_update = {
-            'step': step_number,
-            'step_name': f'Étape {step_number}a - Calculs',
-            'description': f'Calculer λ pour tous les candidats depuis E{step_number}',
-            'E_current': E.copy(),
-            'lambda_values': {k: ("∞" if v == float('inf') else v) for k, v in lambda_values.items()},
-            'action': 'Calcul des candidats',
-            'candidates': all_candidates_details,
-            'selected': None,
-            'calculations': calculations,
-            'highlight_nodes': E.copy(),
-            'highlight_edges': [],
-            'reasoning': f'Comparer les valeurs λ calculées'
-        }
-        detailed_steps.append(step_before_update)
-        
-        # Mettre à jour les valeurs
-        lambda_values[best_v] = min_total
-        predecessors[best_v] = best_u
-        E.append(best_v)
-        step_number += 1
-        
-        # Après la mise à jour
-        selected_detail = next(c for c in all_candidates_details 
-                             if c['from_node'] == best_u and c['to_node'] == best_v)
-        
-        step_after_update = {
-            'step': step_number - 0.5,  # Étape intermédiaire
-            'step_name': f'Étape {step_number - 1}b - Sélection',
-            'description': f'Sélectionner le minimum: λ({best_v}) = {min_total}, E{step_number} = {{", ".join(E)}}',
-            'E_current': E.copy(),
-            'lambda_values': {k: ("∞" if v == float('inf') else v) for k, v in lambda_values.items()},
-            'action': f'Marquage de {best_v}',
-            'candidates': all_candidates_details,
-            'selected': selected_detail,
-            'calculations': calculations,
-            'highlight_nodes': E.copy(),
-            'highlight_edges': [(best_u, best_v)],
-            'reasoning': f'min{{{"}, {".join([str(c["total_cost"]) for c in all_candidates_details])}}} = {min_total}'
-        }
-        detailed_steps.append(step_after_update)
-
-    return lambda_values, predecessors, detailed_steps
+def iter_dantzig_min_steps(graph, start):
+    """Étapes détaillées produites une à une, avec deltas de λ (voir steps.iter_dantzig_steps)"""
+    return iter_dantzig_steps(graph, start, mode='min')
 
 
 def get_shortest_path(predecessors, end):
@@ -2,10 +2,57 @@
 Module pour l'algorithme de Dantzig (plus courts chemins)
 """
 
-def init_dantzig(graph, start):
+try:
+    from .engine import DIRECTIONS, ENGINES, index_graph, reversed_graph, run_bounded, run_dantzig
+    from .bellman_ford import NEGATIVE_ENGINES, bellman_ford
+except ImportError:
+    from engine import DIRECTIONS, ENGINES, index_graph, reversed_graph, run_bounded, run_dantzig
+    from bellman_ford import NEGATIVE_ENGINES, bellman_ford
+
+
+def init_dantzig(graph, start, engine='heap', max_cost=None, max_hops=None, direction='forward'):
     """
     Implémentation de l'algorithme de Dantzig pour trouver les plus courts chemins
     
+    Args:
+        graph: Dictionnaire avec 'sommet' (liste des nœuds) et 'arc' (liste des arêtes)
+        start: Nœud de départ
+        engine: 'heap' (moteur indexé, Bellman-Ford si un arc est négatif),
+                'reference' (balayage complet d'origine), 'spfa' ou 'numpy' (Bellman-Ford)
+        max_cost: Coût maximal des chemins : seuls les sommets atteints dans la borne sont rendus
+        max_hops: Nombre maximal d'arcs des chemins (voir engine.search_bounded)
+        direction: 'reverse' pour l'arbre des plus courts chemins vers start : λ(v)
+                   est la distance de v à start et predecessors[v] le sommet suivant
+        
+    Returns:
+        tuple: (lambda_values, predecessors, Ek_steps)
+
+    Raises:
+        NegativeCycleError: si un circuit négatif est atteignable depuis start
+        ValueError: bornes demandées avec un autre moteur que 'heap' ou avec des coûts
+                    négatifs, ou direction inconnue
+    """
+    if engine not in ENGINES + NEGATIVE_ENGINES:
+        raise ValueError(f"Moteur inconnu: {engine}")
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Direction inconnue: {direction}")
+    if max_cost is not None or max_hops is not None:
+        if engine != 'heap':
+            raise ValueError("Les bornes max_cost / max_hops ne sont disponibles qu'avec le moteur 'heap'")
+        return run_bounded(graph, start, max_cost, max_hops, direction)
+    if engine == 'reference':
+        return init_dantzig_reference(graph if direction == 'forward' else reversed_graph(graph), start)
+    if engine in NEGATIVE_ENGINES:
+        return bellman_ford(graph, start, engine, direction)
+    if index_graph(graph)['negative']:
+        return bellman_ford(graph, start, direction=direction)
+    return run_dantzig(graph, start, mode='min', direction=direction)
+
+
+def init_dantzig_reference(graph, start):
+    """
+    Version de référence : balaye tous les arcs depuis E à chaque itération
+    
     Args:
         graph: Dictionnaire avec 'sommet' (liste des nœuds) et 'arc' (liste des arêtes)
         start: Nœud de départ
@@ -0,0 +1,152 @@
+"""
+Réparation incrémentale des arbres de plus courts chemins après modification de coûts d'arcs
+"""
+
+import heapq
+
+try:
+    from .engine import index_graph, reverse_index, marking_order, MarkingOrder
+except ImportError:
+    from engine import index_graph, reverse_index, marking_order, MarkingOrder
+
+
+def _subtree(index, lambda_values, predecessors, root):
+    """Positions des sommets de l'arbre issu de root (root compris)"""
+    nodes, offsets, targets = index['nodes'], index['offsets'], index['targets']
+    position = index['position']
+    subtree = {position[root]}
+    stack = [position[root]]
+    while stack:
+        x = stack.pop()
+        for k in range(offsets[x], offsets[x + 1]):
+            y = targets[k]
+            if y not in subtree and predecessors.get(nodes[y]) == nodes[x]:
+                subtree.add(y)
+                stack.append(y)
+    return subtree
+
+
+def repair_tree(graph, result, arcs):
+    """
+    Répare un résultat de Dantzig min après le changement de coût d'un ou plusieurs arcs
+
+    Seuls les sommets dont λ peut changer sont revus : ceux qu'une baisse
+    améliore, et les sous-arbres suspendus aux arcs de l'arbre dont le coût
+    augmente. Ils sont recalculés par un seul Dantzig limité à cette zone,
+    amorcé par les arcs entrants venant du reste de l'arbre et par les arcs
+    dont le coût baisse.
+
+    Args:
+        graph: Graphe dont l'index porte déjà les nouveaux coûts
+        result: Triplet (lambda_values, predecessors, Ek_steps) de l'ancienne version
+        arcs: Liste de (ancien arc, nouvel arc), chaque arc étant (u, v, coût)
+
+    Returns:
+        tuple: (nouveau résultat, nombre de sommets touchés), ou (None, 0) si
+               la réparation n'est pas possible (coûts négatifs) et qu'il faut recalculer
+    """
+    lambda_values, predecessors, Ek_steps = result
+    index = index_graph(graph)
+    if index['negative'] or any(new_arc[2] < 0 for _, new_arc in arcs):
+        return None, 0
+
+    nodes, position = index['nodes'], index['position']
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    infinity = float('inf')
+
+    affected = set()
+    decreased = []
+    for (u, v, old_cost), (_, _, new_cost) in arcs:
+        if new_cost < old_cost:
+            decreased.append((u, v, new_cost))
+        elif new_cost > old_cost and predecessors.get(v) == u and position[v] not in affected:
+            affected |= _subtree(index, lambda_values, predecessors, v)
+
+    heap = []
+    if affected:
+        reverse = reverse_index(index)
+        rev_offsets, sources, slots = reverse['offsets'], reverse['sources'], reverse['slots']
+        for x in affected:
+            for r in range(rev_offsets[x], rev_offsets[x + 1]):
+                y = sources[r]
+                if y not in affected:
+                    lam_y = lambda_values.get(nodes[y], infinity)
+                    if lam_y < infinity:
+                        heap.append((lam_y + costs[slots[r]], x, y))
+    for u, v, new_cost in decreased:
+        if position[u] in affected:
+            continue
+        lam_v = infinity if position[v] in affected else lambda_values.get(v, infinity)
+        if lambda_values.get(u, infinity) + new_cost < lam_v:
+            heap.append((lambda_values[u] + new_cost, position[v], position[u]))
+    if not heap and not affected:
+        return result, 0
+    heapq.heapify(heap)
+
+    lambda_values = dict(lambda_values)
+    predecessors = dict(predecessors)
+    for x in affected:
+        lambda_values[nodes[x]] = infinity
+        predecessors[nodes[x]] = None
+
+    # Dantzig restreint : seuls les sommets améliorés sont (re)marqués
+    settled = set()
+    while heap:
+        d, x, p = heapq.heappop(heap)
+        if x in settled or d >= lambda_values.get(nodes[x], infinity):
+            continue
+        settled.add(x)
+        lambda_values[nodes[x]] = d
+        predecessors[nodes[x]] = nodes[p]
+        for k in range(offsets[x], offsets[x + 1]):
+            y = targets[k]
+            if d + costs[k] < lambda_values.get(nodes[y], infinity):
+                heapq.heappush(heap, (d + costs[k], y, x))
+
+    touched = affected | settled
+    touched_ids = {nodes[x] for x in touched}
+    kept = [node for node in marking_order(Ek_steps) if node not in touched_ids]
+    moved = sorted((node for node in touched_ids if lambda_values[node] < infinity),
+                   key=lambda node: lambda_values[node])
+    order = list(heapq.merge(kept, moved, key=lambda node: lambda_values[node]))
+    return (lambda_values, predecessors, MarkingOrder(order)), len(touched)
+
+
+def repair_cached_trees(cache, graph, change, engine='heap'):
+    """
+    Reporte un lot de modifications sur les arbres min en cache pour l'ancienne version
+
+    Les arbres réparés sont remis en cache sous la nouvelle version ; ceux qui
+    ne peuvent pas l'être sont simplement abandonnés (recalcul au prochain appel).
+
+    Args:
+        cache: ResultCache indexé par (version, mode, départ, moteur)
+        graph: Graphe à jour
+        change: Description renvoyée par graph_manager.patch_graph ; sans arc
+                modifié ni changement de structure, tous les résultats passent
+                tels quels à la nouvelle version
+
+    Returns:
+        dict: 'trees_repaired', 'trees_dropped' et 'touched' (sommets revus au total)
+    """
+    report = {'trees_repaired': 0, 'trees_dropped': 0, 'touched': 0}
+    unchanged = not change['arcs'] and not change['structural']
+    for key, result in cache.items():
+        version, mode, start, key_engine = key
+        if version != change['old_version']:
+            continue
+        cache.pop(key)
+        if unchanged:
+            cache.put((change['version'], mode, start, key_engine), result)
+            continue
+        if mode != 'min' or key_engine != engine or change['structural']:
+            report['trees_dropped'] += 1
+            continue
+        repaired, touched = repair_tree(graph, result, change['arcs'])
+        if repaired is None:
+            report['trees_dropped'] += 1
+            continue
+        cache.put((change['version'], mode, start, key_engine), repaired)
+        report['trees_repaired'] += 1
+        report['touched'] += touched
+    return report
@@ -0,0 +1,621 @@
+"""
+Moteur indexé pour l'algorithme de Dantzig (index d'adjacence + file de priorité)
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from contextlib import nullcontext
+
+try:
+    from ..utils.metrics import count, phase
+except ImportError:
+    try:
+        from metrics import count, phase
+    except ImportError:
+        # Modules d'algorithmes utilisés sans utils/ : pas de mesures
+        def count(name, value=1, **labels):
+            pass
+
+        def phase(name):
+            return nullcontext()
+
+ENGINES = ('heap', 'reference')
+
+# Sens de parcours : 'forward' (arcs sortants, distances depuis le départ) ou
+# 'reverse' (arcs entrants, distances de chaque sommet vers un sommet d'arrivée)
+DIRECTIONS = ('forward', 'reverse')
+
+# Bornes des coûts entiers stockés en int64
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def index_graph(graph):
+    """
+    Construit (une seule fois) l'index des arcs sortants du graphe
+
+    Les sommets sont internés en entiers denses et les arcs rangés au format CSR
+    (les arcs sortants de i occupent offsets[i]:offsets[i + 1], dans l'ordre de
+    graph['arc']). L'index est mémorisé dans graph['index'] pour que les appels
+    suivants sur le même graphe le réutilisent.
+
+    Args:
+        graph: Dictionnaire avec 'sommet' (liste des nœuds) et 'arc' (liste des arêtes)
+
+    Returns:
+        dict: 'nodes' (id par entier), 'position' (entier par id), 'offsets',
+              'targets', 'costs', 'arc_ids' (tableaux CSR), 'slots' (case CSR
+              de chaque arc), 'rank' (rang lexical), 'negative' (présence d'arcs
+              négatifs), 'reverse' (arcs entrants, voir reverse_index)
+    """
+    index = graph.get('index')
+    if index is not None:
+        return index
+    with phase('index'):
+        index = _build_index(graph)
+    graph['index'] = index
+    return index
+
+
+def _build_index(graph):
+    nodes = list(graph['sommet'])
+    position = {}
+    for i, node in enumerate(nodes):
+        position.setdefault(node, i)
+    for (u, v, _) in graph['arc']:
+        for node in (u, v):
+            if node not in position:
+                position[node] = len(nodes)
+                nodes.append(node)
+
+    sources = array('i', (position[u] for (u, _, _) in graph['arc']))
+    targets = array('i', (position[v] for (_, v, _) in graph['arc']))
+    costs = cost_array([cost for (_, _, cost) in graph['arc']])
+    return csr_index(nodes, position, sources, targets, costs)
+
+
+def cost_array(costs):
+    """
+    Stockage des coûts : int64 ('q') s'ils sont tous entiers et représentables, float64 ('d') sinon
+
+    Args:
+        costs: Liste de nombres ou tableau NumPy
+    """
+    dtype = getattr(costs, 'dtype', None)
+    if dtype is not None:
+        if dtype.kind == 'i':
+            return array('q', costs.astype('int64').tobytes())
+        return array('d', costs.astype('float64').tobytes())
+    if all(isinstance(cost, int) and INT64_MIN <= cost <= INT64_MAX for cost in costs):
+        return array('q', costs)
+    return array('d', costs)
+
+
+def csr_index(nodes, position, sources, targets, costs):
+    """
+    Range au format CSR des arcs donnés dans leur ordre d'origine
+
+    Args:
+        nodes: Identifiant de chaque position
+        position: Position de chaque identifiant
+        sources, targets: Positions des extrémités de chaque arc (array 'i')
+        costs: Coût de chaque arc (array 'q' ou 'd', voir cost_array)
+
+    Returns:
+        dict: Index au format de index_graph, arcs entrants compris
+    """
+    n, m = len(nodes), len(sources)
+    offsets = array('q', bytes(8 * (n + 1)))
+    for u in sources:
+        offsets[u + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    csr_targets = array('i', bytes(4 * m))
+    csr_costs = array(costs.typecode, bytes(costs.itemsize * m))
+    arc_ids = array('i', bytes(4 * m))
+    slots = array('i', bytes(4 * m))
+    fill = offsets[:-1]
+    for arc_idx in range(m):
+        u = sources[arc_idx]
+        k = fill[u]
+        fill[u] = k + 1
+        csr_targets[k] = targets[arc_idx]
+        csr_costs[k] = costs[arc_idx]
+        arc_ids[k] = arc_idx
+        slots[arc_idx] = k
+
+    # Le rang lexical reproduit le départage de candidates.sort() sur le sommet source
+    rank = array('i', bytes(4 * n))
+    for r, i in enumerate(sorted(range(n), key=lambda i: str(nodes[i]))):
+        rank[i] = r
+
+    return {
+        'nodes': nodes,
+        'position': position,
+        'offsets': offsets,
+        'targets': csr_targets,
+        'costs': csr_costs,
+        'arc_ids': arc_ids,
+        'slots': slots,
+        'rank': rank,
+        'negative': any(cost < 0 for cost in costs),
+        'reverse': reverse_csr(offsets, csr_targets, csr_costs),
+    }
+
+
+def arc_sources(index):
+    """Origine de chaque case CSR, mémorisée dans index['arc_sources']"""
+    sources = index.get('arc_sources')
+    if sources is None:
+        offsets = index['offsets']
+        sources = array('i', bytes(4 * len(index['targets'])))
+        for u in range(len(offsets) - 1):
+            for k in range(offsets[u], offsets[u + 1]):
+                sources[k] = u
+        index['arc_sources'] = sources
+    return sources
+
+
+class ArcList(Sequence):
+    """
+    graph['arc'] d'un graphe compilé : les arcs (source, cible, coût) lus dans l'index CSR
+
+    Aucun tuple n'est stocké : chaque arc est reconstruit à la lecture, dans
+    l'ordre d'origine. Seul le coût d'un arc peut être remplacé.
+    """
+
+    __slots__ = ('index',)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index['slots'])
+
+    def __getitem__(self, arc_idx):
+        if isinstance(arc_idx, slice):
+            return [self[i] for i in range(*arc_idx.indices(len(self)))]
+        index = self.index
+        k = index['slots'][arc_idx]
+        nodes = index['nodes']
+        return (nodes[arc_sources(index)[k]], nodes[index['targets'][k]], index['costs'][k])
+
+    def __iter__(self):
+        index = self.index
+        nodes, targets, costs = index['nodes'], index['targets'], index['costs']
+        sources = arc_sources(index)
+        for k in index['slots']:
+            yield (nodes[sources[k]], nodes[targets[k]], costs[k])
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, ArcList)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __setitem__(self, arc_idx, arc):
+        if tuple(arc[:2]) != self[arc_idx][:2]:
+            raise ValueError("Seul le coût d'un arc compilé peut changer")
+        set_arc_cost(self.index, arc_idx, arc[2])
+
+
+def reverse_index(index):
+    """
+    Index CSR des arcs entrants, index['reverse']
+
+    Il est construit avec l'index (csr_index) ; un index venu d'ailleurs (fichier
+    binaire d'une version antérieure) le reçoit au premier appel. Les arcs
+    entrants de j occupent offsets[j]:offsets[j + 1], rangés par case croissante
+    de l'index direct : 'sources' donne l'origine de l'arc, 'slots' sa case
+    dans l'index direct et 'costs' son coût (tenu à jour par set_arc_cost).
+    """
+    reverse = index.get('reverse')
+    if reverse is None:
+        reverse = index['reverse'] = reverse_csr(index['offsets'], index['targets'], index['costs'])
+    return reverse
+
+
+def reverse_csr(offsets, targets, costs):
+    """Arcs entrants d'un index CSR direct (voir reverse_index)"""
+    n, m = len(offsets) - 1, len(targets)
+    rev_offsets = array('q', bytes(8 * (n + 1)))
+    for k in range(m):
+        rev_offsets[targets[k] + 1] += 1
+    for j in range(n):
+        rev_offsets[j + 1] += rev_offsets[j]
+
+    sources = array('i', bytes(4 * m))
+    slots = array('i', bytes(4 * m))
+    code = typecode(costs)
+    rev_costs = array(code, bytes(array(code).itemsize * m))
+    fill = rev_offsets[:-1]
+    for u in range(n):
+        for k in range(offsets[u], offsets[u + 1]):
+            j = targets[k]
+            r = fill[j]
+            fill[j] = r + 1
+            sources[r] = u
+            slots[r] = k
+            rev_costs[r] = costs[k]
+
+    return {'offsets': rev_offsets, 'sources': sources, 'slots': slots, 'costs': rev_costs}
+
+
+def reversed_view(index):
+    """Index CSR du graphe retourné (arcs entrants), utilisable par search_index"""
+    reverse = reverse_index(index)
+    return {
+        'nodes': index['nodes'],
+        'position': index['position'],
+        'offsets': reverse['offsets'],
+        'targets': reverse['sources'],
+        'costs': reverse['costs'],
+        'arc_ids': reverse['slots'],
+        'rank': index['rank'],
+        'negative': index['negative'],
+    }
+
+
+def directed_index(index, direction='forward'):
+    """Index parcouru par une recherche dans le sens direction (voir DIRECTIONS)"""
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Direction inconnue: {direction}")
+    return index if direction == 'forward' else reversed_view(index)
+
+
+def reversed_graph(graph):
+    """Graphe {'sommet', 'arc'} aux arcs retournés, pour les versions de référence"""
+    return {'sommet': graph['sommet'], 'arc': [(v, u, cost) for (u, v, cost) in graph['arc']]}
+
+
+def typecode(values):
+    """Code de type d'un tableau de l'index, qu'il soit un array ou une memoryview (fichier mappé)"""
+    return values.typecode if isinstance(values, array) else values.format
+
+
+def copy_costs(index):
+    """
+    Copie de l'index pour en changer les coûts (set_arc_cost) sans toucher l'original
+
+    Les coûts, directs et entrants, sont copiés ; les tableaux de structure
+    sont partagés. Les bornes mémorisées dérivées des coûts ne sont pas reprises.
+    """
+    index = dict(index)
+    index['costs'] = _copy_array(index['costs'])
+    reverse = index.get('reverse')
+    if reverse is not None:
+        index['reverse'] = dict(reverse, costs=_copy_array(reverse['costs']))
+    index.pop('astar', None)
+    index.pop('landmarks', None)
+    return index
+
+
+def _copy_array(values):
+    copy = array(typecode(values))
+    copy.frombytes(memoryview(values).cast('B'))
+    return copy
+
+
+def update_arc_cost(graph, arc_idx, cost):
+    """Reporte le nouveau coût d'un arc dans l'index mémorisé du graphe, sans le reconstruire"""
+    index = graph.get('index')
+    if index is not None:
+        set_arc_cost(index, arc_idx, cost)
+
+
+def set_arc_cost(index, arc_idx, cost):
+    """
+    Remplace le coût d'un arc dans l'index
+
+    Si le coût ne tient plus dans le stockage entier, les coûts passent en
+    flottants (comme un index reconstruit avec ce coût).
+    """
+    costs = index['costs']
+    reverse = index.get('reverse')
+    if typecode(costs) == 'q' and not isinstance(cost, int):
+        costs = index['costs'] = array('d', costs)
+        if reverse is not None:
+            reverse['costs'] = array('d', reverse['costs'])
+    k = index['slots'][arc_idx]
+    costs[k] = cost
+    if reverse is not None:
+        # Les arcs entrants de la cible sont rangés par case directe croissante
+        rev_offsets = reverse['offsets']
+        j = index['targets'][k]
+        r = bisect_left(reverse['slots'], k, rev_offsets[j], rev_offsets[j + 1])
+        reverse['costs'][r] = cost
+    # Les bornes dérivées des coûts (heuristique A*) ne sont plus garanties
+    index.pop('astar', None)
+    if cost < 0:
+        index['negative'] = True
+
+
+def search_index(index, s, mode='min', total_nodes=None, target=None):
+    """
+    Algorithme de Dantzig piloté par un tas binaire, sur un index CSR
+
+    À chaque marquage d'un sommet, ses arcs sortants sont poussés dans le tas ;
+    le sommet de tête non marqué est exactement le candidat que la version de
+    référence obtient en balayant tous les arcs depuis E. Les égalités sont
+    départagées comme dans la référence (sommet source, puis ordre des arcs).
+    Les tableaux de l'index peuvent être des listes, des array ou des memoryview.
+
+    Args:
+        index: Index produit par index_graph (seules les clés CSR et 'rank' sont lues)
+        s: Position du sommet de départ
+        mode: 'min' (plus courts chemins) ou 'max' (plus longs chemins)
+        total_nodes: Arrêt dès que ce nombre de sommets est marqué
+        target: Position d'un sommet d'arrivée : arrêt dès qu'il est marqué (les
+                sommets déjà marqués ont alors les mêmes λ et prédécesseurs
+                qu'avec un marquage complet)
+
+    Returns:
+        tuple: (lam, pred, order) indexés par position (±inf et -1 pour les
+               sommets non atteints, pred étant un array d'entiers), order
+               étant l'ordre de marquage
+    """
+    sign = 1 if mode == 'min' else -1
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    arc_ids, rank = index['arc_ids'], index['rank']
+    n = len(offsets) - 1
+    if total_nodes is None:
+        total_nodes = n
+
+    marked = bytearray(n)
+    marked[s] = 1
+    lam = [sign * float('inf')] * n
+    lam[s] = 0
+    pred = array('i', [-1]) * n
+    order = [s]
+    heap = []
+    for k in range(offsets[s], offsets[s + 1]):
+        j = targets[k]
+        if not marked[j]:
+            heap.append((sign * costs[k], sign * rank[s], arc_ids[k], s, j, costs[k]))
+    heapq.heapify(heap)
+    pops = 0
+
+    while len(order) < total_nodes and heap:
+        _, _, _, u, v, cost = heapq.heappop(heap)
+        pops += 1
+        if marked[v]:
+            continue
+
+        marked[v] = 1
+        lam_v = lam[v] = lam[u] + cost
+        pred[v] = u
+        order.append(v)
+        if v == target:
+            break
+
+        rank_v = sign * rank[v]
+        for k in range(offsets[v], offsets[v + 1]):
+            j = targets[k]
+            if not marked[j]:
+                c = costs[k]
+                heapq.heappush(heap, (sign * (lam_v + c), rank_v, arc_ids[k], v, j, c))
+
+    # Arcs balayés : ceux des sommets marqués (sauf l'arrivée) ; chaque candidat
+    # poussé a été dépilé ou reste dans le tas
+    scanned = sum(offsets[v + 1] - offsets[v] for v in (order[:-1] if order[-1] == target else order))
+    count('iterations', len(order) - 1, algorithm='dantzig', mode=mode)
+    count('arcs_scanned', scanned, algorithm='dantzig', mode=mode)
+    count('candidates', pops + len(heap), algorithm='dantzig', mode=mode)
+    return lam, pred, order
+
+
+def search_bounded(index, s, max_cost=None, max_hops=None, target=None):
+    """
+    Dantzig (min) limité au voisinage de s : coût au plus max_cost, au plus max_hops arcs
+
+    Un candidat qui dépasse une borne n'entre pas dans le tas, et l'état est
+    gardé dans des dictionnaires plutôt que dans des tableaux de la taille du
+    graphe : le coût de la recherche suit la taille du voisinage. Les coûts
+    doivent être positifs ou nuls.
+
+    Avec max_cost seul, les sommets marqués, leurs λ, leurs prédécesseurs et
+    l'ordre de marquage sont ceux de search_index. Avec max_hops, λ(v) est le
+    coût minimal des chemins de v d'au plus max_hops arcs : un sommet déjà
+    marqué peut être repris par un chemin plus cher mais plus court en arcs,
+    pour prolonger celui-ci. La recherche porte donc sur des étiquettes
+    (sommet, étiquette parente), et le meilleur chemin d'un sommet se lit avec
+    label_path (il ne prolonge pas forcément celui de son prédécesseur).
+
+    Args:
+        index: Index produit par index_graph
+        s: Position du sommet de départ
+        max_cost: Coût maximal des chemins (None : sans borne)
+        max_hops: Nombre maximal d'arcs des chemins (None : sans borne)
+        target: Position d'un sommet d'arrivée : arrêt dès qu'il est marqué
+
+    Returns:
+        tuple: (lam, best, order, labels) : λ {position: coût} des sommets
+               atteints, best {position: étiquette de son meilleur chemin},
+               order l'ordre de marquage et labels la liste des étiquettes
+               (position, étiquette parente ou -1)
+    """
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    arc_ids, rank = index['arc_ids'], index['rank']
+    infinity = float('inf')
+    if max_cost is None:
+        max_cost = infinity
+
+    lam = {s: 0}
+    best = {s: 0}
+    order = [s]
+    labels = [(s, -1)]
+    # Moins d'arcs parmi les étiquettes marquées de chaque sommet
+    hops = {s: 0}
+    heap = []
+    # Étiquette marquée à prolonger : (numéro, sommet, coût, arcs)
+    current = (0, s, 0, 0)
+    pops = scanned = 0
+
+    while True:
+        if current is not None:
+            label, u, d_u, h = current
+            if max_hops is None or h < max_hops:
+                scanned += offsets[u + 1] - offsets[u]
+                for k in range(offsets[u], offsets[u + 1]):
+                    j = targets[k]
+                    d = d_u + costs[k]
+                    if d <= max_cost and (j not in hops or (max_hops is not None and h + 1 < hops[j])):
+                        heapq.heappush(heap, (d, rank[u], arc_ids[k], label, j, h + 1))
+            current = None
+        if not heap:
+            break
+        d, _, _, parent, v, h = heapq.heappop(heap)
+        pops += 1
+        # Une étiquette n'est gardée que si elle compte moins d'arcs que les précédentes du sommet, moins chères
+        if v in hops and (max_hops is None or h >= hops[v]):
+            continue
+        hops[v] = h
+        labels.append((v, parent))
+        if v not in lam:
+            lam[v] = d
+            best[v] = len(labels) - 1
+            order.append(v)
+            if v == target:
+                break
+        current = (len(labels) - 1, v, d, h)
+
+    count('iterations', len(order) - 1, algorithm='bounded', mode='min')
+    count('arcs_scanned', scanned, algorithm='bounded', mode='min')
+    count('candidates', pops + len(heap), algorithm='bounded', mode='min')
+    return lam, best, order, labels
+
+
+def label_path(labels, label):
+    """Positions du chemin menant à une étiquette de search_bounded, du départ à son sommet"""
+    path = []
+    while label >= 0:
+        v, label = labels[label]
+        path.append(v)
+    path.reverse()
+    return path
+
+
+def dantzig_tree(graph, start, mode='min', direction='forward'):
+    """
+    Arbre de Dantzig depuis start sur les sommets internés
+
+    Returns:
+        tuple: (index, lam, pred, order), voir search_index ; avec
+               direction='reverse', pred[v] est le sommet qui suit v vers start
+
+    Avec direction='reverse', les égalités suivent l'ordre des arcs entrants de
+    l'index (par origine) et non celui de la liste d'arcs retournée par
+    reversed_graph : λ sont ceux de la référence, l'ordre de marquage et les
+    prédécesseurs peuvent différer entre chemins de même coût.
+    """
+    index = index_graph(graph)
+    view = directed_index(index, direction)
+    with phase('marking'):
+        lam, pred, order = search_index(view, index['position'][start], mode, len(graph['sommet']))
+    return index, lam, pred, order
+
+
+class MarkingOrder(Mapping):
+    """
+    Ek_steps compact : l'ordre de marquage des sommets, sans copie de E par étape
+
+    Se lit comme l'ancien dictionnaire {'E1': [...], 'E2': [...], ...} mais
+    chaque E_k n'est construit qu'à la demande, en O(k), à partir de order[:k].
+    """
+
+    def __init__(self, order):
+        self.order = order
+
+    def __getitem__(self, key):
+        if not isinstance(key, str) or not key.startswith('E') or not key[1:].isdigit():
+            raise KeyError(key)
+        k = int(key[1:])
+        if not 1 <= k <= len(self.order):
+            raise KeyError(key)
+        return self.order[:k]
+
+    def __iter__(self):
+        return (f'E{k}' for k in range(1, len(self.order) + 1))
+
+    def __len__(self):
+        return len(self.order)
+
+
+def marking_order(Ek_steps):
+    """Ordre de marquage d'un Ek_steps, compact (MarkingOrder) ou historique (dict de copies)"""
+    if isinstance(Ek_steps, MarkingOrder):
+        return Ek_steps.order
+    return Ek_steps[f'E{len(Ek_steps)}'] if Ek_steps else []
+
+
+def compact_marking(Ek_steps):
+    """Format compact des routes : E_k = order[:k] pour tout k <= cursor"""
+    order = marking_order(Ek_steps)
+    return {'order': list(order), 'cursor': len(order)}
+
+
+def tree_to_result(graph, index, start, lam, pred, order, mode='min'):
+    """
+    Convertit un arbre interné au triplet (lambda_values, predecessors, Ek_steps)
+    """
+    nodes = index['nodes']
+    lambda_values = {node: (float('inf') if mode == 'min' else float('-inf')) for node in graph['sommet']}
+    predecessors = {node: None for node in graph['sommet']}
+    lambda_values[start] = 0
+    E = [start]
+    for v in order[1:]:
+        lambda_values[nodes[v]] = lam[v]
+        predecessors[nodes[v]] = nodes[pred[v]]
+        E.append(nodes[v])
+
+    return lambda_values, predecessors, MarkingOrder(E)
+
+
+def run_bounded(graph, start, max_cost=None, max_hops=None, direction='forward'):
+    """
+    Dantzig min limité au voisinage de start (voir search_bounded), au format des fonctions init_dantzig*
+
+    Seuls les sommets atteints dans les bornes figurent dans les résultats.
+    Avec max_hops, predecessors donne le dernier arc du meilleur chemin de
+    chaque sommet ; les chemins complets se lisent avec label_path. Avec
+    direction='reverse', les chemins mènent de chaque sommet à start (voir run_dantzig).
+
+    Returns:
+        tuple: (lambda_values, predecessors, Ek_steps)
+
+    Raises:
+        ValueError: si le graphe a un arc de coût négatif
+    """
+    index = index_graph(graph)
+    if index['negative']:
+        raise ValueError("Les bornes max_cost / max_hops demandent des coûts positifs ou nuls")
+    view = directed_index(index, direction)
+    nodes = index['nodes']
+    with phase('marking'):
+        lam, best, order, labels = search_bounded(view, index['position'][start], max_cost, max_hops)
+    lambda_values = {nodes[v]: lam[v] for v in order}
+    predecessors = {start: None}
+    for v in order[1:]:
+        predecessors[nodes[v]] = nodes[labels[labels[best[v]][1]][0]]
+    return lambda_values, predecessors, MarkingOrder([nodes[v] for v in order])
+
+
+def run_dantzig(graph, start, mode='min', direction='forward'):
+    """
+    Algorithme de Dantzig indexé, au format des fonctions init_dantzig*
+
+    Args:
+        graph: Dictionnaire avec 'sommet' et 'arc'
+        start: Nœud de départ
+        mode: 'min' (plus courts chemins) ou 'max' (plus longs chemins)
+        direction: 'reverse' pour l'arbre vers start sur les arcs entrants :
+                   λ(v) est alors la distance de v à start et predecessors[v]
+                   le sommet qui suit v sur ce chemin
+
+    Returns:
+        tuple: (lambda_values, predecessors, Ek_steps)
+    """
+    index, lam, pred, order = dantzig_tree(graph, start, mode, direction)
+    with phase('tree_to_result'):
+        return tree_to_result(graph, index, start, lam, pred, order, mode)
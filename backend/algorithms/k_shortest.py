@@ -0,0 +1,220 @@
+"""
+k plus courts chemins sans boucle (algorithme de Yen) entre deux sommets
+"""
+
+import heapq
+
+try:
+    from .engine import arc_sources, count, index_graph, phase, reversed_view, search_index
+    from .bellman_ford import NegativeCycleError, spfa
+except ImportError:
+    from engine import arc_sources, count, index_graph, phase, reversed_view, search_index
+    from bellman_ford import NegativeCycleError, spfa
+
+MAX_K = 100
+
+
+def tree_to_target(graph, end):
+    """
+    Arbre des plus courts chemins vers end, calculé sur le graphe retourné
+
+    h[v] est la distance de v à end et succ[v] la case CSR de l'arc qui
+    commence le plus court chemin de v vers end (-1 si end est inaccessible).
+    Cet arbre ne dépend que de end : il peut être mis en cache et partagé par
+    toutes les requêtes vers ce sommet.
+
+    Raises:
+        NegativeCycleError: si un circuit négatif peut atteindre end
+    """
+    index = index_graph(graph)
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    t = index['position'][end]
+    reverse = reversed_view(index)
+    with phase('target_tree'):
+        if index['negative']:
+            try:
+                h, pred, _ = spfa(reverse, t)
+            except NegativeCycleError as e:
+                # Le témoin a été trouvé sur le graphe retourné
+                raise NegativeCycleError(e.cycle[::-1], e.cost) from None
+        else:
+            h, pred, _ = search_index(reverse, t, 'min')
+
+        # Dans le graphe retourné, pred[v] est le sommet qui suit v vers end
+        succ = [-1] * len(h)
+        for v, nxt in enumerate(pred):
+            if nxt >= 0:
+                succ[v] = min((k for k in range(offsets[v], offsets[v + 1]) if targets[k] == nxt),
+                              key=lambda k: costs[k])
+    return {'end': t, 'h': h, 'succ': succ}
+
+
+def _spur_path(index, tree, spur, blocked, removed):
+    """
+    Plus court chemin de spur à end évitant les sommets blocked et les arcs removed
+
+    Recherche A* guidée par h, distance exacte à end sans interdiction (donc
+    minorant). Elle s'arrête sur le premier sommet sorti du tas dont le chemin
+    de l'arbre vers end n'emprunte rien d'interdit : ce chemin atteint le
+    minorant, et il ne peut recroiser le préfixe déjà parcouru (un sommet
+    commun, sorti plus tôt, aurait arrêté la recherche).
+
+    Returns:
+        tuple: (coût, cases CSR du chemin), ou None si end est inaccessible
+    """
+    targets, offsets, costs = index['targets'], index['offsets'], index['costs']
+    sources = arc_sources(index)
+    h, succ, t = tree['h'], tree['succ'], tree['end']
+    infinity = float('inf')
+    if h[spur] == infinity:
+        return None
+
+    # Chemin de l'arbre libre depuis chaque sommet déjà examiné
+    clean = {t: True}
+
+    def tree_path_clean(x):
+        walked = []
+        v = x
+        while v not in clean:
+            walked.append(v)
+            k = succ[v]
+            if k in removed or targets[k] in blocked:
+                result = False
+                break
+            v = targets[k]
+        else:
+            result = clean[v]
+        for v in walked:
+            clean[v] = result
+        return result
+
+    dist = {spur: 0}
+    pred = {spur: -1}
+    settled = set()
+    heap = [(h[spur], 0, spur)]
+    while heap:
+        _, d, x = heapq.heappop(heap)
+        if x in settled:
+            continue
+        settled.add(x)
+        if tree_path_clean(x):
+            length = d + h[x]
+            slots = []
+            v = x
+            while pred[v] >= 0:
+                slots.append(pred[v])
+                v = sources[pred[v]]
+            slots.reverse()
+            while x != t:
+                slots.append(succ[x])
+                x = targets[succ[x]]
+            return length, slots
+        for k in range(offsets[x], offsets[x + 1]):
+            y = targets[k]
+            if y in blocked or k in removed or h[y] == infinity:
+                continue
+            d_y = d + costs[k]
+            if d_y < dist.get(y, infinity):
+                dist[y] = d_y
+                pred[y] = k
+                heapq.heappush(heap, (d_y + h[y], d_y, y))
+    return None
+
+
+def k_shortest_paths(graph, start, end, k, tree=None):
+    """
+    k plus courts chemins sans boucle de start à end (Yen)
+
+    Chaque nouveau chemin est dévié à chacun de ses sommets : la racine
+    commune est gardée, l'arc suivant des chemins déjà retenus de même racine
+    est interdit, et le reste est recherché depuis le sommet de déviation.
+    Les déviations entrent d'abord dans le tas des candidats avec un simple
+    minorant de leur coût (meilleur arc autorisé + h) ; leur recherche n'est
+    lancée que si ce minorant arrive en tête, et toutes les recherches
+    partagent l'arbre vers end (tree_to_target).
+
+    Args:
+        graph: Dictionnaire avec 'sommet' et 'arc'
+        start, end: Nœuds de départ et d'arrivée
+        k: Nombre maximal de chemins
+        tree: Arbre tree_to_target(graph, end) déjà calculé, le cas échéant
+
+    Returns:
+        list: Jusqu'à k dicts {'path', 'length'}, par coût croissant
+
+    Raises:
+        NegativeCycleError: si un circuit négatif peut atteindre end
+    """
+    index = index_graph(graph)
+    nodes, position, targets = index['nodes'], index['position'], index['targets']
+    s = position[start]
+    if tree is None:
+        tree = tree_to_target(graph, end)
+    if s == tree['end']:
+        return [{'path': [start], 'length': 0}]
+    with phase('yen'):
+        accepted, lengths, searches, counter = _yen(index, tree, s, k)
+    count('iterations', len(accepted), algorithm='yen', mode='min')
+    count('spur_searches', searches, algorithm='yen')
+    count('candidates', counter, algorithm='yen', mode='min')
+    return [
+        {'path': [start] + [nodes[targets[slot]] for slot in slots], 'length': length}
+        for slots, length in zip(accepted, lengths)
+    ]
+
+
+def _yen(index, tree, s, k):
+    """Boucle de Yen : (chemins en cases CSR, coûts, recherches de déviation lancées, candidats créés)"""
+    targets, costs = index['targets'], index['costs']
+    first = _spur_path(index, tree, s, set(), set())
+    searches = 1
+    if first is None:
+        return [], [], searches, 0
+    offsets, h = index['offsets'], tree['h']
+    infinity = float('inf')
+    accepted = [tuple(first[1])]
+    lengths = [first[0]]
+    seen = {accepted[0]}
+    # (coût ou minorant, 0 pour un chemin / 1 pour une déviation à rechercher, n°, données)
+    candidates = []
+    counter = 0
+
+    while len(accepted) < k:
+        previous = accepted[-1]
+        path = [s] + [targets[slot] for slot in previous]
+        root_cost = 0
+        blocked = set()
+        # Chemins retenus partageant la racine path[:i + 1]
+        sharing = accepted
+        for i in range(len(previous)):
+            spur = path[i]
+            removed = frozenset(p[i] for p in sharing if len(p) > i)
+            bound = min((costs[a] + h[targets[a]] for a in range(offsets[spur], offsets[spur + 1])
+                         if a not in removed and targets[a] not in blocked), default=infinity)
+            if bound < infinity:
+                counter += 1
+                heapq.heappush(candidates, (root_cost + bound, 1, counter, (previous, i, removed, root_cost)))
+            root_cost += costs[previous[i]]
+            blocked.add(spur)
+            sharing = [p for p in sharing if len(p) > i and p[i] == previous[i]]
+
+        while candidates:
+            length, pending, _, data = heapq.heappop(candidates)
+            if not pending:
+                accepted.append(data)
+                lengths.append(length)
+                break
+            root, i, removed, root_cost = data
+            root_path = [s] + [targets[slot] for slot in root[:i]]
+            found = _spur_path(index, tree, root_path[-1], set(root_path[:-1]), removed)
+            searches += 1
+            if found is not None:
+                candidate = root[:i] + tuple(found[1])
+                if candidate not in seen:
+                    seen.add(candidate)
+                    counter += 1
+                    heapq.heappush(candidates, (root_cost + found[0], 0, counter, candidate))
+        else:
+            break
+
+    return accepted, lengths, searches, counter
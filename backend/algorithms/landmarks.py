@@ -0,0 +1,100 @@
+"""
+Index de repères (ALT) : distances depuis et vers K sommets repères, pour guider les requêtes point à point
+"""
+
+import time
+from array import array
+
+try:
+    from .engine import index_graph, reversed_view, search_index
+except ImportError:
+    from engine import index_graph, reversed_view, search_index
+
+DEFAULT_LANDMARKS = 8
+
+
+def build_landmarks(graph, k=DEFAULT_LANDMARKS):
+    """
+    Choisit k repères et calcule leurs distances vers et depuis tous les sommets
+
+    Les repères sont choisis un à un le plus loin possible des précédents
+    (un sommet qu'aucun repère n'atteint passe en premier) ; chaque repère
+    coûte deux Dantzig min complets, sur le graphe puis sur le graphe retourné.
+
+    Args:
+        graph: Graphe compilé (coûts positifs ou nuls)
+        k: Nombre de repères
+
+    Returns:
+        dict: 'landmarks' (positions), 'forward' (distances repère -> sommet),
+              'backward' (sommet -> repère), 'build_seconds', 'bytes' et 'version'
+    """
+    t0 = time.perf_counter()
+    index = index_graph(graph)
+    if index['negative']:
+        raise ValueError("Repères impossibles avec des coûts négatifs")
+    n = len(index['nodes'])
+    k = max(0, min(k, n))
+    reverse = reversed_view(index)
+    infinity = float('inf')
+
+    landmarks, forward, backward = [], [], []
+    # Distance de chaque sommet au repère le plus proche
+    nearest = [infinity] * n
+    if n:
+        lam, _, _ = search_index(index, 0, 'min')
+        candidate = max(range(n), key=lambda v: lam[v] if lam[v] < infinity else -1)
+    while len(landmarks) < k:
+        lam, _, _ = search_index(index, candidate, 'min')
+        back, _, _ = search_index(reverse, candidate, 'min')
+        landmarks.append(candidate)
+        forward.append(array('d', lam))
+        backward.append(array('d', back))
+        for v in range(n):
+            if lam[v] < nearest[v]:
+                nearest[v] = lam[v]
+        chosen = set(landmarks)
+        candidate = max((v for v in range(n) if v not in chosen),
+                        key=lambda v: nearest[v], default=None)
+        if candidate is None:
+            break
+
+    return {
+        'landmarks': landmarks,
+        'forward': forward,
+        'backward': backward,
+        'build_seconds': time.perf_counter() - t0,
+        'bytes': 2 * 8 * n * len(landmarks),
+        'version': graph.get('version'),
+    }
+
+
+def landmark_bound(landmarks, t):
+    """
+    Heuristique ALT vers t : h(v) ne surestime jamais la distance de v à t
+
+    Par l'inégalité triangulaire, d(v, t) >= d(L, t) - d(L, v) et
+    d(v, t) >= d(v, L) - d(t, L) pour tout repère L. Un repère qui atteint v
+    mais pas t, ou que t atteint mais pas v, prouve que t est inaccessible
+    depuis v : h(v) vaut alors l'infini.
+    """
+    infinity = float('inf')
+    columns = [(fwd, fwd[t], bwd, bwd[t]) for fwd, bwd in zip(landmarks['forward'], landmarks['backward'])]
+
+    def bound(v):
+        best = 0
+        for fwd, fwd_t, bwd, bwd_t in columns:
+            fwd_v, bwd_v = fwd[v], bwd[v]
+            if fwd_v < infinity:
+                if fwd_t == infinity:
+                    return infinity
+                if fwd_t - fwd_v > best:
+                    best = fwd_t - fwd_v
+            if bwd_t < infinity:
+                if bwd_v == infinity:
+                    return infinity
+                if bwd_v - bwd_t > best:
+                    best = bwd_v - bwd_t
+        return best
+
+    return bound
@@ -0,0 +1,259 @@
+"""
+Requêtes point à point : plus court chemin de start à end sans marquer tout le graphe
+"""
+
+import heapq
+import math
+
+try:
+    from .engine import count, index_graph, label_path, phase, reverse_index, search_bounded, search_index
+    from .landmarks import landmark_bound
+    from .bellman_ford import search_negative
+except ImportError:
+    from engine import count, index_graph, label_path, phase, reverse_index, search_bounded, search_index
+    from landmarks import landmark_bound
+    from bellman_ford import search_negative
+
+# 'early' : marquage de Dantzig arrêté sur end (mêmes λ et chemin que le marquage complet)
+# 'bidirectional' : recherche simultanée depuis start et, sur les arcs entrants, depuis end
+# 'astar' : recherche guidée par la distance euclidienne des coordonnées x/y des nœuds
+# 'alt' : recherche guidée par les distances précalculées aux repères (voir landmarks.py)
+# 'spfa' : Bellman-Ford complet depuis start, seule méthode exacte avec des arcs négatifs
+# 'bounded' : marquage limité par max_cost / max_hops (voir engine.search_bounded)
+POINT_METHODS = ('auto', 'early', 'bidirectional', 'astar', 'alt', 'spfa', 'bounded')
+
+
+def astar_bounds(graph, index):
+    """
+    Coordonnées par position et facteur d'échelle de l'heuristique A*, mémorisés dans index['astar']
+
+    L'heuristique h(v) = échelle × distance euclidienne(v, end) ne surestime
+    jamais le coût restant si chaque arc coûte au moins échelle × sa longueur :
+    l'échelle est donc le plus petit rapport coût / longueur des arcs.
+
+    Returns:
+        tuple: (xs, ys, échelle), ou None si un sommet n'a pas de coordonnées,
+               si un coût est négatif ou si l'échelle est nulle
+    """
+    if 'astar' in index:
+        return index['astar']
+    bounds = None
+    try:
+        coordinates = graph['coordinates']
+    except KeyError:
+        coordinates = {}
+    nodes = index['nodes']
+    if coordinates and all(node in coordinates for node in nodes) and not index['negative']:
+        xs = [coordinates[node][0] for node in nodes]
+        ys = [coordinates[node][1] for node in nodes]
+        offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+        scale = math.inf
+        for u in range(len(nodes)):
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                length = math.hypot(xs[u] - xs[v], ys[u] - ys[v])
+                if length > 0:
+                    scale = min(scale, costs[k] / length)
+        if 0 < scale < math.inf:
+            bounds = (xs, ys, scale)
+    index['astar'] = bounds
+    return bounds
+
+
+def _early(index, s, t):
+    lam, pred, order = search_index(index, s, 'min', target=t)
+    return lam[t], pred, len(order)
+
+
+def _bidirectional(index, s, t):
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    reverse = reverse_index(index)
+    rev_offsets, sources, slots = reverse['offsets'], reverse['sources'], reverse['slots']
+    infinity = math.inf
+
+    # Côté 0 : depuis s sur les arcs sortants ; côté 1 : depuis t sur les arcs entrants
+    dist = ({s: 0}, {t: 0})
+    pred = ({s: -1}, {t: -1})
+    settled = (set(), set())
+    heaps = ([(0, s)], [(0, t)])
+    best, meet = infinity, -1
+
+    while heaps[0] and heaps[1]:
+        # Aucun chemin plus court ne peut encore passer par un sommet non marqué
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        d, x = heapq.heappop(heaps[side])
+        if x in settled[side]:
+            continue
+        settled[side].add(x)
+        here, there = dist[side], dist[1 - side]
+
+        if side == 0:
+            arcs = ((targets[k], costs[k]) for k in range(offsets[x], offsets[x + 1]))
+        else:
+            arcs = ((sources[r], costs[slots[r]]) for r in range(rev_offsets[x], rev_offsets[x + 1]))
+        for y, cost in arcs:
+            d_y = d + cost
+            if d_y < here.get(y, infinity):
+                here[y] = d_y
+                pred[side][y] = x
+                heapq.heappush(heaps[side], (d_y, y))
+            if y in there and d_y + there[y] < best:
+                best, meet = d_y + there[y], y
+                if side == 0:
+                    pred[0][y] = x
+                else:
+                    pred[1][y] = x
+
+    if meet < 0:
+        return infinity, None, len(settled[0]) + len(settled[1])
+    # Chemin s -> meet par les prédécesseurs avant, puis meet -> t par les successeurs arrière
+    path = [meet]
+    x = meet
+    while pred[0][x] >= 0:
+        x = pred[0][x]
+        path.append(x)
+    path.reverse()
+    x = meet
+    while pred[1][x] >= 0:
+        x = pred[1][x]
+        path.append(x)
+    return best, path, len(settled[0]) + len(settled[1])
+
+
+def _bounded(index, s, t, max_cost, max_hops):
+    lam, best, order, labels = search_bounded(index, s, max_cost, max_hops, target=t)
+    if t not in lam:
+        return math.inf, [], len(order)
+    return lam[t], label_path(labels, best[t]), len(order)
+
+
+def _euclidean_bound(bounds, t):
+    xs, ys, scale = bounds
+    tx, ty = xs[t], ys[t]
+    return lambda v: scale * math.hypot(xs[v] - tx, ys[v] - ty)
+
+
+def _astar(index, s, t, bound):
+    """A* de s à t ; bound(v) minore la distance restante de v à t (infini : t inaccessible)"""
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+    infinity = math.inf
+
+    dist = {s: 0}
+    pred = {s: -1}
+    settled = set()
+    h = bound(s)
+    if h == infinity:
+        return infinity, pred, 0
+    heap = [(h, 0, s)]
+    while heap:
+        _, d, x = heapq.heappop(heap)
+        if x in settled:
+            continue
+        settled.add(x)
+        if x == t:
+            return d, pred, len(settled)
+        for k in range(offsets[x], offsets[x + 1]):
+            y = targets[k]
+            d_y = d + costs[k]
+            if d_y < dist.get(y, infinity):
+                h = bound(y)
+                if h == infinity:
+                    continue
+                dist[y] = d_y
+                pred[y] = x
+                heapq.heappush(heap, (d_y + h, d_y, y))
+    return infinity, pred, len(settled)
+
+
+def choose_point_method(graph, method='auto', landmarks=None, bounded=False):
+    """
+    Méthode effective d'une requête point à point
+
+    'auto' prend les repères s'ils sont fournis, puis A* si tous les sommets
+    ont des coordonnées, sinon la recherche bidirectionnelle. Avec des coûts
+    négatifs, seul 'spfa' donne les vrais plus courts chemins : les autres
+    méthodes sont alors refusées. Une requête bornée (bounded) passe toujours
+    par 'bounded'.
+    """
+    if method not in POINT_METHODS:
+        raise ValueError(f"Méthode inconnue: {method}")
+    if bounded and method not in ('auto', 'bounded'):
+        raise ValueError(f"Méthode {method} impossible avec max_cost / max_hops")
+    index = index_graph(graph)
+    if method == 'auto' and bounded:
+        method = 'bounded'
+    if method == 'auto':
+        if index['negative']:
+            return 'spfa'
+        if landmarks:
+            return 'alt'
+        return 'astar' if astar_bounds(graph, index) else 'bidirectional'
+    if method != 'spfa' and index['negative']:
+        raise ValueError(f"Méthode {method} impossible avec des coûts négatifs")
+    if method == 'astar' and not astar_bounds(graph, index):
+        raise ValueError("Méthode astar impossible : coordonnées x/y absentes ou inutilisables")
+    if method == 'alt' and not landmarks:
+        raise ValueError("Méthode alt impossible : aucun index de repères à jour")
+    if method == 'bounded' and not bounded:
+        raise ValueError("Méthode bounded impossible sans max_cost ni max_hops")
+    return method
+
+
+def shortest_path_query(graph, start, end, method='auto', landmarks=None, max_cost=None, max_hops=None):
+    """
+    Plus court chemin de start à end, en s'arrêtant dès que end est atteint
+
+    Args:
+        graph: Dictionnaire avec 'sommet', 'arc' (et 'coordinates' pour A*)
+        start, end: Nœuds de départ et d'arrivée
+        method: Voir POINT_METHODS
+        landmarks: Index de repères de cette version du graphe (build_landmarks), pour 'alt'
+        max_cost: Coût maximal du chemin (méthode 'bounded')
+        max_hops: Nombre maximal d'arcs du chemin (méthode 'bounded')
+
+    Returns:
+        dict: 'method', 'length' (inf si end est inaccessible dans les bornes),
+              'path' (liste vide si inaccessible) et 'settled' (sommets marqués
+              par la recherche)
+    """
+    method = choose_point_method(graph, method, landmarks, max_cost is not None or max_hops is not None)
+    index = index_graph(graph)
+    with phase('point_to_point'):
+        result = _query(graph, index, start, end, method, landmarks, max_cost, max_hops)
+    count('settled', result['settled'], algorithm=method)
+    return result
+
+
+def _query(graph, index, start, end, method, landmarks, max_cost, max_hops):
+    nodes, position = index['nodes'], index['position']
+    s, t = position[start], position[end]
+    if s == t:
+        return {'method': method, 'length': 0, 'path': [start], 'settled': 1}
+
+    if method in ('bidirectional', 'bounded'):
+        if method == 'bidirectional':
+            length, path, settled = _bidirectional(index, s, t)
+        else:
+            length, path, settled = _bounded(index, s, t, max_cost, max_hops)
+        path = [nodes[x] for x in path] if path else []
+        return {'method': method, 'length': length, 'path': path, 'settled': settled}
+
+    if method == 'astar':
+        length, pred, settled = _astar(index, s, t, _euclidean_bound(astar_bounds(graph, index), t))
+    elif method == 'alt':
+        length, pred, settled = _astar(index, s, t, landmark_bound(landmarks, t))
+    elif method == 'spfa':
+        lam, pred, order = search_negative(index, s)
+        length, settled = lam[t], len(order)
+    else:
+        length, pred, settled = _early(index, s, t)
+    path = []
+    if length not in (math.inf, -math.inf):
+        x = t
+        while x >= 0:
+            path.append(nodes[x])
+            x = pred[x]
+        path.reverse()
+    return {'method': method, 'length': length, 'path': path, 'settled': settled}
@@ -0,0 +1,201 @@
+"""
+Étapes détaillées de l'algorithme de Dantzig, produites une à une
+"""
+
+try:
+    from .engine import index_graph
+except ImportError:
+    from engine import index_graph
+
+
+def iter_dantzig_steps(graph, start, mode='min'):
+    """
+    Générateur des étapes détaillées (format compact, conforme au format du fichier PDF)
+
+    Chaque étape ne porte que ce qui change : 'E_added' (sommets ajoutés à E)
+    et 'lambda_delta' (nouvelles valeurs λ). Au départ tous les λ valent ∞
+    (-∞ en mode max) ; le prédécesseur du sommet marqué est donné par
+    'highlight_edges'. Rejouer les étapes dans l'ordre reconstruit l'état.
+
+    Args:
+        graph: Dictionnaire avec 'sommet' et 'arc'
+        start: Nœud de départ
+        mode: 'min' ou 'max'
+
+    Yields:
+        dict: Étape compacte
+    """
+    better = (lambda a, b: a < b) if mode == 'min' else (lambda a, b: a > b)
+    index = index_graph(graph)
+    nodes, position = index['nodes'], index['position']
+    offsets, targets, costs = index['offsets'], index['targets'], index['costs']
+
+    lambda_values = {start: 0}
+    marked = {start}
+    E = [start]
+    # Sommets de E ayant encore des arcs vers des non-marqués (un sommet épuisé le reste)
+    active = [start]
+    step_number = 1
+
+    yield {
+        'step': 0,
+        'step_name': 'Initialisation',
+        'description': f'Initialisation: Poser λ({start}) = 0, E₁ = {{{start}}}',
+        'E_added': [start],
+        'lambda_delta': {start: 0},
+        'action': 'Initialisation',
+        'candidates': [],
+        'selected': None,
+        'calculations': [],
+        'highlight_edges': []
+    }
+
+    while len(E) < len(graph['sommet']):
+        candidates = []
+        calculations = []
+        all_candidates_details = []
+        still_active = []
+
+        # Phase 1: Pour chaque sommet marqué xi ∈ E, trouver xi* ∉ E avec coût optimal
+        for xi in active:
+            best_arc = None
+            node_arcs = []
+            p = position[xi]
+            for k in range(offsets[p], offsets[p + 1]):
+                v = nodes[targets[k]]
+                if v not in marked:
+                    cost = costs[k]
+                    node_arcs.append((v, cost))
+                    if best_arc is None or better(cost, best_arc[2]):
+                        best_arc = (xi, v, cost)
+
+            if best_arc:
+                still_active.append(xi)
+                u, v, cost = best_arc
+                total = lambda_values[u] + cost
+                candidates.append((total, u, v, cost))
+
+                # Détails pour l'affichage
+                calculation_text = f"De {u}: {mode}{{arcs sortants vers non-marqués}} = {v} (coût {cost})"
+                lambda_calc = f"λ({v}) = λ({u}) + {cost} = {lambda_values[u]} + {cost} = {total}"
+
+                calculations.append({
+                    'from_node': u,
+                    'available_targets': node_arcs,
+                    'selected_target': v,
+                    'edge_cost': cost,
+                    'calculation_text': calculation_text,
+                    'lambda_calculation': lambda_calc
+                })
+
+                all_candidates_details.append({
+                    'from_node': u,
+                    'to_node': v,
+                    'edge_cost': cost,
+                    'lambda_from': lambda_values[u],
+                    'total_cost': total,
+                    'calculation': lambda_calc
+                })
+        active = still_active
+
+        if not candidates:
+            yield {
+                'step': step_number,
+                'step_name': 'Terminaison',
+                'description': 'Aucun arc sortant disponible - Algorithme terminé',
+                'E_added': [],
+                'lambda_delta': {},
+                'action': 'Terminaison',
+                'candidates': [],
+                'selected': None,
+                'calculations': [],
+                'highlight_edges': []
+            }
+            return
+
+        # Phase 2: Sélectionner le candidat avec λ optimal
+        candidates.sort(reverse=(mode != 'min'))
+        best_total, best_u, best_v, best_cost = candidates[0]
+
+        yield {
+            'step': step_number,
+            'step_name': f'Étape {step_number}a - Calculs',
+            'description': f'Calculer λ pour tous les candidats depuis E{step_number}',
+            'E_added': [],
+            'lambda_delta': {},
+            'action': 'Calcul des candidats',
+            'candidates': all_candidates_details,
+            'selected': None,
+            'calculations': calculations,
+            'highlight_edges': [],
+            'reasoning': 'Comparer les valeurs λ calculées'
+        }
+
+        # Mettre à jour les valeurs
+        lambda_values[best_v] = best_total
+        marked.add(best_v)
+        E.append(best_v)
+        active.append(best_v)
+        step_number += 1
+
+        selected_detail = next(c for c in all_candidates_details
+                               if c['from_node'] == best_u and c['to_node'] == best_v)
+        totals = ", ".join(str(c['total_cost']) for c in all_candidates_details)
+
+        yield {
+            'step': step_number - 0.5,  # Étape intermédiaire
+            'step_name': f'Étape {step_number - 1}b - Sélection',
+            'description': selection_description(mode, best_v, best_total, step_number,
+                                                 f'E{step_number - 1} ∪ {{{best_v}}}'),
+            'E_added': [best_v],
+            'lambda_delta': {best_v: best_total},
+            'action': f'Marquage de {best_v}',
+            'candidates': all_candidates_details,
+            'selected': selected_detail,
+            'calculations': calculations,
+            'highlight_edges': [(best_u, best_v)],
+            'reasoning': f'{mode}{{{totals}}} = {best_total}'
+        }
+
+
+def selection_description(mode, node, total, step_number, marked):
+    """Description d'une étape de sélection, marked décrivant E{step_number} (delta ou ensemble complet)"""
+    word = 'minimum' if mode == 'min' else 'maximum'
+    return f'Sélectionner le {word}: λ({node}) = {total}, E{step_number} = {marked}'
+
+
+def collect_detailed_steps(graph, start, mode='min'):
+    """
+    Rejoue toutes les étapes et reconstruit le format complet historique
+
+    Chaque étape reçoit alors 'E_current', 'lambda_values' et 'highlight_nodes'
+    complets, et les sélections décrivent l'ensemble E entier plutôt que son
+    ajout : la taille totale croît en O(V²), à réserver aux petits graphes.
+
+    Returns:
+        tuple: (lambda_values, predecessors, detailed_steps)
+    """
+    infinity = float('inf') if mode == 'min' else float('-inf')
+    infinity_label = "∞" if mode == 'min' else "-∞"
+    lambda_values = {node: infinity for node in graph['sommet']}
+    predecessors = {node: None for node in graph['sommet']}
+    E = []
+
+    detailed_steps = []
+    for step in iter_dantzig_steps(graph, start, mode):
+        lambda_values.update(step['lambda_delta'])
+        for (u, v) in step['highlight_edges']:
+            predecessors[v] = u
+        E.extend(step['E_added'])
+
+        full_step = {key: value for key, value in step.items() if key not in ('E_added', 'lambda_delta')}
+        full_step['E_current'] = E.copy()
+        if step['selected']:
+            (node, total), = step['lambda_delta'].items()
+            full_step['description'] = selection_description(
+                mode, node, total, int(step['step'] + 0.5), '{' + ', '.join(E) + '}')
+        full_step['lambda_values'] = {k: (infinity_label if v == infinity else v) for k, v in lambda_values.items()}
+        full_step['highlight_nodes'] = [start] if step['step'] == 0 else E.copy()
+        detailed_steps.append(full_step)
+
+    return lambda_values, predecessors, detailed_steps
@@ -1,203 +1,736 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
-import sys, os
+import sys, os, json, time
+from itertools import islice
 
 # Ajouter chemins vers les modules
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'algorithms'))
-from .utils.graph_manager import save_graph_data, load_graph_data, convert_to_dantzig_format
-from .algorithms.dantMin import init_dantzig_min, init_dantzig_min_detailed, get_shortest_path, format_lambda_results as format_lambda_min
-from .algorithms.dantMax import init_dantzig_max, init_dantzig_max_detailed, get_longest_path, format_lambda_results as format_lambda_max
+from .utils.graph_manager import save_graph_data, get_graph_data, is_resident, get_compiled_graph, get_cache_stats, get_graph_stats, list_graphs, delete_graph, valid_graph_id, timed_compute, patch_graph, get_landmarks, build_graph_landmarks, landmarks_report
+from .algorithms.dantMin import MIN_ENGINES, init_dantzig_min, init_dantzig_min_detailed, iter_dantzig_min_steps, get_shortest_path, format_lambda_results as format_lambda_min
+from .algorithms.dantMax import init_dantzig_max, init_dantzig_max_detailed, iter_dantzig_max_steps, get_longest_path, format_lambda_results as format_lambda_max, MAX_ENGINES, CYCLE_WARNING, resolve_max_engine
+from .algorithms.dag import CycleError
+from .algorithms.bellman_ford import NegativeCycleError, check_negative_cycles
+from .algorithms.engine import compact_marking, index_graph
+from .algorithms.dynamic import repair_cached_trees
+from .algorithms.batch import MAX_WORKERS, run_batch
+from .algorithms.point_to_point import shortest_path_query
+from .algorithms.landmarks import DEFAULT_LANDMARKS
+from .algorithms.k_shortest import MAX_K, k_shortest_paths, tree_to_target
+from .algorithms.all_pairs import choose_method, all_pairs, greedy_sources, format_row, encode_ndjson, encode_binary
+from .utils.result_cache import result_cache
+from .utils.single_flight import single_flight
+from .utils.route_helpers import TimedJSONProvider, cached_dantzig, requested_bounds
+from .utils.metrics import registry, count, phase, start_timing, stop_timing, server_timing
+from .utils.profiler import profiler
+from .utils.weights import STRICT_WEIGHTS, validate_weights
+from .utils.change_log import PatchError
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 CORS(app)
 
+# En-tête Server-Timing sur toutes les réponses (sinon seulement si la requête envoie X-Server-Timing)
+SERVER_TIMING = os.environ.get('DANTZIG_SERVER_TIMING') == '1'
+
+# Registre des métriques, retrouvé par le serveur ASGI pour y ajouter les siennes
+app.extensions['dantzig_metrics'] = registry
+app.extensions['dantzig_resident'] = is_resident
+
+registry.gauge('dantzig_result_cache', lambda: {(('stat', k),): v for k, v in result_cache.stats().items()},
+               'Cache des résultats par source')
+registry.gauge('dantzig_coalescing', lambda: {(('stat', k),): v for k, v in single_flight.stats().items()},
+               'Calculs identiques simultanés regroupés')
+registry.gauge('dantzig_graph_cache', lambda: {
+    (('stat', k),): v for k, v in get_cache_stats().items() if isinstance(v, (int, float))
+}, 'Graphes compilés en mémoire')
+
+
+def requested_engine(allowed=MIN_ENGINES, default='heap'):
+    """Moteur demandé via ?engine= ('reference' pour comparer avec la version d'origine)"""
+    engine = request.args.get('engine', default)
+    return engine if engine in allowed else None
+
+
+run_dantzig_cached = cached_dantzig({'min': init_dantzig_min, 'max': init_dantzig_max})
+
+
+def min_tree(graph, start, engine, direction='forward'):
+    """
+    Arbre min de start (ou vers start en 'reverse'), borné par ?max_cost= / ?max_hops= s'ils sont donnés
+
+    Raises:
+        ValueError: bornes invalides ou incompatibles avec le moteur
+        NegativeCycleError: voir init_dantzig_min
+    """
+    max_cost, max_hops = requested_bounds()
+    if max_cost is None and max_hops is None:
+        return run_dantzig_cached(graph, 'min', start, engine, direction)
+    # Résultat propre aux bornes demandées : partagé entre requêtes simultanées, pas mis en cache
+    return coalesced(graph, lambda: init_dantzig_min(
+        graph, start, engine=engine, max_cost=max_cost, max_hops=max_hops, direction=direction))
+
+
+def max_tree(graph, start, engine='auto'):
+    """
+    Arbre max de start avec le moteur résolu par resolve_max_engine
+
+    Returns:
+        tuple: (lambda_values, predecessors, Ek_steps, avertissement), l'avertissement
+               ({"warning", "cycle"}, {} sinon) signalant le repli de 'auto' sur le
+               marquage glouton quand un circuit est atteignable
+
+    Raises:
+        CycleError: avec engine='dag' si un circuit est atteignable
+    """
+    engine, cycle = resolve_max_engine(graph, start, engine)
+    lambda_values, predecessors, Ek_steps = run_dantzig_cached(graph, 'max', start, engine)
+    warning = {"warning": CYCLE_WARNING, "cycle": cycle} if cycle else {}
+    return lambda_values, predecessors, Ek_steps, warning
+
+
+def coalesced(graph, compute):
+    """
+    Calcul partagé par les requêtes identiques simultanées
+
+    Deux requêtes sont identiques si elles portent sur la même version du
+    graphe, la même route et les mêmes arguments (chemin et paramètres).
+    """
+    key = (
+        graph['version'],
+        request.endpoint,
+        tuple(sorted(request.view_args.items())),
+        tuple(sorted(request.args.items(multi=True))),
+    )
+    return single_flight.do(key, lambda: timed_compute(graph, compute))
+
+
+@app.before_request
+def start_request_timer():
+    """Chronomètre la requête ; relève aussi ses phases si Server-Timing est demandé"""
+    g.request_start = time.perf_counter()
+    g.server_timing = SERVER_TIMING or 'X-Server-Timing' in request.headers
+    if g.server_timing:
+        start_timing()
+
+
+@app.after_request
+def record_request(response):
+    """Durée et statut de la requête dans /metrics, et en-tête Server-Timing si demandé"""
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    endpoint = request.endpoint or 'inconnu'
+    registry.observe('dantzig_request_seconds', elapsed, 'Durée des requêtes par route', endpoint=endpoint)
+    count('requests', endpoint=endpoint, status=response.status_code)
+    if g.server_timing:
+        timings = stop_timing() + [('total', elapsed)]
+        response.headers['Server-Timing'] = server_timing(timings)
+    return response
+
+
+@app.before_request
+def check_graph_id():
+    """Refuse les routes /graphs/<graph_id>/... dont l'identifiant ne peut pas servir de nom de fichier"""
+    graph_id = (request.view_args or {}).get('graph_id')
+    if graph_id is not None and not valid_graph_id(graph_id):
+        return jsonify({"error": "Identifiant de graphe invalide"}), 400
+
+
+def negative_cycle_error(e):
+    """Réponse 400 avec le circuit négatif témoin"""
+    return jsonify({"error": str(e), "cycle": e.cycle, "cout": e.cost}), 400
+
+
+def encode_json(payload):
+    """Corps JSON identique à celui de jsonify, réutilisable par plusieurs réponses"""
+    return app.json.dumps(payload, separators=(",", ":")) + "\n"
+
+
+def negative_steps_error(graph, start):
+    """
+    Réponse 400 si les étapes du marquage min ne donnent pas les vrais λ (arc négatif), sinon None
+
+    Avec des arcs négatifs, /dantzig-min passe par Bellman-Ford : les étapes
+    gloutonnes contrediraient son résultat. Le circuit négatif témoin est
+    renvoyé s'il y en a un d'atteignable.
+    """
+    if not index_graph(graph)['negative']:
+        return None
+    try:
+        run_dantzig_cached(graph, 'min', start)
+    except NegativeCycleError as e:
+        return negative_cycle_error(e)
+    return jsonify({"error": "Étapes de Dantzig indisponibles avec des coûts négatifs : voir /dantzig-min"}), 400
+
+
+def stream_detailed_steps(graph, mode, start, output):
+    """
+    Diffuse les étapes détaillées en NDJSON ou SSE (?offset= et ?limit= pour paginer)
+
+    Le flux commence par un en-tête (sommets, λ initial), puis une ligne par
+    étape avec ses deltas de λ, et se termine par les λ finaux.
+    """
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return jsonify({"error": "Pagination invalide"}), 400
+
+    # Résultat final calculé avant l'en-tête : une erreur ne peut plus survenir en cours de flux.
+    # En max, c'est celui de /dantzig-max (moteur 'auto'), les étapes restant celles du marquage
+    warning = {}
+    if mode == 'min':
+        lambda_values, predecessors, _ = run_dantzig_cached(graph, mode, start)
+    else:
+        lambda_values, predecessors, _, warning = max_tree(graph, start)
+    iter_steps = iter_dantzig_min_steps if mode == 'min' else iter_dantzig_max_steps
+    steps = islice(iter_steps(graph, start), offset, None if limit is None else offset + limit)
+
+    def encode(kind, payload):
+        if output == 'sse':
+            return f"event: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        return json.dumps({"type": kind, **payload}, ensure_ascii=False) + "\n"
+
+    def generate():
+        yield encode("header", {
+            "start_node": start,
+            "nodes": graph['sommet'],
+            "lambda_initial": "∞" if mode == 'min' else "-∞",
+            "offset": offset
+        })
+        for step in steps:
+            yield encode("step", step)
+        yield encode("result", {
+            "final_lambda": format_lambda_min(lambda_values) if mode == 'min'
+            else format_lambda_max(lambda_values, max_mode=True),
+            "predecessors": predecessors,
+            **warning
+        })
+
+    mimetype = 'text/event-stream' if output == 'sse' else 'application/x-ndjson'
+    return Response(generate(), mimetype=mimetype)
+
+
+def format_marking(Ek_steps):
+    """E par étape : {"order", "cursor"} avec ?format=compact, sinon une liste triée par étape"""
+    if request.args.get('format') == 'compact':
+        return compact_marking(Ek_steps)
+    return {k: sorted(v) for k, v in Ek_steps.items()}
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Endpoint de vérification de santé"""
+    return jsonify({"status": "healthy", "message": "Server is running"})
+
 
 @app.route('/save-graph', methods=['POST'])
-def save_graph():
+@app.route('/graphs/<graph_id>/save-graph', methods=['POST'])
+def save_graph(graph_id=None):
     data = request.get_json()
     if not data:
         return jsonify({"error": "Aucune donnée reçue"}), 400
-    if save_graph_data(data):
-        return jsonify({"message": "Graphe sauvegardé"})
+    weights = validate_weights(data)
+    if STRICT_WEIGHTS and weights['invalid']:
+        return jsonify({"error": "Poids illisibles", "poids": weights}), 400
+    version = save_graph_data(data, graph_id)
+    if version:
+        result_cache.clear()
+        return jsonify({"message": "Graphe sauvegardé", "version": version, "poids": weights})
     return jsonify({"error": "Erreur sauvegarde"}), 500
 
 
 @app.route('/load-graph', methods=['GET'])
-def load_graph():
-    data = load_graph_data()
+@app.route('/graphs/<graph_id>/load-graph', methods=['GET'])
+def load_graph(graph_id=None):
+    data = get_graph_data(graph_id)
     if data:
         return jsonify(data)
     return jsonify({"error": "Aucun graphe trouvé"}), 404
 
 
+@app.route('/graph/patch', methods=['POST'])
+@app.route('/graphs/<graph_id>/patch', methods=['POST'])
+def patch_graph_route(graph_id=None):
+    """
+    Applique un lot {"ops": [{"op": "add" | "update" | "delete", "node" | "edge": {...}}, ...]}
+
+    Le lot est appliqué en entier ou refusé (400), puis enregistré dans le
+    journal du graphe ; les arbres min en cache sont réparés.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        change = patch_graph(data.get('ops'), graph_id)
+    except PatchError as e:
+        return jsonify({"error": str(e), "operation": e.index}), 400
+    if change is None:
+        return jsonify({"error": "Aucun graphe trouvé"}), 404
+    report = repair_cached_trees(result_cache, get_compiled_graph(graph_id), change)
+    return jsonify({
+        "message": "Lot appliqué",
+        "version": change['version'],
+        "applied": change['applied'],
+        "structural": change['structural'],
+        "log_bytes": change['log_bytes'],
+        **report
+    })
+
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify({"graph": get_cache_stats(), "results": result_cache.stats(), "coalescing": single_flight.stats()})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Compteurs, durées par phase et par route et état des caches, au format texte de Prometheus"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/profiler', methods=['GET', 'POST'])
+def profiler_route():
+    """
+    Profileur par échantillonnage
+
+    POST {"enabled": true, "interval_ms": 5} le démarre (false l'arrête) ;
+    GET renvoie les piles relevées au format « folded » (flamegraph.pl,
+    speedscope), ou l'état du profileur avec ?format=json.
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        enabled = data.get('enabled')
+        if not isinstance(enabled, bool):
+            return jsonify({"error": "Champ 'enabled' (booléen) requis"}), 400
+        interval_ms = data.get('interval_ms')
+        if interval_ms is not None and (not isinstance(interval_ms, (int, float)) or interval_ms <= 0):
+            return jsonify({"error": "Intervalle invalide"}), 400
+        if enabled:
+            profiler.start(interval_ms / 1000 if interval_ms else None)
+        else:
+            profiler.stop()
+        return jsonify(profiler.stats())
+    if request.args.get('format') == 'json':
+        return jsonify(profiler.stats())
+    return Response(profiler.folded(), mimetype='text/plain')
+
+
+@app.route('/graphs', methods=['GET'])
+def graphs_route():
+    """Graphes enregistrés, avec leur présence en mémoire et leurs temps de chargement et de calcul"""
+    return jsonify({"graphs": {graph_id: get_graph_stats(graph_id) for graph_id in list_graphs()}})
+
+
+@app.route('/graphs/<graph_id>', methods=['DELETE'])
+def delete_graph_route(graph_id):
+    if not delete_graph(graph_id):
+        return jsonify({"error": "Graphe introuvable"}), 404
+    return jsonify({"message": "Graphe supprimé"})
+
+
 @app.route('/dantzig-min/<start>', methods=['GET'])
-def dantzig_min_route(start):
-    graph = convert_to_dantzig_format(load_graph_data())
+@app.route('/graphs/<graph_id>/dantzig-min/<start>', methods=['GET'])
+def dantzig_min_route(start, graph_id=None):
+    graph = get_compiled_graph(graph_id)
     if not graph or start not in graph['sommet']:
         return jsonify({"error": "Sommet invalide"}), 400
-    lambda_values, _, Ek_steps = init_dantzig_min(graph, start)
+    engine = requested_engine()
+    if not engine:
+        return jsonify({"error": "Moteur inconnu"}), 400
+    try:
+        lambda_values, _, Ek_steps = min_tree(graph, start, engine)
+    except NegativeCycleError as e:
+        return negative_cycle_error(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "lambda": format_lambda_min(lambda_values),
+        "E": format_marking(Ek_steps)
+    })
+
+
+@app.route('/dantzig-min-to/<end>', methods=['GET'])
+@app.route('/graphs/<graph_id>/dantzig-min-to/<end>', methods=['GET'])
+def dantzig_min_to_route(end, graph_id=None):
+    """Distance de chaque sommet à end et sommet suivant sur son plus court chemin, en un seul marquage"""
+    graph = get_compiled_graph(graph_id)
+    if not graph or end not in graph['sommet']:
+        return jsonify({"error": "Sommet invalide"}), 400
+    engine = requested_engine()
+    if not engine:
+        return jsonify({"error": "Moteur inconnu"}), 400
+    try:
+        lambda_values, successors, Ek_steps = min_tree(graph, end, engine, direction='reverse')
+    except NegativeCycleError as e:
+        return negative_cycle_error(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify({
         "lambda": format_lambda_min(lambda_values),
-        "E": {k: sorted(v) for k, v in Ek_steps.items()}
+        "suivants": successors,
+        "E": format_marking(Ek_steps)
     })
 
 
 @app.route('/dantzig-max/<start>', methods=['GET'])
-def dantzig_max_route(start):
-    graph = convert_to_dantzig_format(load_graph_data())
+@app.route('/graphs/<graph_id>/dantzig-max/<start>', methods=['GET'])
+def dantzig_max_route(start, graph_id=None):
+    graph = get_compiled_graph(graph_id)
     if not graph or start not in graph['sommet']:
         return jsonify({"error": "Sommet invalide"}), 400
-    lambda_values, _, Ek_steps = init_dantzig_max(graph, start)
+    engine = requested_engine(MAX_ENGINES, default='auto')
+    if not engine:
+        return jsonify({"error": "Moteur inconnu"}), 400
+    try:
+        lambda_values, _, Ek_steps, warning = max_tree(graph, start, engine)
+    except CycleError as e:
+        return jsonify({"error": str(e), "cycle": e.cycle}), 400
     return jsonify({
         "lambda": format_lambda_max(lambda_values, max_mode=True),
-        "E": {k: sorted(v) for k, v in Ek_steps.items()}
+        "E": format_marking(Ek_steps),
+        **warning
+    })
+
+
+@app.route('/dantzig-min/batch', methods=['POST'])
+@app.route('/dantzig-max/batch', methods=['POST'])
+@app.route('/graphs/<graph_id>/dantzig-min/batch', methods=['POST'])
+@app.route('/graphs/<graph_id>/dantzig-max/batch', methods=['POST'])
+def dantzig_batch_route(graph_id=None):
+    """Dantzig depuis une liste de départs {"starts": [...], "workers": n}, réparti sur plusieurs processus"""
+    mode = 'max' if request.url_rule.rule.endswith('/dantzig-max/batch') else 'min'
+    data = request.get_json(silent=True) or {}
+    starts = data.get('starts')
+    workers = data.get('workers')
+    graph = get_compiled_graph(graph_id)
+    if not graph or not isinstance(starts, list) or not starts or not all(isinstance(s, str) for s in starts):
+        return jsonify({"error": "Liste de sommets de départ requise"}), 400
+    if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool)
+                                or not 1 <= workers <= MAX_WORKERS):
+        return jsonify({"error": f"workers doit être un entier compris entre 1 et {MAX_WORKERS}"}), 400
+    known = set(graph['sommet'])
+    invalid = [s for s in starts if s not in known]
+    if invalid:
+        return jsonify({"error": "Sommet invalide", "invalid": invalid}), 400
+
+    try:
+        results = run_batch(graph, starts, mode, workers=workers)
+    except NegativeCycleError as e:
+        return negative_cycle_error(e)
+    return jsonify({
+        "results": {
+            start: {
+                "lambda": format_lambda_min(lambda_values) if mode == 'min'
+                else format_lambda_max(lambda_values, max_mode=True),
+                "predecessors": predecessors
+            }
+            for start, (lambda_values, predecessors) in results.items()
+        }
     })
 
 
 @app.route('/shortest-path/<start>/<end>', methods=['GET'])
-def shortest_path(start, end):
-    graph = convert_to_dantzig_format(load_graph_data())
+@app.route('/graphs/<graph_id>/shortest-path/<start>/<end>', methods=['GET'])
+def shortest_path(start, end, graph_id=None):
+    """
+    Plus court chemin (?method=auto|early|bidirectional|astar|alt|spfa|bounded, ou full pour le marquage complet)
+
+    Avec ?max_cost= ou ?max_hops=, la recherche s'arrête aux bornes : le
+    chemin rendu est le plus court parmi ceux qui les respectent.
+    """
+    graph = get_compiled_graph(graph_id)
+    if not graph or start not in graph['sommet'] or end not in graph['sommet']:
+        return jsonify({"error": "Sommet invalide"}), 400
+    engine = requested_engine()
+    if not engine:
+        return jsonify({"error": "Moteur inconnu"}), 400
+    method = request.args.get('method', 'full' if 'engine' in request.args else 'auto')
+    try:
+        max_cost, max_hops = requested_bounds()
+        bounded = max_cost is not None or max_hops is not None
+        if method == 'full' and bounded:
+            raise ValueError("Méthode full impossible avec max_cost / max_hops")
+        if method == 'full':
+            lambda_values, predecessors, _ = run_dantzig_cached(graph, 'min', start, engine)
+            return jsonify({
+                "chemin": get_shortest_path(predecessors, end),
+                "longueur": lambda_values[end]
+            })
+        landmarks = get_landmarks(graph)
+        result = coalesced(graph, lambda: shortest_path_query(graph, start, end, method, landmarks, max_cost, max_hops))
+    except NegativeCycleError as e:
+        return negative_cycle_error(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        # Sommet d'arrivée seul s'il est inaccessible, comme avec le marquage complet
+        "chemin": result['path'] or [end],
+        "longueur": result['length'],
+        "methode": result['method'],
+        "sommets_marques": result['settled']
+    })
+
+
+@app.route('/k-shortest-paths/<start>/<end>', methods=['GET'])
+@app.route('/graphs/<graph_id>/k-shortest-paths/<start>/<end>', methods=['GET'])
+def k_shortest_paths_route(start, end, graph_id=None):
+    """k plus courts chemins sans boucle de start à end (?k=, 3 par défaut)"""
+    graph = get_compiled_graph(graph_id)
     if not graph or start not in graph['sommet'] or end not in graph['sommet']:
         return jsonify({"error": "Sommet invalide"}), 400
-    lambda_values, predecessors, _ = init_dantzig_min(graph, start)
+    k = request.args.get('k', 3, type=int)
+    if not 1 <= k <= MAX_K:
+        return jsonify({"error": f"k doit être compris entre 1 et {MAX_K}"}), 400
+    try:
+        # L'arbre vers end ne dépend que de end : partagé par toutes les requêtes vers ce sommet
+        tree_key = (graph['version'], 'min-to', end, 'heap')
+        tree = single_flight.do(tree_key, lambda: result_cache.get_or_compute(
+            tree_key, lambda: timed_compute(graph, lambda: tree_to_target(graph, end))
+        ))
+        paths = coalesced(graph, lambda: k_shortest_paths(graph, start, end, k, tree))
+    except NegativeCycleError as e:
+        return negative_cycle_error(e)
     return jsonify({
-        "chemin": get_shortest_path(predecessors, end),
-        "longueur": lambda_values[end]
+        "k": k,
+        "chemins": [{"chemin": p['path'], "longueur": p['length']} for p in paths]
     })
 
 
+@app.route('/landmarks', methods=['GET', 'POST'])
+@app.route('/graphs/<graph_id>/landmarks', methods=['GET', 'POST'])
+def landmarks_route(graph_id=None):
+    """Index de repères (ALT) du graphe : GET le décrit, POST {"k": n} le (re)construit"""
+    graph = get_compiled_graph(graph_id)
+    if not graph:
+        return jsonify({"error": "Aucun graphe trouvé"}), 404
+    if request.method == 'GET':
+        landmarks = get_landmarks(graph)
+        if not landmarks:
+            return jsonify({"error": "Aucun index de repères à jour"}), 404
+        return jsonify(landmarks_report(graph, landmarks))
+
+    k = (request.get_json(silent=True) or {}).get('k', DEFAULT_LANDMARKS)
+    if not isinstance(k, int) or k < 1:
+        return jsonify({"error": "Nombre de repères invalide"}), 400
+    report = build_graph_landmarks(graph_id, k)
+    if not report:
+        return jsonify({"error": "Construction des repères impossible"}), 400
+    return jsonify(report)
+
+
 @app.route('/longest-path/<start>/<end>', methods=['GET'])
-def longest_path(start, end):
-    graph = convert_to_dantzig_format(load_graph_data())
+@app.route('/graphs/<graph_id>/longest-path/<start>/<end>', methods=['GET'])
+def longest_path(start, end, graph_id=None):
+    graph = get_compiled_graph(graph_id)
     if not graph or start not in graph['sommet'] or end not in graph['sommet']:
         return jsonify({"error": "Sommet invalide"}), 400
-    lambda_values, predecessors, _ = init_dantzig_max(graph, start)
+    engine = requested_engine(MAX_ENGINES, default='auto')
+    if not engine:
+        return jsonify({"error": "Moteur inconnu"}), 400
+    try:
+        lambda_values, predecessors, _, warning = max_tree(graph, start, engine)
+    except CycleError as e:
+        return jsonify({"error": str(e), "cycle": e.cycle}), 400
     return jsonify({
         "chemin": get_longest_path(predecessors, end),
-        "longueur": lambda_values[end]
+        "longueur": lambda_values[end],
+        **warning
     })
 
 
+@app.route('/all-pairs/<mode>', methods=['GET'])
+@app.route('/graphs/<graph_id>/all-pairs/<mode>', methods=['GET'])
+def all_pairs_route(mode, graph_id=None):
+    """Matrices λ et prédécesseurs pour tous les couples (?format=json|ndjson|binary, ?method=auto|numpy|heap)"""
+    graph = get_compiled_graph(graph_id)
+    if not graph:
+        return jsonify({"error": "Aucun graphe trouvé"}), 404
+    if mode not in ('min', 'max'):
+        return jsonify({"error": "Mode invalide"}), 400
+    output = request.args.get('format', 'json')
+    try:
+        method = choose_method(graph, mode, request.args.get('method', 'auto'))
+        if mode == 'min' and index_graph(graph)['negative']:
+            # Vérifié avant de répondre : un circuit découvert en cours de flux tronquerait la réponse
+            check_negative_cycles(index_graph(graph))
+    except NegativeCycleError as e:
+        return negative_cycle_error(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if output == 'ndjson':
+        return Response(encode_ndjson(graph, mode, method), mimetype='application/x-ndjson')
+    if output == 'binary':
+        return Response(encode_binary(graph, mode, method), mimetype='application/octet-stream')
+    if output != 'json':
+        return jsonify({"error": "Format invalide"}), 400
+
+    nodes, distances, predecessors = coalesced(graph, lambda: all_pairs(graph, mode, method))
+    rows = [format_row(nodes, row, pred) for row, pred in zip(distances, predecessors)]
+    return jsonify({
+        "mode": mode,
+        "method": method,
+        "nodes": nodes,
+        "greedy_sources": greedy_sources(graph, mode),
+        "lambda": [r['lambda'] for r in rows],
+        "predecessors": [r['predecessors'] for r in rows]
+    })
+
+
+def detailed_min_payload(graph, start):
+    """Réponse de /dantzig-min-detailed : étapes, λ finaux et chemins vers les sommets accessibles"""
+    with phase('detailed_steps'):
+        lambda_values, predecessors, detailed_steps = init_dantzig_min_detailed(graph, start)
+    
+    # Calculer les chemins vers tous les sommets accessibles
+    paths = {}
+    for node in graph['sommet']:
+        if lambda_values[node] != float('inf'):
+            paths[node] = get_shortest_path(predecessors, node)
+    
+    # Trouver le chemin minimal principal (vers le dernier sommet accessible)
+    accessible_nodes = [node for node in graph['sommet'] if lambda_values[node] != float('inf')]
+    if len(accessible_nodes) > 1:
+        # Prendre le dernier nœud accessible (excluant le nœud de départ)
+        end_node = accessible_nodes[-1] if accessible_nodes[-1] != start else accessible_nodes[-2]
+        main_path = get_shortest_path(predecessors, end_node)
+        main_path_length = lambda_values[end_node] if lambda_values[end_node] != float('inf') else "∞"
+    else:
+        main_path = [start]
+        main_path_length = 0
+    
+    return {
+        "start_node": start,
+        "final_lambda": format_lambda_min(lambda_values),
+        "detailed_steps": detailed_steps,
+        "total_steps": len(detailed_steps),
+        "paths": paths,
+        "main_path": main_path,
+        "main_path_length": main_path_length,
+        "predecessors": predecessors,
+        "graph_info": {
+            "nodes": graph['sommet'],
+            "edges": list(graph['arc'])
+        }
+    }
+
+
+def detailed_max_payload(graph, start):
+    """
+    Réponse de /dantzig-max-detailed : étapes au format du frontend, λ finaux et chemins
+
+    Les étapes sont celles du marquage ; λ finaux, prédécesseurs et chemins sont
+    ceux de /dantzig-max (moteur 'auto', avec son avertissement s'il y a repli).
+    """
+    with phase('detailed_steps'):
+        _, _, detailed_steps = init_dantzig_max_detailed(graph, start)
+    lambda_values, predecessors, _, warning = max_tree(graph, start)
+    
+    # Calculer les chemins vers tous les sommets accessibles
+    paths = {}
+    for node in graph['sommet']:
+        if lambda_values[node] != float('-inf'):
+            paths[node] = get_longest_path(predecessors, node)
+    
+    # Trouver le chemin maximal principal (vers le nœud avec la plus grande valeur lambda)
+    accessible_nodes = [node for node in graph['sommet'] if lambda_values[node] != float('-inf') and node != start]
+    if accessible_nodes:
+        # Prendre le nœud avec la plus grande valeur lambda (excluant explicitement le nœud de départ)
+        best_node = max(accessible_nodes, key=lambda n: lambda_values[n])
+        main_path = get_longest_path(predecessors, best_node)
+        main_path_length = lambda_values[best_node] if lambda_values[best_node] != float('-inf') else "-∞"
+    else:
+        main_path = [start]
+        main_path_length = 0
+    
+    # Convertir les étapes détaillées au format attendu par le frontend
+    formatted_steps = []
+    for step in detailed_steps:
+        formatted_step = {
+            "step": step['step'],
+            "title": step['step_name'],
+            "description": step['description'],
+            "lambda": step['lambda_values'],
+            "candidates": [],
+            "selected_arcs": [],
+            "calculations": []
+        }
+        
+        # Ajouter les candidats s'ils existent
+        if 'candidates' in step and step['candidates']:
+            formatted_step['candidates'] = [f"({c['from_node']}, {c['to_node']})" for c in step['candidates']]
+        
+        # Ajouter les arcs sélectionnés s'ils existent
+        if 'highlight_edges' in step and step['highlight_edges']:
+            formatted_step['selected_arcs'] = [f"({u}, {v})" for u, v in step['highlight_edges']]
+        
+        # Ajouter les calculs s'ils existent
+        if 'calculations' in step and step['calculations']:
+            formatted_step['calculations'] = [calc['lambda_calculation'] for calc in step['calculations']]
+        
+        formatted_steps.append(formatted_step)
+    
+    return {
+        "start_node": start,
+        "final_lambda": format_lambda_max(lambda_values, max_mode=True),
+        "steps": formatted_steps,
+        "total_steps": len(formatted_steps),
+        "paths": paths,
+        "main_path": main_path,
+        "main_path_length": main_path_length,
+        "predecessors": predecessors,
+        "graph_info": {
+            "nodes": graph['sommet'],
+            "edges": list(graph['arc'])
+        },
+        **warning
+    }
+
+
 @app.route('/dantzig-min-detailed/<start>', methods=['GET'])
-def dantzig_min_detailed_route(start):
-    """Route pour obtenir les calculs étape par étape de l'algorithme de Dantzig minimal"""
+@app.route('/graphs/<graph_id>/dantzig-min-detailed/<start>', methods=['GET'])
+def dantzig_min_detailed_route(start, graph_id=None):
+    """Route pour obtenir les calculs étape par étape de l'algorithme de Dantzig minimal (?stream=ndjson|sse pour diffuser)"""
     try:
-        graph = convert_to_dantzig_format(load_graph_data())
+        graph = get_compiled_graph(graph_id)
         if not graph or start not in graph['sommet']:
             return jsonify({"error": "Sommet invalide"}), 400
+        error = negative_steps_error(graph, start)
+        if error:
+            return error
         
-        lambda_values, predecessors, detailed_steps = init_dantzig_min_detailed(graph, start)
+        output = request.args.get('stream')
+        if output in ('ndjson', 'sse'):
+            return stream_detailed_steps(graph, 'min', start, output)
         
-        # Calculer les chemins vers tous les sommets accessibles
-        paths = {}
-        for node in graph['sommet']:
-            if lambda_values[node] != float('inf'):
-                paths[node] = get_shortest_path(predecessors, node)
-        
-        # Trouver le chemin minimal principal (vers le dernier sommet accessible)
-        accessible_nodes = [node for node in graph['sommet'] if lambda_values[node] != float('inf')]
-        if len(accessible_nodes) > 1:
-            # Prendre le dernier nœud accessible (excluant le nœud de départ)
-            end_node = accessible_nodes[-1] if accessible_nodes[-1] != start else accessible_nodes[-2]
-            main_path = get_shortest_path(predecessors, end_node)
-            main_path_length = lambda_values[end_node] if lambda_values[end_node] != float('inf') else "∞"
-        else:
-            main_path = [start]
-            main_path_length = 0
-        
-        return jsonify({
-            "start_node": start,
-            "final_lambda": format_lambda_min(lambda_values),
-            "detailed_steps": detailed_steps,
-            "total_steps": len(detailed_steps),
-            "paths": paths,
-            "main_path": main_path,
-            "main_path_length": main_path_length,
-            "predecessors": predecessors,
-            "graph_info": {
-                "nodes": graph['sommet'],
-                "edges": graph['arc']
-            }
-        })
+        # Réponse sérialisée une seule fois pour toutes les requêtes simultanées identiques
+        body = coalesced(graph, lambda: encode_json(detailed_min_payload(graph, start)))
+        return Response(body, mimetype=app.json.mimetype)
         
     except Exception as e:
         return jsonify({"error": f"Erreur calcul détaillé: {str(e)}"}), 500
 
 
 @app.route('/dantzig-max-detailed/<start>', methods=['GET'])
-def dantzig_max_detailed_route(start):
-    """Route pour obtenir les calculs étape par étape de l'algorithme de Dantzig maximal"""
+@app.route('/graphs/<graph_id>/dantzig-max-detailed/<start>', methods=['GET'])
+def dantzig_max_detailed_route(start, graph_id=None):
+    """Route pour obtenir les calculs étape par étape de l'algorithme de Dantzig maximal (?stream=ndjson|sse pour diffuser)"""
     try:
-        graph = convert_to_dantzig_format(load_graph_data())
+        graph = get_compiled_graph(graph_id)
         if not graph or start not in graph['sommet']:
             return jsonify({"error": "Sommet invalide"}), 400
         
-        lambda_values, predecessors, detailed_steps = init_dantzig_max_detailed(graph, start)
+        output = request.args.get('stream')
+        if output in ('ndjson', 'sse'):
+            return stream_detailed_steps(graph, 'max', start, output)
         
-        # Calculer les chemins vers tous les sommets accessibles
-        paths = {}
-        for node in graph['sommet']:
-            if lambda_values[node] != float('-inf'):
-                paths[node] = get_longest_path(predecessors, node)
-        
-        # Trouver le chemin maximal principal (vers le nœud avec la plus grande valeur lambda)
-        accessible_nodes = [node for node in graph['sommet'] if lambda_values[node] != float('-inf') and node != start]
-        if accessible_nodes:
-            # Prendre le nœud avec la plus grande valeur lambda (excluant explicitement le nœud de départ)
-            best_node = max(accessible_nodes, key=lambda n: lambda_values[n])
-            main_path = get_longest_path(predecessors, best_node)
-            main_path_length = lambda_values[best_node] if lambda_values[best_node] != float('-inf') else "-∞"
-        else:
-            main_path = [start]
-            main_path_length = 0
-        
-        # Convertir les étapes détaillées au format attendu par le frontend
-        formatted_steps = []
-        for step in detailed_steps:
-            formatted_step = {
-                "step": step['step'],
-                "title": step['step_name'],
-                "description": step['description'],
-                "lambda": step['lambda_values'],
-                "candidates": [],
-                "selected_arcs": [],
-                "calculations": []
-            }
-            
-            # Ajouter les candidats s'ils existent
-            if 'candidates' in step and step['candidates']:
-                formatted_step['candidates'] = [f"({c['from_node']}, {c['to_node']})" for c in step['candidates']]
-            
-            # Ajouter les arcs sélectionnés s'ils existent
-            if 'highlight_edges' in step and step['highlight_edges']:
-                formatted_step['selected_arcs'] = [f"({u}, {v})" for u, v in step['highlight_edges']]
-            
-            # Ajouter les calculs s'ils existent
-            if 'calculations' in step and step['calculations']:
-                formatted_step['calculations'] = [calc['lambda_calculation'] for calc in step['calculations']]
-            
-            formatted_steps.append(formatted_step)
-        
-        return jsonify({
-            "start_node": start,
-            "final_lambda": format_lambda_max(lambda_values, max_mode=True),
-            "steps": formatted_steps,
-            "total_steps": len(formatted_steps),
-            "paths": paths,
-            "main_path": main_path,
-            "main_path_length": main_path_length,
-            "predecessors": predecessors,
-            "graph_info": {
-                "nodes": graph['sommet'],
-                "edges": graph['arc']
-            }
-        })
+        body = coalesced(graph, lambda: encode_json(detailed_max_payload(graph, start)))
+        return Response(body, mimetype=app.json.mimetype)
         
     except Exception as e:
         return jsonify({"error": f"Erreur calcul détaillé maximal: {str(e)}"}), 500
 
 
 if __name__ == '__main__':
-    print("🚀 Serveur Dantzig démarré")
+    print("🚀 Serveur Dantzig démarré (développement ; en production : python -m backend.serve)")
     app.run(debug=True, host="127.0.0.1", port=5000)
@@ -0,0 +1,277 @@
+"""
+Banc d'essai des algorithmes de Dantzig et des routes Flask
+
+Exemples :
+    python backend/benchmarks/bench.py run --sizes 10,100,1000 --output results.json
+    python backend/benchmarks/bench.py compare before.json after.json --threshold 0.2
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BACKEND, 'utils'))
+sys.path.append(os.path.join(BACKEND, 'algorithms'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generators import GENERATORS, generate
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+# Budget d'opérations au-delà duquel une cible n'est pas lancée : la version de
+# référence coûte O(V²·A), les versions détaillées produisent O(V·(V + A)) données
+WORK_BUDGETS = {
+    'reference': lambda n, m: n * n * m <= 10 ** 7,
+    'detailed': lambda n, m: n * (n + m) <= 2 * 10 ** 7,
+}
+
+# Taille maximale des graphes denses (O(V²) arcs)
+DENSE_MAX_NODES = 2000
+
+
+def _algorithms():
+    from dantzig import init_dantzig
+    from dantMin import init_dantzig_min, init_dantzig_min_detailed
+    from dantMax import init_dantzig_max, init_dantzig_max_detailed
+
+    return {
+        'init_dantzig': (lambda g, s: init_dantzig(g, s), None),
+        'init_dantzig_min': (lambda g, s: init_dantzig_min(g, s), None),
+        'init_dantzig_max': (lambda g, s: init_dantzig_max(g, s), None),
+        'init_dantzig_min[reference]': (lambda g, s: init_dantzig_min(g, s, engine='reference'), 'reference'),
+        'init_dantzig_max[reference]': (lambda g, s: init_dantzig_max(g, s, engine='reference'), 'reference'),
+        'init_dantzig_min_detailed': (init_dantzig_min_detailed, 'detailed'),
+        'init_dantzig_max_detailed': (init_dantzig_max_detailed, 'detailed'),
+    }
+
+
+ROUTES = {
+    'GET /dantzig-min/<start>': ('app', '/dantzig-min/{start}', None),
+    'GET /dantzig-max/<start>': ('app', '/dantzig-max/{start}', None),
+    'GET /shortest-path/<start>/<end>': ('app', '/shortest-path/{start}/{end}', None),
+    'GET /longest-path/<start>/<end>': ('app', '/longest-path/{start}/{end}', None),
+    'GET /k-shortest-paths/<start>/<end>': ('app', '/k-shortest-paths/{start}/{end}?k=10', None),
+    'GET /dantzig-min-detailed/<start>': ('app', '/dantzig-min-detailed/{start}', 'detailed'),
+    'GET /dantzig-max-detailed/<start>': ('app', '/dantzig-max-detailed/{start}', 'detailed'),
+    'GET /dantzig/<start>': ('main', '/dantzig/{start}', None),
+}
+
+
+def measure(fn, repeat):
+    """Temps murs (s) sur repeat exécutions, puis une exécution tracée pour la mémoire"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    fn()
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'times': times,
+        'wall_time': min(times),
+        'median': statistics.median(times),
+        'peak_bytes': peak,
+        'allocated_blocks': blocks_after - blocks_before,
+    }
+
+
+def _skipped(budget, n, m):
+    return budget is not None and not WORK_BUDGETS[budget](n, m)
+
+
+def _load_apps():
+    sys.path.insert(0, os.path.dirname(BACKEND))
+    sys.path.insert(0, BACKEND)
+    import backend.app as app_module
+    import main as main_module
+    return {'app': app_module, 'main': main_module}
+
+
+def run(sizes, generators, repeat, seed, with_routes, output):
+    from graph_manager import convert_to_dantzig_format
+
+    algorithms = _algorithms()
+    apps = _load_apps() if with_routes else {}
+    workdir = tempfile.mkdtemp(prefix='dantzig-bench-')
+    results = []
+
+    try:
+        for kind in generators:
+            for n in sizes:
+                if kind == 'dense' and n > DENSE_MAX_NODES:
+                    continue
+                vis = generate(kind, n, seed=seed)
+                graph = convert_to_dantzig_format(vis)
+                start, end = graph['sommet'][0], graph['sommet'][-1]
+                nodes, edges = len(graph['sommet']), len(graph['arc'])
+                base = {'generator': kind, 'nodes': nodes, 'edges': edges}
+
+                for name, (fn, budget) in algorithms.items():
+                    if _skipped(budget, nodes, edges):
+                        continue
+                    fresh = convert_to_dantzig_format(vis)
+                    stats = measure(lambda: fn(fresh, start), repeat)
+                    results.append({'target': name, 'kind': 'algorithm', **base, **stats})
+                    print(f"{name:32} {kind:10} n={n:<7} {stats['wall_time'] * 1000:10.2f} ms")
+
+                if not with_routes:
+                    continue
+                path = os.path.join(workdir, f'{kind}-{n}.json')
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(vis, f)
+                for module in apps.values():
+                    _point_to(module, path)
+
+                for name, (which, url, budget) in ROUTES.items():
+                    if _skipped(budget, nodes, edges):
+                        continue
+                    module = apps[which]
+                    client = module.app.test_client()
+                    target = url.format(start=start, end=end)
+
+                    # Une réponse d'erreur n'est pas chronométrée : son temps ne mesure pas la route
+                    response = client.get(target)
+                    if response.status_code != 200:
+                        error = response.get_data(as_text=True)[:200]
+                        results.append({'target': name, 'kind': 'route', **base,
+                                        'status': response.status_code, 'error': error})
+                        print(f"{name:32} {kind:10} n={n:<7} ÉCHEC {response.status_code}: {error}")
+                        continue
+
+                    def call():
+                        module.result_cache.clear()
+                        response = client.get(target)
+                        response.get_data()
+                        if response.status_code != 200:
+                            raise RuntimeError(f"{target}: statut {response.status_code}")
+
+                    stats = measure(call, repeat)
+                    results.append({'target': name, 'kind': 'route', **base, 'status': 200, **stats})
+                    print(f"{name:32} {kind:10} n={n:<7} {stats['wall_time'] * 1000:10.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats écrits dans {output}")
+    return report
+
+
+def _point_to(module, path):
+    """Fait lire path aux routes d'un module Flask (app.py ou main.py)"""
+    manager = sys.modules[module.get_compiled_graph.__module__]
+    manager.GRAPH_FILE = path
+    manager.invalidate_graph_cache()
+    module.result_cache.clear()
+
+
+def compare(before_path, after_path, threshold, min_delta):
+    """
+    Compare deux fichiers de résultats et signale les régressions
+
+    Une cible régresse si son temps (minimum) ou son pic mémoire dépasse
+    l'ancien de plus de threshold (relatif) et de plus de min_delta secondes
+    pour le temps. Une route en échec (statut différent de 200) n'a pas de
+    temps : ignorée si elle échouait déjà avant, régression 'statut' sinon.
+
+    Returns:
+        list: Régressions détectées
+    """
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)
+
+    def key(r):
+        return (r['target'], r['generator'], r['nodes'])
+
+    previous = {key(r): r for r in before['results']}
+    regressions = []
+    for r in after['results']:
+        old = previous.get(key(r))
+        if not old:
+            continue
+        if 'wall_time' not in old:
+            print(f"{r['target']:32} {r['generator']:10} n={r['nodes']:<7} ignorée (échec {old['status']} avant)")
+            continue
+        if 'wall_time' not in r:
+            print(f"{r['target']:32} {r['generator']:10} n={r['nodes']:<7} RÉGRESSION statut {r['status']}")
+            regressions.append({**r, 'flags': ['statut']})
+            continue
+        time_ratio = r['wall_time'] / old['wall_time'] if old['wall_time'] else 1.0
+        memory_ratio = r['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else 1.0
+        flags = []
+        if time_ratio > 1 + threshold and r['wall_time'] - old['wall_time'] > min_delta:
+            flags.append('temps')
+        if memory_ratio > 1 + threshold:
+            flags.append('mémoire')
+        status = 'RÉGRESSION ' + '+'.join(flags) if flags else 'ok'
+        print(f"{r['target']:32} {r['generator']:10} n={r['nodes']:<7} "
+              f"temps x{time_ratio:6.2f}  mémoire x{memory_ratio:6.2f}  {status}")
+        if flags:
+            regressions.append({**r, 'time_ratio': time_ratio, 'memory_ratio': memory_ratio, 'flags': flags})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai Dantzig")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='Mesurer algorithmes et routes')
+    run_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    run_parser.add_argument('--generators', default=','.join(GENERATORS))
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--no-routes', action='store_true')
+    run_parser.add_argument('--output', default='bench_results.json')
+
+    compare_parser = sub.add_parser('compare', help='Comparer deux fichiers de résultats')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.add_argument('--threshold', type=float, default=0.2)
+    compare_parser.add_argument('--min-delta', type=float, default=0.001)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(
+            sizes=[int(s) for s in args.sizes.split(',')],
+            generators=args.generators.split(','),
+            repeat=args.repeat,
+            seed=args.seed,
+            with_routes=not args.no_routes,
+            output=args.output,
+        )
+    else:
+        regressions = compare(args.before, args.after, args.threshold, args.min_delta)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Générateurs de graphes synthétiques reproductibles, au format vis lu par convert_to_dantzig_format
+"""
+
+import math
+import random
+
+GENERATORS = ('sparse', 'dense', 'grid', 'dag', 'scale_free')
+
+
+def _vis_graph(n, arcs, rng, max_weight, coordinates=None):
+    nodes = [{'id': f'x{i}'} for i in range(n)]
+    if coordinates:
+        for node, (x, y) in zip(nodes, coordinates):
+            node['x'] = x
+            node['y'] = y
+    edges = [
+        {'id': f'e{k + 1}', 'source': f'x{u}', 'target': f'x{v}', 'label': str(rng.randint(1, max_weight))}
+        for k, (u, v) in enumerate(arcs)
+    ]
+    return {'nodes': nodes, 'edges': edges}
+
+
+def random_sparse(n, seed=0, degree=4, max_weight=20):
+    """Graphe aléatoire d'environ degree arcs sortants par sommet"""
+    rng = random.Random(seed)
+    arcs = [(rng.randrange(n), rng.randrange(n)) for _ in range(n * degree)]
+    return _vis_graph(n, [(u, v) for (u, v) in arcs if u != v], rng, max_weight)
+
+
+def dense(n, seed=0, density=0.5, max_weight=20):
+    """Graphe où chaque arc (u, v), u != v, existe avec la probabilité density"""
+    rng = random.Random(seed)
+    arcs = [(u, v) for u in range(n) for v in range(n) if u != v and rng.random() < density]
+    return _vis_graph(n, arcs, rng, max_weight)
+
+
+def grid(n, seed=0, max_weight=20):
+    """Grille carrée d'environ n sommets, arcs dans les deux sens entre voisins, coordonnées x/y"""
+    rng = random.Random(seed)
+    side = max(1, int(math.isqrt(n)))
+    arcs = []
+    for r in range(side):
+        for c in range(side):
+            i = r * side + c
+            if c + 1 < side:
+                arcs += [(i, i + 1), (i + 1, i)]
+            if r + 1 < side:
+                arcs += [(i, i + side), (i + side, i)]
+    coordinates = [(c * 100, r * 100) for r in range(side) for c in range(side)]
+    return _vis_graph(side * side, arcs, rng, max_weight, coordinates)
+
+
+def dag(n, seed=0, degree=4, max_weight=20):
+    """Graphe sans circuit : tous les arcs vont d'un sommet vers un sommet de numéro supérieur"""
+    rng = random.Random(seed)
+    arcs = []
+    for u in range(n - 1):
+        arcs.append((u, u + 1))
+        for _ in range(degree - 1):
+            arcs.append((u, rng.randrange(u + 1, n)))
+    return _vis_graph(n, arcs, rng, max_weight)
+
+
+def scale_free(n, seed=0, attach=2, max_weight=20):
+    """Graphe sans échelle (attachement préférentiel de Barabási-Albert), arcs dans les deux sens"""
+    rng = random.Random(seed)
+    targets = list(range(min(attach, n)))
+    repeated = []
+    arcs = []
+    for v in range(len(targets), n):
+        chosen = set()
+        while len(chosen) < min(attach, v):
+            chosen.add(rng.choice(repeated) if repeated else rng.choice(targets))
+        for u in chosen:
+            arcs += [(u, v), (v, u)]
+        repeated += list(chosen) + [v] * len(chosen)
+    return _vis_graph(n, arcs, rng, max_weight)
+
+
+def generate(kind, n, seed=0):
+    """Graphe vis du type demandé (voir GENERATORS)"""
+    builders = {
+        'sparse': random_sparse,
+        'dense': dense,
+        'grid': grid,
+        'dag': dag,
+        'scale_free': scale_free,
+    }
+    if kind not in builders:
+        raise ValueError(f"Générateur inconnu: {kind}")
+    return builders[kind](n, seed=seed)
@@ -4,26 +4,82 @@ Serveur Flask principal pour l'application Dantzig
 
 import sys
 import os
-from flask import Flask, request, jsonify
+import time
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
 
 # Ajouter les chemins des modules
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'algorithms'))
 
-from graph_manager import save_graph_data, load_graph_data, convert_to_dantzig_format
+from graph_manager import save_graph_data, get_graph_data, is_resident, get_compiled_graph, get_cache_stats, patch_graph, valid_graph_id, timed_compute, get_landmarks
 from dantzig import init_dantzig, get_shortest_path, format_lambda_results
+from engine import ENGINES, compact_marking
+from bellman_ford import NEGATIVE_ENGINES, NegativeCycleError
+from dynamic import repair_cached_trees
+from point_to_point import shortest_path_query
+from result_cache import result_cache
+from route_helpers import TimedJSONProvider, cached_dantzig, requested_bounds
+from metrics import registry, count, start_timing, stop_timing, server_timing
+from weights import STRICT_WEIGHTS, validate_weights
+from change_log import PatchError
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 CORS(app)
+# Registre des métriques, retrouvé par le serveur ASGI pour y ajouter les siennes
+app.extensions['dantzig_metrics'] = registry
+app.extensions['dantzig_resident'] = is_resident
+
+run_dantzig_cached = cached_dantzig({'min': init_dantzig})
+
+@app.before_request
+def start_request_timer():
+    """Chronomètre la requête ; relève aussi ses phases si elle envoie X-Server-Timing"""
+    g.request_start = time.perf_counter()
+    g.server_timing = os.environ.get('DANTZIG_SERVER_TIMING') == '1' or 'X-Server-Timing' in request.headers
+    if g.server_timing:
+        start_timing()
+
+@app.after_request
+def record_request(response):
+    """Durée et statut de la requête dans /metrics, et en-tête Server-Timing si demandé"""
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    endpoint = request.endpoint or 'inconnu'
+    registry.observe('dantzig_request_seconds', elapsed, 'Durée des requêtes par route', endpoint=endpoint)
+    count('requests', endpoint=endpoint, status=response.status_code)
+    if g.server_timing:
+        response.headers['Server-Timing'] = server_timing(stop_timing() + [('total', elapsed)])
+    return response
+
+@app.before_request
+def check_graph_id():
+    """Refuse les routes /graphs/<graph_id>/... dont l'identifiant ne peut pas servir de nom de fichier"""
+    graph_id = (request.view_args or {}).get('graph_id')
+    if graph_id is not None and not valid_graph_id(graph_id):
+        return jsonify({"error": "Identifiant de graphe invalide"}), 400
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Endpoint de vérification de santé"""
     return jsonify({"status": "healthy", "message": "Server is running"})
 
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Compteurs du cache du graphe compilé"""
+    return jsonify({"graph": get_cache_stats(), "results": result_cache.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Compteurs et durées par phase et par route, au format texte de Prometheus"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/save-graph', methods=['POST'])
-def save_graph():
+@app.route('/graphs/<graph_id>/save-graph', methods=['POST'])
+def save_graph(graph_id=None):
     """
     Sauvegarde le graphe complet (seulement lors d'une action explicite)
     """
@@ -32,21 +88,28 @@ def save_graph():
         if not data:
             return jsonify({"error": "Aucune donnée reçue"}), 400
         
-        success = save_graph_data(data)
-        if success:
-            return jsonify({"message": "Graphe sauvegardé avec succès"})
+        # Rapport de lecture des poids (refus si DANTZIG_STRICT_WEIGHTS=1 et poids illisibles)
+        weights = validate_weights(data)
+        if STRICT_WEIGHTS and weights['invalid']:
+            return jsonify({"error": "Poids illisibles", "poids": weights}), 400
+        
+        version = save_graph_data(data, graph_id)
+        if version:
+            result_cache.clear()
+            return jsonify({"message": "Graphe sauvegardé avec succès", "version": version, "poids": weights})
         else:
             return jsonify({"error": "Erreur lors de la sauvegarde"}), 500
     except Exception as e:
         return jsonify({"error": f"Erreur serveur: {str(e)}"}), 500
 
 @app.route('/load-graph', methods=['GET'])
-def load_graph():
+@app.route('/graphs/<graph_id>/load-graph', methods=['GET'])
+def load_graph(graph_id=None):
     """
     Charge les données du graphe
     """
     try:
-        data = load_graph_data()
+        data = get_graph_data(graph_id)
         if data:
             return jsonify(data)
         else:
@@ -55,128 +118,222 @@ def load_graph():
         return jsonify({"error": f"Erreur lors du chargement: {str(e)}"}), 500
 
 @app.route('/dantzig/<start>', methods=['GET'])
-def dantzig_lambda(start):
+@app.route('/graphs/<graph_id>/dantzig/<start>', methods=['GET'])
+def dantzig_lambda(start, graph_id=None, direction='forward'):
     """
     Calcule les valeurs lambda avec l'algorithme de Dantzig
     """
     try:
-        # Charger les données depuis le fichier
-        vis_data = load_graph_data()
+        # Charger les données (cache mémoire, relu seulement si le fichier change)
+        vis_data = get_graph_data(graph_id)
         if not vis_data:
             return jsonify({"error": "Aucun graphe disponible"}), 404
         
-        # Convertir au format Dantzig
-        graph = convert_to_dantzig_format(vis_data)
+        # Graphe déjà converti au format Dantzig
+        graph = get_compiled_graph(graph_id)
         if not graph:
             return jsonify({"error": "Format de graphe invalide"}), 400
         
         if start not in graph['sommet']:
             return jsonify({"error": f"Sommet '{start}' non trouvé"}), 404
         
-        # Exécuter l'algorithme
-        lambda_values, _, Ek_steps = init_dantzig(graph, start)
+        engine = request.args.get('engine', 'heap')
+        if engine not in ENGINES + NEGATIVE_ENGINES:
+            return jsonify({"error": f"Moteur '{engine}' inconnu"}), 400
+        
+        try:
+            max_cost, max_hops = requested_bounds()
+            if max_cost is None and max_hops is None:
+                lambda_values, predecessors, Ek_steps = run_dantzig_cached(graph, 'min', start, engine, direction)
+            else:
+                # Recherche limitée au voisinage de start : seuls les sommets atteints sont rendus
+                lambda_values, predecessors, Ek_steps = timed_compute(graph, lambda: init_dantzig(
+                    graph, start, engine=engine, max_cost=max_cost, max_hops=max_hops, direction=direction))
+        except NegativeCycleError:
+            raise
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         # Formater les résultats
         formatted_lambda = format_lambda_results(lambda_values)
-        sorted_Ek = {k: sorted(v) for k, v in Ek_steps.items()}
+        if request.args.get('format') == 'compact':
+            # Ordre de marquage : E_k = order[:k]
+            sorted_Ek = compact_marking(Ek_steps)
+        else:
+            sorted_Ek = {k: sorted(v) for k, v in Ek_steps.items()}
         
+        if direction == 'reverse':
+            # λ(v) : distance de v à end ; next[v] : sommet suivant vers end
+            return jsonify({
+                "lambda": formatted_lambda,
+                "E": sorted_Ek,
+                "next": predecessors,
+                "end_node": start
+            })
         return jsonify({
             "lambda": formatted_lambda,
             "E": sorted_Ek,
             "start_node": start
         })
         
+    except NegativeCycleError as e:
+        return jsonify({"error": str(e), "cycle": e.cycle, "cout": e.cost}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur calcul Dantzig: {str(e)}"}), 500
 
+@app.route('/dantzig-to/<end>', methods=['GET'])
+@app.route('/graphs/<graph_id>/dantzig-to/<end>', methods=['GET'])
+def dantzig_lambda_to(end, graph_id=None):
+    """
+    Distances de tous les sommets vers end, en un seul marquage sur les arcs entrants
+    """
+    return dantzig_lambda(end, graph_id, direction='reverse')
+
 @app.route('/shortest-path/<start>/<end>', methods=['GET'])
-def dantzig_path(start, end):
+@app.route('/graphs/<graph_id>/shortest-path/<start>/<end>', methods=['GET'])
+def dantzig_path(start, end, graph_id=None):
     """
     Trouve le plus court chemin entre deux nœuds
     """
     try:
-        # Charger les données depuis le fichier
-        vis_data = load_graph_data()
+        # Charger les données (cache mémoire, relu seulement si le fichier change)
+        vis_data = get_graph_data(graph_id)
         if not vis_data:
             return jsonify({"error": "Aucun graphe disponible"}), 404
         
-        # Convertir au format Dantzig
-        graph = convert_to_dantzig_format(vis_data)
+        # Graphe déjà converti au format Dantzig
+        graph = get_compiled_graph(graph_id)
         if not graph:
             return jsonify({"error": "Format de graphe invalide"}), 400
         
         if start not in graph['sommet'] or end not in graph['sommet']:
             return jsonify({"error": "Sommet de départ ou d'arrivée invalide"}), 404
         
-        # Exécuter l'algorithme
-        lambda_values, predecessors, _ = init_dantzig(graph, start)
+        engine = request.args.get('engine', 'heap')
+        if engine not in ENGINES + NEGATIVE_ENGINES:
+            return jsonify({"error": f"Moteur '{engine}' inconnu"}), 400
         
-        if lambda_values[end] == float('inf'):
+        # Marquage complet (?method=full ou ?engine=...) ou requête point à point arrêtée sur end
+        method = request.args.get('method', 'full' if 'engine' in request.args else 'auto')
+        try:
+            max_cost, max_hops = requested_bounds()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if method == 'full' and (max_cost is not None or max_hops is not None):
+            return jsonify({"error": "Méthode full impossible avec max_cost / max_hops"}), 400
+        if method == 'full':
+            lambda_values, predecessors, _ = run_dantzig_cached(graph, 'min', start, engine)
+            length = lambda_values[end]
+            path = get_shortest_path(predecessors, end)
+        else:
+            try:
+                landmarks = get_landmarks(graph)
+                result = timed_compute(graph, lambda: shortest_path_query(graph, start, end, method, landmarks, max_cost, max_hops))
+            except NegativeCycleError:
+                raise
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            length, path, method = result['length'], result['path'], result['method']
+        
+        if length == float('inf'):
             return jsonify({
                 "message": f"Aucun chemin trouvé de {start} à {end}",
                 "path_found": False
             }), 404
         
-        # Reconstituer le chemin
-        path = get_shortest_path(predecessors, end)
-        
         return jsonify({
             "start": start,
             "end": end,
             "chemin": path,
-            "longueur": lambda_values[end],
+            "longueur": length,
+            "method": method,
             "path_found": True
         })
         
+    except NegativeCycleError as e:
+        return jsonify({"error": str(e), "cycle": e.cycle, "cout": e.cost}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur calcul chemin: {str(e)}"}), 500
 
+@app.route('/graph/patch', methods=['POST'])
+@app.route('/graphs/<graph_id>/patch', methods=['POST'])
+def patch_graph_route(graph_id=None):
+    """
+    Applique un lot d'ajouts, modifications et suppressions de nœuds et d'arêtes :
+    {"ops": [{"op": "add" | "update" | "delete", "node" | "edge": {...}}, ...]}
+    
+    Le lot est appliqué en entier ou refusé, enregistré dans le journal du
+    graphe (sans réécrire le fichier), et les arbres déjà calculés sont réparés
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        return apply_patch(data.get('ops'), graph_id)
+    except PatchError as e:
+        return jsonify({"error": str(e), "operation": e.index}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur modification du graphe: {str(e)}"}), 500
+
+def apply_patch(ops, graph_id, message="Lot appliqué"):
+    """
+    Applique le lot puis répare les arbres de plus courts chemins en cache
+    """
+    change = patch_graph(ops, graph_id)
+    if change is None:
+        return jsonify({"error": "Aucun graphe trouvé"}), 404
+    
+    # Réparer seulement les sous-arbres concernés dans les résultats en cache
+    report = repair_cached_trees(result_cache, get_compiled_graph(graph_id), change)
+    
+    return jsonify({
+        "message": message,
+        "version": change['version'],
+        "applied": change['applied'],
+        "structural": change['structural'],
+        "log_bytes": change['log_bytes'],
+        **report
+    })
+
 @app.route('/update-node', methods=['POST'])
-def update_node():
+@app.route('/graphs/<graph_id>/update-node', methods=['POST'])
+def update_node(graph_id=None):
     """
-    Met à jour un nœud spécifique (sans sauvegarder tout le graphe)
+    Met à jour un nœud (lot d'une seule opération, voir /graph/patch)
     """
     try:
         data = request.get_json()
-        node_id = data.get('id')
-        
-        # Charger le graphe actuel
-        graph_data = load_graph_data()
         
-        # Trouver et mettre à jour le nœud
-        for node in graph_data['nodes']:
-            if node['id'] == node_id:
-                node.update(data)
-                break
+        graph = get_compiled_graph(graph_id)
+        if not graph or data.get('id') not in graph['node_index']:
+            return jsonify({"error": f"Nœud '{data.get('id')}' non trouvé"}), 404
         
-        return jsonify({"message": "Nœud mis à jour temporairement"})
+        return apply_patch([{"op": "update", "node": data}], graph_id, "Nœud mis à jour")
         
+    except PatchError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur mise à jour nœud: {str(e)}"}), 500
 
 @app.route('/update-edge', methods=['POST'])
-def update_edge():
+@app.route('/graphs/<graph_id>/update-edge', methods=['POST'])
+def update_edge(graph_id=None):
     """
-    Met à jour une arête spécifique (sans sauvegarder tout le graphe)
+    Met à jour une arête (lot d'une seule opération, voir /graph/patch)
+    et répare les arbres de plus courts chemins déjà calculés
     """
     try:
         data = request.get_json()
-        edge_id = data.get('id')
-        
-        # Charger le graphe actuel
-        graph_data = load_graph_data()
         
-        # Trouver et mettre à jour l'arête
-        for edge in graph_data['edges']:
-            if edge['id'] == edge_id:
-                edge.update(data)
-                break
+        graph = get_compiled_graph(graph_id)
+        if not graph or data.get('id') not in graph['edge_index']:
+            return jsonify({"error": f"Arête '{data.get('id')}' non trouvée"}), 404
         
-        return jsonify({"message": "Arête mise à jour temporairement"})
+        return apply_patch([{"op": "update", "edge": data}], graph_id, "Arête mise à jour")
         
+    except PatchError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur mise à jour arête: {str(e)}"}), 500
 
 if __name__ == '__main__':
-    print("🚀 Démarrage du serveur Dantzig...")
+    print("🚀 Démarrage du serveur Dantzig (développement ; en production : python -m backend.serve --app main)...")
     app.run(debug=True, host='127.0.0.1', port=5000)
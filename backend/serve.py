@@ -0,0 +1,322 @@
+"""
+Point d'entrée de production : application ASGI autour de l'application Flask
+
+Les routes légères (santé, statistiques, lecture d'un graphe déjà en
+mémoire) sont servies directement sur la boucle d'événements ; les autres,
+qui lancent les algorithmes ou chargent un graphe, passent par un pool de
+threads borné, avec délai maximal par réponse et refus (429) quand trop de
+requêtes attendent déjà. Une réponse diffusée n'avance qu'au rythme du client :
+le thread de calcul attend dès que STREAM_BUFFER morceaux restent à envoyer.
+
+Exemples :
+    python -m backend.serve --workers 4 --port 5000
+    uvicorn backend.serve:application --workers 4
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Routes Flask (nom de la fonction de vue) assez rapides pour ne jamais bloquer la boucle
+CHEAP_ENDPOINTS = ('health_check', 'cache_stats', 'graphs_route', 'metrics', 'profiler_route')
+# Routes légères seulement si le graphe est en mémoire et à jour : sinon elles le chargent
+RESIDENT_ENDPOINTS = ('load_graph',)
+
+WORKER_THREADS = int(os.environ.get('DANTZIG_WORKER_THREADS', os.cpu_count() or 1))
+# Requêtes admises dans le pool (en cours + en attente) avant de répondre 429
+MAX_PENDING = int(os.environ.get('DANTZIG_MAX_PENDING', 4 * WORKER_THREADS))
+REQUEST_TIMEOUT = float(os.environ.get('DANTZIG_REQUEST_TIMEOUT', 30))
+# Morceaux de réponse en attente d'envoi au-delà desquels le thread de calcul est bloqué
+STREAM_BUFFER = int(os.environ.get('DANTZIG_STREAM_BUFFER', 16))
+
+
+def load_flask_app(name='app'):
+    """Application Flask servie : 'app' (backend/app.py) ou 'main' (backend/main.py)"""
+    if name == 'main':
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import main
+        return main.app
+    if name != 'app':
+        raise ValueError(f"Application inconnue: {name}")
+    from .app import app
+    return app
+
+
+def wsgi_environ(scope, body):
+    """Environnement WSGI d'une requête HTTP ASGI"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': str(client[0]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    environ.setdefault('CONTENT_LENGTH', str(len(body)))
+    return environ
+
+
+def call_wsgi(wsgi_app, environ, emit, cancelled=None):
+    """
+    Exécute une requête WSGI et transmet la réponse morceau par morceau
+
+    emit reçoit ('start', (statut, en-têtes)), puis ('body', octets) pour
+    chaque morceau non vide, enfin ('end', None) ; ou ('error', exception).
+
+    Args:
+        cancelled: threading.Event vérifié entre deux morceaux ; une fois posé, le
+                   corps est fermé (ce qui arrête un générateur de flux) sans 'end'
+    """
+    try:
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [status, headers]
+
+        body = wsgi_app(environ, start_response)
+        try:
+            emit('start', tuple(response))
+            for chunk in body:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                if chunk:
+                    emit('body', chunk)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        emit('end', None)
+    except Exception as e:
+        emit('error', e)
+
+
+class DantzigASGI:
+    """
+    Application ASGI : routes légères sur la boucle, calculs dans un pool de threads borné
+
+    Args:
+        wsgi_app: Application Flask (ou toute application WSGI)
+        workers: Taille du pool de calcul
+        max_pending: Requêtes en cours ou en attente au-delà desquelles répondre 429
+        timeout: Délai (s) accordé à toute la réponse : au-delà, 504 si rien n'a encore
+                 été envoyé, sinon le corps est clos ; la diffusion est alors interrompue
+        stream_buffer: Morceaux en attente d'envoi avant de bloquer le thread de calcul
+    """
+
+    def __init__(self, wsgi_app, workers=WORKER_THREADS, max_pending=MAX_PENDING, timeout=REQUEST_TIMEOUT,
+                 stream_buffer=STREAM_BUFFER):
+        self.wsgi_app = wsgi_app
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.stream_buffer = stream_buffer
+        self._pool = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+        registry = getattr(wsgi_app, 'extensions', {}).get('dantzig_metrics')
+        if registry is not None:
+            registry.gauge('dantzig_asgi', lambda: {(('stat', k),): v for k, v in self.stats().items()},
+                           'Pool de calcul du serveur ASGI')
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='dantzig')
+        return self._pool
+
+    def is_cheap(self, scope):
+        """Vrai pour les requêtes servies sur la boucle (routes légères et pré-vérifications CORS)"""
+        if scope['method'] == 'OPTIONS':
+            return True
+        adapter = self.wsgi_app.url_map.bind('localhost')
+        try:
+            endpoint, view_args = adapter.match(scope['path'], method=scope['method'])
+        except Exception:
+            # 404 / 405 : Flask répond sans rien calculer
+            return True
+        if endpoint in RESIDENT_ENDPOINTS:
+            is_resident = self.wsgi_app.extensions.get('dantzig_resident')
+            return is_resident is not None and is_resident(view_args.get('graph_id'))
+        return endpoint in CHEAP_ENDPOINTS
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        environ = wsgi_environ(scope, body)
+
+        if self.is_cheap(scope):
+            messages = []
+            call_wsgi(self.wsgi_app, environ, lambda kind, data: messages.append((kind, data)))
+            started = False
+            for kind, data in messages:
+                await self._send(send, kind, data, started)
+                started = started or kind == 'start'
+            return
+
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                admitted = False
+            else:
+                self.pending += 1
+                admitted = True
+        if not admitted:
+            await self._send_error(send, 429, "Serveur surchargé, réessayez plus tard", [(b'retry-after', b'1')])
+            return
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.stream_buffer)
+        cancelled = threading.Event()
+
+        def emit(kind, data):
+            # Contre-pression : le thread de calcul attend qu'une place se libère
+            if not cancelled.is_set():
+                asyncio.run_coroutine_threadsafe(queue.put((kind, data)), loop).result()
+
+        future = self.pool.submit(call_wsgi, self.wsgi_app, environ, emit, cancelled)
+        # La place n'est rendue qu'à la fin réelle du calcul, même après un 504
+        future.add_done_callback(lambda _: self._release())
+
+        deadline = loop.time() + self.timeout
+        started = False
+        try:
+            while True:
+                try:
+                    kind, data = await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    with self._lock:
+                        self.timed_out += 1
+                    if started:
+                        print(f"Réponse tronquée après {self.timeout:g} s", file=sys.stderr)
+                        await self._send(send, 'end', None)
+                    else:
+                        await self._send_error(send, 504, f"Calcul interrompu après {self.timeout:g} s")
+                    return
+                await self._send(send, kind, data, started)
+                if kind in ('end', 'error'):
+                    return
+                started = started or kind == 'start'
+        finally:
+            # Délai dépassé ou client parti : le flux s'arrête au prochain morceau,
+            # et la file est vidée pour débloquer un emit en attente
+            cancelled.set()
+            while not queue.empty():
+                queue.get_nowait()
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+            }
+
+    async def _send(self, send, kind, data, started=False):
+        """Relaie un message de call_wsgi ; une erreur après l'en-tête clôt seulement le corps"""
+        if kind == 'start':
+            status, headers = data
+            await send({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+            })
+        elif kind == 'body':
+            await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+        elif kind == 'end':
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        else:
+            print(f"Erreur WSGI: {data!r}", file=sys.stderr)
+            if started:
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            else:
+                await self._send_error(send, 500, "Erreur interne du serveur")
+
+    async def _send_error(self, send, status, message, headers=()):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())] + list(headers),
+        })
+        await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+# Application chargée par les workers uvicorn (DANTZIG_FLASK_APP=app|main)
+application = DantzigASGI(load_flask_app(os.environ.get('DANTZIG_FLASK_APP', 'app')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serveur Dantzig (ASGI)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=1, help='Processus uvicorn')
+    parser.add_argument('--app', choices=('app', 'main'), default=os.environ.get('DANTZIG_FLASK_APP', 'app'))
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("uvicorn n'est pas installé : pip install uvicorn")
+    os.environ['DANTZIG_FLASK_APP'] = args.app
+    print(f"🚀 Serveur Dantzig (ASGI) sur http://{args.host}:{args.port}, {args.workers} processus")
+    uvicorn.run('backend.serve:application', host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Fixtures communes : stockage des graphes dans un dossier temporaire
+"""
+
+import os
+import sys
+
+import pytest
+
+# Le paquet backend s'importe depuis la racine du dépôt
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.utils import graph_manager  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def graphs_dir(tmp_path, monkeypatch):
+    """Dossier des graphes (et fichiers du graphe par défaut) propre à chaque test, cache vidé"""
+    monkeypatch.setattr(graph_manager, 'GRAPHS_DIR', str(tmp_path / 'graphs'))
+    monkeypatch.setattr(graph_manager, 'GRAPH_FILE', str(tmp_path / 'graph_data.json'))
+    monkeypatch.setattr(graph_manager, 'GRAPH_BIN_FILE', str(tmp_path / 'graph_data.bin'))
+    graph_manager.invalidate_graph_cache()
+    yield tmp_path / 'graphs'
+    graph_manager.invalidate_graph_cache()
+
+
+@pytest.fixture(params=['json', 'binary'])
+def storage(request, monkeypatch):
+    """Stockage actif, chaque test étant joué sur les deux"""
+    monkeypatch.setattr(graph_manager, 'STORAGE', request.param)
+    return request.param
+
+
+@pytest.fixture
+def vis_data():
+    """Petit graphe vis : x1 → x2 → x3 et un raccourci x1 → x3"""
+    return {
+        'nodes': [{'id': 'x1'}, {'id': 'x2'}, {'id': 'x3'}],
+        'edges': [
+            {'id': 'e1', 'source': 'x1', 'target': 'x2', 'label': '2'},
+            {'id': 'e2', 'source': 'x2', 'target': 'x3', 'label': '3'},
+            {'id': 'e3', 'source': 'x1', 'target': 'x3', 'label': '9'},
+        ],
+    }
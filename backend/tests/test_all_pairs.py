@@ -0,0 +1,53 @@
+"""
+Tous les couples : choix de la méthode selon la densité, lignes max exactes sans circuit
+"""
+
+import pytest
+
+from backend.algorithms import all_pairs as ap
+from backend.algorithms.dag import longest_path_dag
+from backend.algorithms.engine import index_graph
+from backend.benchmarks.generators import generate
+from backend.utils.graph_manager import convert_to_dantzig_format
+
+np = pytest.importorskip('numpy')
+
+
+def _graph(kind, n, seed=1):
+    return convert_to_dantzig_format(generate(kind, n, seed=seed))
+
+
+def test_auto_method_follows_density(monkeypatch):
+    monkeypatch.setattr(ap, 'NUMPY_SMALL_NODES', 50)
+    sparse, dense = _graph('sparse', 1000), _graph('dense', 200)
+    index = index_graph(sparse)
+    assert len(index['targets']) * ap.NUMPY_DENSITY < len(index['nodes']) ** 2
+    assert ap.choose_method(sparse, 'min') == 'heap'
+    assert ap.choose_method(dense, 'min') == 'numpy'
+    assert ap.choose_method(_graph('sparse', 40), 'min') == 'numpy'
+    assert ap.choose_method(dense, 'max') == 'heap'
+
+
+@pytest.mark.parametrize('kind', ['sparse', 'grid'])
+def test_floyd_warshall_matches_heap(kind):
+    graph = _graph(kind, 120)
+    # Les prédécesseurs peuvent différer entre chemins de même longueur
+    assert ap.all_pairs(graph, 'min', 'numpy')[:2] == ap.all_pairs(graph, 'min', 'heap')[:2]
+
+
+def test_max_rows_are_exact_on_dag():
+    graph = _graph('dag', 80)
+    nodes, distances, _ = ap.all_pairs(graph, 'max')
+    assert ap.greedy_sources(graph, 'max') == []
+    for source, row in zip(nodes, distances):
+        lam = longest_path_dag(graph, source)[0]
+        assert row == [lam[node] for node in nodes]
+
+
+def test_greedy_sources_are_those_reaching_a_cycle(vis_data):
+    vis_data['edges'].append({'id': 'e4', 'source': 'x3', 'target': 'x2', 'label': '1'})
+    vis_data['nodes'].append({'id': 'x0'})
+    vis_data['edges'].append({'id': 'e5', 'source': 'x3', 'target': 'x0', 'label': '1'})
+    graph = convert_to_dantzig_format(vis_data)
+    assert ap.greedy_sources(graph, 'max') == ['x1', 'x2', 'x3']
+    assert ap.greedy_sources(graph, 'min') == []
@@ -0,0 +1,84 @@
+"""
+Sauvegarde atomique : compteur de générations, échec sans effet et écrivains concurrents
+"""
+
+import os
+import stat
+import threading
+
+import pytest
+
+from backend.utils import graph_manager as gm
+
+
+def test_generations_count_up(tmp_path):
+    path = str(tmp_path / 'f.json')
+    assert [gm.atomic_save(path, lambda f, i=i: f.write(b'%d' % i)) for i in range(3)] == [1, 2, 3]
+    with open(path, 'rb') as f:
+        assert f.read() == b'2'
+    with open(f'{path}.lock') as f:
+        assert f.read() == '3'
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = str(tmp_path / 'f.json')
+    gm.atomic_save(path, lambda f: f.write(b'old'))
+
+    def broken(f):
+        f.write(b'partial')
+        raise RuntimeError('disque plein')
+
+    with pytest.raises(RuntimeError):
+        gm.atomic_save(path, broken)
+    with open(path, 'rb') as f:
+        assert f.read() == b'old'
+    assert sorted(os.listdir(tmp_path)) == ['f.json', 'f.json.lock']
+    assert gm.atomic_save(path, lambda f: f.write(b'new')) == 2
+
+
+def test_file_mode_is_kept(tmp_path):
+    path = str(tmp_path / 'f.json')
+    gm.atomic_save(path, lambda f: f.write(b'a'))
+    os.chmod(path, 0o600)
+    gm.atomic_save(path, lambda f: f.write(b'b'))
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_concurrent_writers_get_distinct_generations(tmp_path):
+    path = str(tmp_path / 'f.json')
+    generations = []
+
+    def save(i):
+        generations.append(gm.atomic_save(path, lambda f: f.write(b'%d' % i)))
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(generations) == list(range(1, 9))
+
+
+def test_save_graph_data_returns_generation(storage, vis_data):
+    assert gm.save_graph_data(vis_data, 'g') == 1
+    first = gm.get_compiled_graph('g')['version']
+
+    vis_data['edges'][0]['label'] = '4'
+    assert gm.save_graph_data(vis_data, 'g') == 2
+    graph = gm.get_compiled_graph('g')
+    assert graph['version'] != first
+    assert ('x1', 'x2', 4) in list(graph['arc'])
+
+
+def test_reader_keeps_mapped_file_across_save(vis_data, monkeypatch):
+    monkeypatch.setattr(gm, 'STORAGE', 'binary')
+    gm.save_graph_data(vis_data, 'g')
+    old = gm.get_compiled_graph('g')
+
+    vis_data['nodes'].append({'id': 'x4'})
+    gm.save_graph_data(vis_data, 'g')
+
+    # Le fichier remplacé reste lisible par qui l'a mappé
+    assert old['sommet'] == ['x1', 'x2', 'x3']
+    assert list(old['arc'])[0] == ('x1', 'x2', 2)
+    assert gm.get_compiled_graph('g')['sommet'] == ['x1', 'x2', 'x3', 'x4']
@@ -0,0 +1,100 @@
+"""
+Lots de départs : pool de processus identique au calcul en place, segment partagé toujours libéré
+"""
+
+from multiprocessing import shared_memory
+
+import pytest
+
+from backend.algorithms import batch
+from backend.algorithms.dantMax import init_dantzig_max
+from backend.algorithms.dantMin import init_dantzig_min
+from backend.algorithms.engine import index_graph
+from backend.benchmarks.generators import generate
+from backend.utils.graph_manager import convert_to_dantzig_format
+
+SharedMemory = shared_memory.SharedMemory
+
+
+@pytest.fixture
+def pool_workers(monkeypatch):
+    """Pool de 3 processus même sur une machine à un seul cœur, arrêté après le test"""
+    monkeypatch.setattr(batch, 'MAX_WORKERS', 3)
+    monkeypatch.setattr(batch, '_pool', None)
+    yield 3
+    if batch._pool is not None:
+        batch._pool.shutdown(wait=True)
+
+
+@pytest.fixture
+def segments(monkeypatch):
+    """Noms des segments créés par share_index"""
+    created = []
+    share_index = batch.share_index
+
+    def recording(index):
+        segment, layout = share_index(index)
+        created.append(segment.name)
+        return segment, layout
+
+    monkeypatch.setattr(batch, 'share_index', recording)
+    return created
+
+
+def _released(name):
+    try:
+        SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return True
+    return False
+
+
+@pytest.mark.parametrize('mode', ['min', 'max'])
+def test_pool_matches_in_process(pool_workers, segments, mode):
+    graph = convert_to_dantzig_format(generate('sparse', 200, seed=7))
+    starts = graph['sommet'][:10]
+    assert len(starts) >= batch.MIN_PARALLEL_STARTS
+
+    pooled = batch.run_batch(graph, starts, mode, workers=pool_workers)
+    assert len(segments) == 1 and _released(segments[0])
+    assert pooled == batch.run_batch(graph, starts, mode, workers=1)
+
+    single = init_dantzig_min if mode == 'min' else init_dantzig_max
+    for start in starts[:3]:
+        assert pooled[start] == single(graph, start, engine='heap')[:2]
+
+
+def test_segment_released_when_pool_fails(pool_workers, segments, monkeypatch):
+    def broken_pool():
+        raise RuntimeError('pool indisponible')
+
+    monkeypatch.setattr(batch, 'get_pool', broken_pool)
+    graph = convert_to_dantzig_format(generate('sparse', 50, seed=1))
+    with pytest.raises(RuntimeError):
+        batch.run_batch(graph, graph['sommet'][:10], workers=pool_workers)
+    assert len(segments) == 1 and _released(segments[0])
+
+
+def test_segment_released_when_copy_fails(monkeypatch):
+    created = []
+
+    def recording(*args, **kwargs):
+        segment = SharedMemory(*args, **kwargs)
+        created.append(segment.name)
+        return segment
+
+    class Unreadable:
+        format, itemsize = 'i', 4
+
+        def __len__(self):
+            return 3
+
+        def tobytes(self):
+            raise MemoryError
+
+    monkeypatch.setattr(batch.shared_memory, 'SharedMemory', recording)
+    index = dict(index_graph(convert_to_dantzig_format(generate('sparse', 20, seed=1))))
+    index['rank'] = Unreadable()
+    with pytest.raises(MemoryError):
+        batch.share_index(index)
+    assert len(created) == 1 and _released(created[0])
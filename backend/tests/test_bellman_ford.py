@@ -0,0 +1,125 @@
+"""
+Arcs négatifs : SPFA et passes NumPy comparés à Bellman-Ford naïf, circuits absorbants, repli automatique
+"""
+
+import random
+
+import pytest
+
+from backend.algorithms.bellman_ford import (
+    NegativeCycleError, bellman_ford, bellman_ford_numpy, check_negative_cycles, spfa,
+)
+from backend.algorithms.dantMin import init_dantzig_min
+from backend.algorithms.engine import index_graph
+from backend.benchmarks.generators import generate
+from backend.utils.graph_manager import convert_to_dantzig_format
+
+np = pytest.importorskip('numpy')
+
+SEARCHES = [spfa, bellman_ford_numpy]
+
+
+def _negative_dag(seed):
+    """Graphe sans circuit dont un arc sur trois est négatif : plus courts chemins définis"""
+    vis = generate('dag', 60, seed=seed)
+    rng = random.Random(seed)
+    for edge in vis['edges']:
+        if rng.random() < 1 / 3:
+            edge['label'] = str(-int(edge['label']))
+    return convert_to_dantzig_format(vis)
+
+
+def _graph(arcs):
+    nodes = sorted({u for u, _, _ in arcs} | {v for _, v, _ in arcs})
+    return convert_to_dantzig_format({
+        'nodes': [{'id': node} for node in nodes],
+        'edges': [{'id': str(i), 'source': u, 'target': v, 'label': str(c)} for i, (u, v, c) in enumerate(arcs)],
+    })
+
+
+def _brute_force(graph, start):
+    """Bellman-Ford naïf : V - 1 passes sur tous les arcs"""
+    lam = {node: float('inf') for node in graph['sommet']}
+    lam[start] = 0
+    for _ in range(len(graph['sommet']) - 1):
+        for (u, v, cost) in graph['arc']:
+            if lam[u] + cost < lam[v]:
+                lam[v] = lam[u] + cost
+    return lam
+
+
+def _assert_cycle(graph, error):
+    costs = {(u, v): c for (u, v, c) in graph['arc']}
+    cycle = error.cycle
+    assert cycle[0] == cycle[-1]
+    assert sum(costs[(u, v)] for u, v in zip(cycle, cycle[1:])) == error.cost < 0
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_negative_arcs_match_brute_force(search, seed):
+    graph = _negative_dag(seed)
+    index = index_graph(graph)
+    assert index['negative']
+    start = graph['sommet'][0]
+    lam, pred, order = search(index, index['position'][start])
+
+    nodes = index['nodes']
+    assert {nodes[v]: lam[v] for v in range(len(nodes))} == _brute_force(graph, start)
+    assert order[0] == index['position'][start]
+    assert [lam[v] for v in order[1:]] == sorted(lam[v] for v in order[1:])
+    # Arcs parallèles possibles : λ(v) - λ(u) doit être le coût de l'un d'eux
+    costs = {}
+    for (u, v, c) in graph['arc']:
+        costs.setdefault((u, v), set()).add(c)
+    for v, u in enumerate(pred):
+        if u >= 0:
+            assert lam[v] - lam[u] in costs[(nodes[u], nodes[v])]
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+def test_reachable_negative_cycle_is_reported(search):
+    graph = _graph([('a', 'b', 1), ('b', 'c', 2), ('c', 'b', -5), ('c', 'd', 1)])
+    index = index_graph(graph)
+    with pytest.raises(NegativeCycleError) as raised:
+        search(index, index['position']['a'])
+    _assert_cycle(graph, raised.value)
+    assert set(raised.value.cycle) == {'b', 'c'}
+    assert raised.value.cost == -3
+
+
+def test_unreachable_cycle_only_found_by_check():
+    graph = _graph([('a', 'b', 1), ('c', 'd', 2), ('d', 'c', -4)])
+    lam, _, _ = bellman_ford(graph, 'a')
+    assert lam == {'a': 0, 'b': 1, 'c': float('inf'), 'd': float('inf')}
+
+    for method in ('spfa', 'numpy'):
+        with pytest.raises(NegativeCycleError) as raised:
+            check_negative_cycles(index_graph(graph), method)
+        _assert_cycle(graph, raised.value)
+    check_negative_cycles(index_graph(_negative_dag(1)))
+
+
+def test_reverse_cycle_follows_arc_direction():
+    graph = _graph([('b', 'c', 2), ('c', 'b', -5), ('c', 'z', 1)])
+    with pytest.raises(NegativeCycleError) as raised:
+        bellman_ford(graph, 'z', direction='reverse')
+    _assert_cycle(graph, raised.value)
+
+
+def test_init_dantzig_min_falls_back_to_bellman_ford():
+    # Le marquage glouton fixerait λ(b) = 2 avant de découvrir a → c → b = 3 - 2
+    graph = _graph([('a', 'b', 2), ('a', 'c', 3), ('c', 'b', -2)])
+    lam, pred, _ = init_dantzig_min(graph, 'a')
+    assert lam == {'a': 0, 'b': 1, 'c': 3}
+    assert pred['b'] == 'c'
+    assert init_dantzig_min(graph, 'a', engine='reference')[0]['b'] == 2
+
+    graph = _negative_dag(2)
+    start = graph['sommet'][0]
+    lam, pred, _ = init_dantzig_min(graph, start)
+    assert (lam, pred) == bellman_ford(graph, start)[:2]
+    assert lam == _brute_force(graph, start)
+
+    with pytest.raises(NegativeCycleError):
+        init_dantzig_min(_graph([('a', 'b', 1), ('b', 'a', -2)]), 'a')
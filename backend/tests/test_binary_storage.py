@@ -0,0 +1,89 @@
+"""
+Format binaire DZG1 : aller-retour de l'index CSR, des sections inverses et des données vis
+"""
+
+import json
+
+import pytest
+
+from backend.algorithms.dantMin import init_dantzig_min
+from backend.utils import graph_manager as gm
+
+
+def _arrays(index):
+    arrays = {name: list(index[name]) for name in gm.BINARY_ARRAYS}
+    arrays.update({f'reverse_{name}': list(index['reverse'][name]) for name in gm.REVERSE_ARRAYS})
+    return arrays
+
+
+@pytest.mark.parametrize('label, code', [('5', 'q'), ('2.5', 'd')])
+def test_round_trip(tmp_path, vis_data, label, code):
+    vis_data['edges'][2]['label'] = label
+    path = str(tmp_path / 'g.bin')
+    gm.write_binary_graph(path, vis_data)
+    compiled = gm.convert_to_dantzig_format(vis_data)
+    mapped = gm.load_binary_graph(path)
+
+    assert isinstance(mapped, gm.MappedGraph)
+    assert mapped['sommet'] == compiled['sommet']
+    assert list(mapped['arc']) == list(compiled['arc'])
+    assert _arrays(mapped['index']) == _arrays(compiled['index'])
+    assert mapped['index']['costs'].format == code
+    assert mapped['index']['negative'] is False
+    assert mapped['weights'] == compiled['weights']
+    assert mapped.vis_data() == vis_data
+
+
+def test_undeclared_endpoints_and_negative_costs(tmp_path, vis_data):
+    vis_data['edges'].append({'id': 'e4', 'source': 'x3', 'target': 'x9', 'label': '-1'})
+    path = str(tmp_path / 'g.bin')
+    gm.write_binary_graph(path, vis_data)
+    mapped = gm.load_binary_graph(path)
+
+    # x9 n'est pas déclaré : interné dans l'index, absent de 'sommet'
+    assert mapped['sommet'] == ['x1', 'x2', 'x3']
+    assert mapped['index']['nodes'] == ['x1', 'x2', 'x3', 'x9']
+    assert mapped['index']['negative'] is True
+
+
+@pytest.mark.parametrize('direction', ['forward', 'reverse'])
+def test_mapped_graph_gives_same_trees(tmp_path, vis_data, direction):
+    path = str(tmp_path / 'g.bin')
+    gm.write_binary_graph(path, vis_data)
+    mapped = gm.load_binary_graph(path)
+    compiled = gm.convert_to_dantzig_format(vis_data)
+
+    start = 'x1' if direction == 'forward' else 'x3'
+    expected = init_dantzig_min(compiled, start, direction=direction)[:2]
+    assert init_dantzig_min(mapped, start, direction=direction)[:2] == expected
+    assert expected[0]['x3' if direction == 'forward' else 'x1'] == 5
+
+
+def test_invalid_or_missing_file(tmp_path):
+    path = tmp_path / 'g.bin'
+    assert gm.load_binary_graph(str(path)) is None
+    path.write_bytes(b'NOPE' + bytes(16))
+    assert gm.load_binary_graph(str(path)) is None
+
+
+def test_import_and_export_json(tmp_path, graphs_dir, vis_data, monkeypatch):
+    monkeypatch.setattr(gm, 'STORAGE', 'binary')
+    graphs_dir.mkdir()
+    json_path = tmp_path / 'g.json'
+    json_path.write_text(json.dumps(vis_data), encoding='utf-8')
+    gm.import_graph_json(str(json_path), gm._graph_paths('g')[1])
+
+    assert gm.get_graph_data('g') == vis_data
+    assert isinstance(gm.get_compiled_graph('g'), gm.MappedGraph)
+
+    exported = tmp_path / 'export.json'
+    gm.export_graph_json(str(exported), 'g')
+    assert json.loads(exported.read_text(encoding='utf-8')) == vis_data
+
+
+def test_binary_storage_imports_lone_json(vis_data, monkeypatch):
+    gm.save_graph_data(vis_data, 'g')
+    monkeypatch.setattr(gm, 'STORAGE', 'binary')
+
+    assert isinstance(gm.get_compiled_graph('g'), gm.MappedGraph)
+    assert gm.get_graph_data('g') == vis_data
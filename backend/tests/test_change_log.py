@@ -0,0 +1,114 @@
+"""
+Journal des lots : relecture filtrée par signature, rejeu au chargement et compactage
+"""
+
+import os
+
+from backend.utils import graph_manager as gm
+from backend.utils.change_log import append_log, read_log
+
+BASE = (11, 22, 33)
+OTHER_BASE = (11, 22, 44)
+UPDATE_E3 = [{'op': 'update', 'edge': {'id': 'e3', 'label': '1'}}]
+ADD_X4 = [{'op': 'add', 'node': {'id': 'x4'}},
+          {'op': 'add', 'edge': {'id': 'e4', 'source': 'x3', 'target': 'x4', 'label': '5'}}]
+
+
+def test_read_log_keeps_batches_of_base(tmp_path):
+    path = str(tmp_path / 'g.log')
+    append_log(path, BASE, UPDATE_E3)
+    append_log(path, OTHER_BASE, ADD_X4)
+    size = append_log(path, BASE, ADD_X4)
+
+    assert read_log(path, BASE) == (size, [UPDATE_E3, ADD_X4])
+    assert read_log(path, OTHER_BASE) == (size, [ADD_X4])
+    assert read_log(path, (1, 2, 3)) == (size, [])
+
+
+def test_read_log_ignores_partial_last_line(tmp_path):
+    path = str(tmp_path / 'g.log')
+    append_log(path, BASE, UPDATE_E3)
+    with open(path, 'ab') as f:
+        f.write(b'{"base":[11,22,33],"ops":[{"op"')
+
+    size, batches = read_log(path, BASE)
+    assert batches == [UPDATE_E3]
+    assert size == os.path.getsize(path)
+
+    # L'ajout suivant clôt la ligne incomplète au lieu de s'y coller
+    append_log(path, BASE, ADD_X4)
+    assert read_log(path, BASE)[1] == [UPDATE_E3, ADD_X4]
+
+
+def test_read_log_missing_file(tmp_path):
+    assert read_log(str(tmp_path / 'absent.log'), BASE) == (0, [])
+
+
+def test_patch_is_replayed_after_reload(storage, vis_data):
+    gm.save_graph_data(vis_data, 'g')
+    gm.patch_graph(UPDATE_E3, 'g')
+    gm.patch_graph(ADD_X4, 'g')
+    patched = gm.get_graph_data('g')
+
+    gm.invalidate_graph_cache()
+    assert gm.get_graph_data('g') == patched
+    assert gm.load_graph_data('g') == patched
+    graph = gm.get_compiled_graph('g')
+    assert graph['sommet'] == ['x1', 'x2', 'x3', 'x4']
+    assert ('x1', 'x3', 1) in list(graph['arc'])
+
+
+def test_log_of_replaced_file_is_not_replayed(storage, vis_data):
+    gm.save_graph_data(vis_data, 'g')
+    gm.patch_graph(ADD_X4, 'g')
+    patched = gm.get_graph_data('g')
+
+    # Compactage interrompu : fichier réécrit avec les lots, journal resté en place
+    gm._write_storage('g', patched)
+    assert os.path.exists(gm._log_path('g'))
+
+    gm.invalidate_graph_cache()
+    data = gm.get_graph_data('g')
+    assert [node['id'] for node in data['nodes']] == ['x1', 'x2', 'x3', 'x4']
+    assert [edge['id'] for edge in data['edges']] == ['e1', 'e2', 'e3', 'e4']
+
+
+def test_save_discards_log(storage, vis_data):
+    gm.save_graph_data(vis_data, 'g')
+    gm.patch_graph(ADD_X4, 'g')
+
+    gm.save_graph_data(vis_data, 'g')
+    assert not os.path.exists(gm._log_path('g'))
+    gm.invalidate_graph_cache()
+    assert gm.get_graph_data('g') == vis_data
+
+
+def test_compact_graph_rewrites_file_and_keeps_version(storage, vis_data):
+    gm.save_graph_data(vis_data, 'g')
+    gm.patch_graph(UPDATE_E3, 'g')
+    gm.patch_graph(ADD_X4, 'g')
+    version = gm.get_compiled_graph('g')['version']
+    patched = gm.get_graph_data('g')
+
+    assert gm.compact_graph('g') == 2
+    assert not os.path.exists(gm._log_path('g'))
+    assert gm.get_compiled_graph('g')['version'] == version
+    assert gm.load_graph_data('g') == patched
+    assert gm.compact_graph('g') is None
+
+
+def test_cost_patch_leaves_previous_entry_untouched(storage, vis_data):
+    gm.save_graph_data(vis_data, 'g')
+    before = gm.get_compiled_graph('g')
+    arcs, data = list(before['arc']), gm.get_graph_data('g')
+    labels = [edge['label'] for edge in data['edges']]
+
+    change = gm.patch_graph(UPDATE_E3, 'g')
+    after = gm.get_compiled_graph('g')
+
+    assert not change['structural']
+    assert after is not before and type(after) is type(before)
+    assert list(before['arc']) == arcs
+    assert [edge['label'] for edge in data['edges']] == labels
+    assert after['arc'][2] == ('x1', 'x3', 1)
+    assert after['version'] == change['version'] != before['version']
@@ -0,0 +1,78 @@
+"""
+Réparation incrémentale des arbres min comparée à un recalcul complet
+"""
+
+import random
+
+import pytest
+
+from backend.algorithms.dantMax import init_dantzig_max
+from backend.algorithms.dantMin import init_dantzig_min
+from backend.algorithms.dynamic import repair_cached_trees, repair_tree
+from backend.algorithms.engine import run_dantzig, update_arc_cost
+from backend.utils import graph_manager as gm
+from backend.utils.result_cache import ResultCache
+
+INF = float('inf')
+
+
+def _check_against_fresh(graph, nodes, repaired):
+    fresh = run_dantzig({'sommet': nodes, 'arc': list(graph['arc'])}, 'x0')
+    lam, pred, Ek = repaired
+    assert lam == fresh[0]
+    for v, p in pred.items():
+        if p is not None:
+            assert any(u == p and w == v and lam[p] + c == lam[v] for (u, w, c) in graph['arc'])
+    order = Ek.order
+    assert order[0] == 'x0'
+    assert sorted(order) == sorted(v for v in nodes if fresh[0][v] < INF)
+    assert [lam[v] for v in order] == sorted(lam[v] for v in order)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_repair_matches_recomputation(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        n = rng.randint(2, 12)
+        nodes = [f'x{i}' for i in range(n)]
+        graph = {'sommet': nodes, 'arc': [(rng.choice(nodes), rng.choice(nodes), rng.randint(0, 9))
+                                          for _ in range(rng.randint(1, 30))]}
+        result = run_dantzig(graph, 'x0')
+        for _ in range(4):
+            changes = []
+            for i in rng.sample(range(len(graph['arc'])), min(2, len(graph['arc']))):
+                old = graph['arc'][i]
+                new = old[:2] + (rng.randint(0, 9),)
+                graph['arc'][i] = new
+                update_arc_cost(graph, i, new[2])
+                changes.append((old, new))
+            result, touched = repair_tree(graph, result, changes)
+            assert touched <= n
+            _check_against_fresh(graph, nodes, result)
+
+
+def test_negative_cost_asks_for_recomputation():
+    graph = {'sommet': ['x0', 'x1'], 'arc': [('x0', 'x1', 3)]}
+    result = run_dantzig(graph, 'x0')
+    graph['arc'][0] = ('x0', 'x1', -1)
+    update_arc_cost(graph, 0, -1)
+    assert repair_tree(graph, result, [(('x0', 'x1', 3), ('x0', 'x1', -1))]) == (None, 0)
+
+
+def test_cached_trees_follow_a_patch(vis_data):
+    gm.save_graph_data(vis_data, 'g')
+    graph = gm.get_compiled_graph('g')
+    cache = ResultCache()
+    for start in ('x1', 'x2'):
+        cache.put((graph['version'], 'min', start, 'heap'), init_dantzig_min(graph, start))
+    cache.put((graph['version'], 'max', 'x1', 'heap'), init_dantzig_max(graph, 'x1', engine='heap'))
+
+    change = gm.patch_graph([{'op': 'update', 'edge': {'id': 'e3', 'label': '1'}}], 'g')
+    updated = gm.get_compiled_graph('g')
+    report = repair_cached_trees(cache, updated, change)
+
+    assert report['trees_repaired'] == 2 and report['trees_dropped'] == 1
+    for start in ('x1', 'x2'):
+        repaired = cache.get((change['version'], 'min', start, 'heap'))
+        assert repaired[:2] == init_dantzig_min(updated, start)[:2]
+    assert cache.get((change['version'], 'max', 'x1', 'heap')) is None
@@ -0,0 +1,93 @@
+"""
+k plus courts chemins (Yen) comparés à l'énumération de tous les chemins élémentaires
+"""
+
+import random
+
+import pytest
+
+from backend.algorithms.bellman_ford import NegativeCycleError
+from backend.algorithms.k_shortest import k_shortest_paths, tree_to_target
+from backend.utils.graph_manager import convert_to_dantzig_format
+
+
+def _random_graph(rng, n, m, low=0):
+    """Graphe sans arcs parallèles ni boucles, coûts entiers dans [low, 9]"""
+    nodes = [f'x{i}' for i in range(n)]
+    pairs = {(u, v) for u in nodes for v in nodes if u != v}
+    chosen = rng.sample(sorted(pairs), min(m, len(pairs)))
+    return convert_to_dantzig_format({
+        'nodes': [{'id': node} for node in nodes],
+        'edges': [{'id': str(i), 'source': u, 'target': v, 'label': str(rng.randint(low, 9))}
+                  for i, (u, v) in enumerate(chosen)],
+    })
+
+
+def _all_simple_paths(graph, start, end):
+    """Tous les chemins élémentaires de start à end, avec leur coût"""
+    out = {}
+    for (u, v, cost) in graph['arc']:
+        out.setdefault(u, []).append((v, cost))
+    found = []
+
+    def walk(path, length):
+        u = path[-1]
+        if u == end:
+            found.append((length, path))
+            return
+        for v, cost in out.get(u, []):
+            if v not in path:
+                walk(path + [v], length + cost)
+
+    walk([start], 0)
+    return found
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_matches_enumeration(seed):
+    rng = random.Random(seed)
+    graph = _random_graph(rng, 7, 20)
+    costs = {(u, v): c for (u, v, c) in graph['arc']}
+    start, end = 'x0', 'x6'
+    expected = _all_simple_paths(graph, start, end)
+
+    for k in (1, 3, 10, 100):
+        paths = k_shortest_paths(graph, start, end, k)
+        assert [p['length'] for p in paths] == sorted(length for length, _ in expected)[:k]
+        assert len({tuple(p['path']) for p in paths}) == len(paths)
+        for p in paths:
+            assert p['path'][0] == start and p['path'][-1] == end
+            assert len(set(p['path'])) == len(p['path'])
+            assert p['length'] == sum(costs[(u, v)] for u, v in zip(p['path'], p['path'][1:]))
+
+
+def test_shared_target_tree_and_negative_arcs():
+    rng = random.Random(9)
+    graph = _random_graph(rng, 6, 14)
+    tree = tree_to_target(graph, 'x5')
+    assert k_shortest_paths(graph, 'x0', 'x5', 5, tree=tree) == k_shortest_paths(graph, 'x0', 'x5', 5)
+
+    # Arcs négatifs sans circuit : l'arbre vers end passe par Bellman-Ford
+    dag = convert_to_dantzig_format({
+        'nodes': [{'id': n} for n in 'abcd'],
+        'edges': [{'id': str(i), 'source': u, 'target': v, 'label': str(c)}
+                  for i, (u, v, c) in enumerate([('a', 'b', 4), ('b', 'd', -3), ('a', 'c', 1), ('c', 'd', 1), ('a', 'd', 3)])],
+    })
+    assert [p['length'] for p in k_shortest_paths(dag, 'a', 'd', 5)] == [1, 2, 3]
+
+    cyclic = convert_to_dantzig_format({
+        'nodes': [{'id': n} for n in 'abc'],
+        'edges': [{'id': str(i), 'source': u, 'target': v, 'label': str(c)}
+                  for i, (u, v, c) in enumerate([('a', 'b', 1), ('b', 'a', -2), ('b', 'c', 1)])],
+    })
+    with pytest.raises(NegativeCycleError):
+        k_shortest_paths(cyclic, 'a', 'c', 3)
+
+
+def test_unreachable_end_gives_no_path():
+    graph = convert_to_dantzig_format({
+        'nodes': [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}],
+        'edges': [{'id': 'e', 'source': 'a', 'target': 'b', 'label': '1'}],
+    })
+    assert k_shortest_paths(graph, 'a', 'c', 3) == []
+    assert k_shortest_paths(graph, 'a', 'a', 3)[0] == {'path': ['a'], 'length': 0}
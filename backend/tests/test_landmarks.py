@@ -0,0 +1,45 @@
+"""
+Repères ALT : distances exactes et minorant admissible, comparés aux arbres complets
+"""
+
+import pytest
+
+from backend.algorithms.dantMin import init_dantzig_min
+from backend.algorithms.landmarks import build_landmarks, landmark_bound
+from backend.benchmarks.generators import generate
+from backend.utils.graph_manager import convert_to_dantzig_format
+
+INF = float('inf')
+
+
+@pytest.mark.parametrize('kind', ['sparse', 'grid', 'scale_free'])
+def test_distances_and_bound_are_exact_and_admissible(kind):
+    vis = generate(kind, 80, seed=5)
+    vis['nodes'].append({'id': 'isole'})
+    graph = convert_to_dantzig_format(vis)
+    landmarks = build_landmarks(graph, 4)
+    nodes = graph['sommet']
+    assert len(landmarks['landmarks']) == 4 and len(set(landmarks['landmarks'])) == 4
+
+    for L, forward, backward in zip(landmarks['landmarks'], landmarks['forward'], landmarks['backward']):
+        lam = init_dantzig_min(graph, nodes[L])[0]
+        back = init_dantzig_min(graph, nodes[L], direction='reverse')[0]
+        assert list(forward) == [lam[node] for node in nodes]
+        assert list(backward) == [back[node] for node in nodes]
+
+    for t in range(0, len(nodes), 9):
+        to_t = init_dantzig_min(graph, nodes[t], direction='reverse')[0]
+        bound = landmark_bound(landmarks, t)
+        for v, node in enumerate(nodes):
+            # Jamais au-dessus de la vraie distance ; infini seulement si t est inaccessible
+            assert bound(v) <= to_t[node]
+
+
+def test_negative_costs_and_small_graphs():
+    vis = generate('dag', 10, seed=1)
+    graph = convert_to_dantzig_format(vis)
+    assert len(build_landmarks(graph, 50)['landmarks']) == len(graph['sommet'])
+
+    vis['edges'][0]['label'] = '-2'
+    with pytest.raises(ValueError):
+        build_landmarks(convert_to_dantzig_format(vis))
@@ -0,0 +1,83 @@
+"""
+Routes max : moteur 'auto' (DAG exact ou repli glouton signalé) et cohérence des routes détaillées
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from backend.app import app
+from backend.utils import graph_manager as gm
+from backend.utils.result_cache import result_cache
+
+GRAPH_DATA = os.path.join(os.path.dirname(__file__), '..', 'graph_data.json')
+
+
+@pytest.fixture
+def client():
+    result_cache.clear()
+    yield app.test_client()
+    result_cache.clear()
+
+
+@pytest.fixture
+def shipped_graph():
+    """Graphe livré avec le dépôt : circuit x8 → x7 → x8 atteignable depuis x1"""
+    shutil.copy(GRAPH_DATA, gm.GRAPH_FILE)
+    gm.invalidate_graph_cache()
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def test_auto_falls_back_to_greedy_with_warning(client, shipped_graph):
+    response = client.get('/dantzig-max/x1')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['warning']
+    assert body['cycle'][0] == body['cycle'][-1]
+    assert set(body['cycle']) == {'x7', 'x8'}
+
+    heap = client.get('/dantzig-max/x1?engine=heap').get_json()
+    assert body['lambda'] == heap['lambda']
+    assert 'warning' not in heap
+
+    path = client.get('/longest-path/x1/x16')
+    assert path.status_code == 200
+    assert path.get_json()['cycle'] == body['cycle']
+
+
+def test_dag_engine_stays_strict(client, shipped_graph):
+    response = client.get('/dantzig-max/x1?engine=dag')
+    assert response.status_code == 400
+    assert set(response.get_json()['cycle']) == {'x7', 'x8'}
+
+
+def test_detailed_routes_agree_with_dantzig_max(client, shipped_graph):
+    expected = client.get('/dantzig-max/x1').get_json()
+
+    detailed = client.get('/dantzig-max-detailed/x1').get_json()
+    assert detailed['final_lambda'] == expected['lambda']
+    assert detailed['cycle'] == expected['cycle']
+
+    result = _ndjson(client.get('/dantzig-max-detailed/x1?stream=ndjson'))[-1]
+    assert result['final_lambda'] == expected['lambda']
+    assert result['cycle'] == expected['cycle']
+
+
+def test_auto_is_exact_on_acyclic_graph(client, vis_data):
+    # x1 → x2 → x3 (2 + 10) l'emporte sur l'arc direct x1 → x3 (9)
+    vis_data['edges'][1]['label'] = '10'
+    gm.save_graph_data(vis_data)
+
+    body = client.get('/dantzig-max/x1').get_json()
+    assert 'warning' not in body
+    assert body['lambda'] == client.get('/dantzig-max/x1?engine=dag').get_json()['lambda']
+    assert client.get('/longest-path/x1/x3').get_json() == {'chemin': ['x1', 'x2', 'x3'], 'longueur': 12}
+
+    detailed = client.get('/dantzig-max-detailed/x1').get_json()
+    assert detailed['final_lambda'] == body['lambda']
+    assert 'warning' not in detailed
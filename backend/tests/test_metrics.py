@@ -0,0 +1,19 @@
+"""
+Phases relevées par Server-Timing : la sérialisation de toutes les routes JSON
+"""
+
+import pytest
+
+from backend.app import app
+from backend.utils import graph_manager as gm
+from backend.utils.result_cache import result_cache
+
+
+@pytest.mark.parametrize('url', ['/dantzig-min/x1', '/shortest-path/x1/x3', '/dantzig-min-detailed/x1', '/cache-stats'])
+def test_every_json_route_times_serialization(vis_data, url):
+    gm.save_graph_data(vis_data)
+    result_cache.clear()
+    response = app.test_client().get(url, headers={'X-Server-Timing': '1'})
+    assert response.status_code == 200
+    phases = [item.split(';')[0].strip() for item in response.headers['Server-Timing'].split(',')]
+    assert phases.count('serialize') == 1
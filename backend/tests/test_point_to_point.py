@@ -0,0 +1,79 @@
+"""
+Requêtes point à point : chaque méthode comparée à l'arbre complet de Dantzig
+"""
+
+import pytest
+
+from backend.algorithms.dantMin import init_dantzig_min
+from backend.algorithms.landmarks import build_landmarks
+from backend.algorithms.point_to_point import choose_point_method, shortest_path_query
+from backend.benchmarks.generators import generate
+from backend.utils.graph_manager import convert_to_dantzig_format
+
+INF = float('inf')
+
+
+def _grid():
+    vis = generate('grid', 100, seed=4)
+    vis['nodes'].append({'id': 'isole', 'x': 5000, 'y': 5000})
+    return convert_to_dantzig_format(vis)
+
+
+def _check_path(graph, result, expected):
+    assert result['length'] == expected
+    if expected == INF:
+        assert result['path'] == []
+        return
+    costs = {}
+    for (u, v, c) in graph['arc']:
+        costs[(u, v)] = min(c, costs.get((u, v), INF))
+    assert sum(costs[(u, v)] for u, v in zip(result['path'], result['path'][1:])) == expected
+
+
+@pytest.mark.parametrize('method', ['early', 'bidirectional', 'astar', 'alt', 'spfa'])
+def test_methods_match_full_tree(method):
+    graph = _grid()
+    landmarks = build_landmarks(graph, 4) if method == 'alt' else None
+    start = graph['sommet'][0]
+    lam = init_dantzig_min(graph, start)[0]
+    full_settled = sum(1 for value in lam.values() if value < INF)
+
+    for end in graph['sommet'][::7] + ['isole']:
+        result = shortest_path_query(graph, start, end, method, landmarks)
+        assert result['method'] == method
+        _check_path(graph, result, lam[end])
+        if method == 'early' and lam[end] < INF:
+            assert result['settled'] <= full_settled
+
+
+def test_bounded_queries_respect_bounds():
+    graph = _grid()
+    start, end = graph['sommet'][0], graph['sommet'][55]
+    exact = init_dantzig_min(graph, start)[0][end]
+
+    result = shortest_path_query(graph, start, end, max_cost=exact)
+    assert result['method'] == 'bounded'
+    _check_path(graph, result, exact)
+    assert shortest_path_query(graph, start, end, max_cost=exact - 1)['length'] == INF
+
+    hops = init_dantzig_min(graph, start, max_hops=4)[0]
+    within = next(node for node in graph['sommet'] if node in hops and node != start)
+    result = shortest_path_query(graph, start, within, max_hops=4)
+    assert result['length'] == hops[within] and len(result['path']) <= 5
+
+
+def test_auto_method_choice():
+    graph = _grid()
+    assert choose_point_method(graph) == 'astar'
+    assert choose_point_method(graph, landmarks=build_landmarks(graph, 2)) == 'alt'
+    plain = convert_to_dantzig_format(generate('sparse', 30, seed=1))
+    assert choose_point_method(plain) == 'bidirectional'
+    with pytest.raises(ValueError):
+        choose_point_method(plain, 'astar')
+
+    negative = generate('dag', 20, seed=1)
+    negative['edges'][0]['label'] = '-1'
+    negative = convert_to_dantzig_format(negative)
+    assert choose_point_method(negative) == 'spfa'
+    with pytest.raises(ValueError):
+        choose_point_method(negative, 'bidirectional')
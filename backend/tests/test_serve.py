@@ -0,0 +1,104 @@
+"""
+Serveur ASGI : contre-pression des flux, délai sur toute la réponse, erreur après l'en-tête
+"""
+
+import asyncio
+import threading
+import time
+
+from flask import Flask, Response
+
+from backend.serve import DantzigASGI
+
+
+def _flask_app(produced, closed):
+    app = Flask(__name__)
+
+    @app.route('/stream')
+    def stream():
+        def generate():
+            try:
+                for i in range(200):
+                    produced.append(i)
+                    time.sleep(0.005)
+                    yield b'x' * 10
+            finally:
+                closed.set()
+        return Response(generate())
+
+    @app.route('/broken')
+    def broken():
+        def generate():
+            yield b'debut'
+            raise RuntimeError('panne')
+        return Response(generate())
+
+    @app.route('/slow')
+    def slow():
+        time.sleep(0.3)
+        return 'fini'
+
+    return app
+
+
+def _request(asgi, path, send):
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': []}
+    asyncio.run(asgi(scope, receive, send))
+
+
+def test_stream_waits_for_slow_client():
+    produced, closed = [], threading.Event()
+    asgi = DantzigASGI(_flask_app(produced, closed), workers=1, stream_buffer=4, timeout=10)
+    ahead = []
+
+    async def send(message):
+        if message['type'] == 'http.response.body' and not ahead:
+            # Client lent : le générateur ne prend que la taille de la file d'avance
+            await asyncio.sleep(0.3)
+            ahead.append(len(produced))
+
+    _request(asgi, '/stream', send)
+    assert ahead[0] <= 4 + 3
+    assert len(produced) == 200
+
+
+def test_deadline_covers_whole_response_and_stops_stream():
+    produced, closed = [], threading.Event()
+    asgi = DantzigASGI(_flask_app(produced, closed), workers=1, timeout=0.2)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    _request(asgi, '/stream', send)
+    assert messages[0]['status'] == 200
+    assert messages[-1] == {'type': 'http.response.body', 'body': b'', 'more_body': False}
+    assert closed.wait(1)
+    assert len(produced) < 200
+    assert asgi.stats()['timed_out'] == 1
+
+
+def test_timeout_before_start_is_504():
+    asgi = DantzigASGI(_flask_app([], threading.Event()), workers=1, timeout=0.05)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    _request(asgi, '/slow', send)
+    assert messages[0]['status'] == 504
+
+
+def test_error_after_start_only_closes_body():
+    asgi = DantzigASGI(_flask_app([], threading.Event()), workers=1, timeout=10)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    _request(asgi, '/broken', send)
+    starts = [m for m in messages if m['type'] == 'http.response.start']
+    assert len(starts) == 1 and starts[0]['status'] == 200
+    assert messages[-1]['more_body'] is False
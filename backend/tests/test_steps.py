@@ -0,0 +1,21 @@
+"""
+Étapes détaillées : ensemble E complet une fois collectées, delta dans le flux
+"""
+
+import pytest
+
+from backend.algorithms.steps import collect_detailed_steps, iter_dantzig_steps
+from backend.utils.graph_manager import convert_to_dantzig_format
+
+
+@pytest.mark.parametrize('mode, word, first', [('min', 'minimum', 'λ(x2) = 2'), ('max', 'maximum', 'λ(x3) = 9')])
+def test_selection_descriptions(vis_data, mode, word, first):
+    graph = convert_to_dantzig_format(vis_data)
+    streamed = [s['description'] for s in iter_dantzig_steps(graph, 'x1', mode) if s['selected']]
+    collected = [s for s in collect_detailed_steps(graph, 'x1', mode)[2] if s['selected']]
+
+    node = first[2:4]
+    assert streamed[0] == f'Sélectionner le {word}: {first}, E2 = E1 ∪ {{{node}}}'
+    assert collected[0]['description'] == f'Sélectionner le {word}: {first}, E2 = {{x1, {node}}}'
+    last = collected[-1]
+    assert last['description'].endswith('E3 = {' + ', '.join(last['E_current']) + '}')
@@ -0,0 +1,27 @@
+"""
+Lecture des poids : types, arrondi décimal à la lecture seulement, rapport de validation
+"""
+
+from backend.utils.weights import parse_weight, parse_weights
+
+
+def test_integers_stay_integers():
+    assert parse_weight('7') == 7 and isinstance(parse_weight('7'), int)
+    assert parse_weight('') == 1
+
+
+def test_decimals_round_at_parse_time_only():
+    # Arrondi décimal au plus proche pair, là où float('2.675') donnerait 2.67
+    assert parse_weight('2.675', decimals=2) == 2.68
+    assert parse_weight('2.665', decimals=2) == 2.66
+    costs, report = parse_weights(['0.1', '0.2'], decimals=1)
+    assert costs.typecode == 'd' and report['storage'] == 'float64'
+    # Les sommes restent flottantes : pas d'arithmétique à virgule fixe
+    assert costs[0] + costs[1] != 0.3
+
+
+def test_invalid_labels_are_reported():
+    costs, report = parse_weights(['3', 'abc', 'inf'])
+    assert list(costs) == [3, 1, 1]
+    assert report['invalid'] == 2
+    assert [example['label'] for example in report['examples']] == ['abc', 'inf']
@@ -0,0 +1,218 @@
+"""
+Modifications par lots des graphes : validation, application aux données vis et journal des lots
+"""
+
+import json
+import os
+
+try:
+    from .weights import WeightError, parse_weight
+except ImportError:
+    from weights import WeightError, parse_weight
+
+OPERATIONS = ('add', 'update', 'delete')
+KINDS = ('node', 'edge')
+
+# Nombre maximal d'opérations par lot
+MAX_OPS = int(os.environ.get('DANTZIG_PATCH_MAX_OPS', 100000))
+
+
+class PatchError(ValueError):
+    """Lot de modifications refusé ; index est la position de l'opération fautive"""
+
+    def __init__(self, message, index=None):
+        super().__init__(message if index is None else f"Opération {index}: {message}")
+        self.index = index
+
+
+def normalize_ops(ops):
+    """
+    Vérifie la forme d'un lot et le met sous forme canonique
+
+    Une opération s'écrit {"op": "add" | "update" | "delete", "node" | "edge": {...}} ;
+    l'élément porte toujours son 'id' (une suppression accepte l'identifiant seul).
+
+    Returns:
+        list: Opérations {'op', 'node' ou 'edge'}, éléments copiés
+
+    Raises:
+        PatchError: si le lot est vide, trop long ou mal formé
+    """
+    if not isinstance(ops, list) or not ops:
+        raise PatchError("Le lot doit être une liste non vide d'opérations")
+    if len(ops) > MAX_OPS:
+        raise PatchError(f"Lot trop long ({len(ops)} opérations, maximum {MAX_OPS})")
+    normalized = []
+    for i, op in enumerate(ops):
+        if not isinstance(op, dict) or op.get('op') not in OPERATIONS:
+            raise PatchError(f"'op' doit valoir {', '.join(OPERATIONS)}", i)
+        kinds = [kind for kind in KINDS if kind in op]
+        if len(kinds) != 1:
+            raise PatchError("une opération porte soit 'node', soit 'edge'", i)
+        kind = kinds[0]
+        item = op[kind]
+        if op['op'] == 'delete' and not isinstance(item, dict):
+            item = {'id': item}
+        if not isinstance(item, dict) or item.get('id') is None:
+            raise PatchError(f"'{kind}' doit être un objet avec un 'id'", i)
+        if kind == 'edge' and op['op'] == 'add' and ('source' not in item or 'target' not in item):
+            raise PatchError("une arête ajoutée doit avoir 'source' et 'target'", i)
+        normalized.append({'op': op['op'], kind: dict(item) if op['op'] != 'delete' else {'id': item['id']}})
+    return normalized
+
+
+def check_ops(ops, node_index, edge_index):
+    """
+    Vérifie un lot normalisé contre l'état courant, sans rien modifier
+
+    Les opérations sont vues dans l'ordre : une arête ajoutée par le lot peut
+    être modifiée plus loin dans le même lot.
+
+    Raises:
+        PatchError: identifiant déjà présent (ajout) ou absent (modification,
+                    suppression), ou poids illisible
+    """
+    # Présence des identifiants touchés par le lot, par-dessus les index
+    present = {'node': {}, 'edge': {}}
+    indexes = {'node': node_index, 'edge': edge_index}
+    for i, op in enumerate(ops):
+        kind = 'node' if 'node' in op else 'edge'
+        item = op[kind]
+        key = item['id']
+        exists = present[kind].get(key, key in indexes[kind])
+        if op['op'] == 'add' and exists:
+            raise PatchError(f"{kind} '{key}' existe déjà", i)
+        if op['op'] != 'add' and not exists:
+            raise PatchError(f"{kind} '{key}' introuvable", i)
+        if kind == 'edge' and 'label' in item:
+            try:
+                parse_weight(item['label'])
+            except WeightError as e:
+                raise PatchError(str(e), i) from None
+        present[kind][key] = op['op'] != 'delete'
+
+
+def apply_ops(data, ops, node_index, edge_index):
+    """
+    Applique un lot (vérifié) aux données vis et aux index {id: position}
+
+    Un élément modifié est remplacé par une copie, jamais modifié sur place ;
+    un élément supprimé laisse None à sa place (voir compact_data). Supprimer
+    un nœud supprime ses arêtes ; une opération plus loin dans le lot sur
+    l'une de ces arêtes est sans effet.
+    """
+    lists = {'node': data.setdefault('nodes', []), 'edge': data.setdefault('edges', [])}
+    indexes = {'node': node_index, 'edge': edge_index}
+    edges = lists['edge']
+    # Positions des arêtes par extrémité, construites à la première suppression de nœud
+    incident = None
+    for op in ops:
+        kind = 'node' if 'node' in op else 'edge'
+        item, items, index = op[kind], lists[kind], indexes[kind]
+        i = index.get(item['id'])
+        if op['op'] == 'add':
+            i = index[item['id']] = len(items)
+            items.append(dict(item))
+        elif i is None:
+            continue
+        elif op['op'] == 'update':
+            items[i] = {**items[i], **item}
+        else:
+            del index[item['id']]
+            items[i] = None
+            if kind == 'node':
+                if incident is None:
+                    incident = _incident_edges(edges)
+                for k in incident.pop(item['id'], ()):
+                    edge = edges[k]
+                    if edge is not None and item['id'] in (edge['source'], edge['target']):
+                        edge_index.pop(edge['id'], None)
+                        edges[k] = None
+            continue
+        if kind == 'edge' and incident is not None:
+            for node in (items[i]['source'], items[i]['target']):
+                incident.setdefault(node, []).append(i)
+
+
+def _incident_edges(edges):
+    incident = {}
+    for k, edge in enumerate(edges):
+        if edge is not None:
+            incident.setdefault(edge['source'], []).append(k)
+            incident.setdefault(edge['target'], []).append(k)
+    return incident
+
+
+def compact_data(data):
+    """Retire les éléments supprimés (None) des données vis"""
+    data['nodes'] = [node for node in data.get('nodes', []) if node is not None]
+    data['edges'] = [edge for edge in data.get('edges', []) if edge is not None]
+
+
+def item_index(items):
+    """{id: position} des nœuds ou arêtes vis"""
+    return {item.get('id'): i for i, item in enumerate(items)}
+
+
+def append_log(path, base, ops):
+    """
+    Ajoute un lot au journal (une ligne JSON, synchronisée sur disque)
+
+    Args:
+        path: Fichier journal
+        base: Signature du fichier principal sur lequel le lot s'applique
+        ops: Lot normalisé
+
+    Returns:
+        int: Taille du journal après l'ajout
+    """
+    line = json.dumps({'base': list(base), 'ops': ops}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(path, 'a+b') as f:
+        # Après une écriture interrompue, la ligne incomplète est close avant d'écrire la suivante
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b'\n':
+                line = b'\n' + line
+        f.write(line + b'\n')
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def read_log(path, base):
+    """
+    Relit les lots du journal qui s'appliquent au fichier principal de signature base
+
+    Les lignes d'une autre base (journal resté après une sauvegarde ou un
+    compactage interrompus) sont ignorées, de même qu'une dernière ligne
+    incomplète (écriture interrompue).
+
+    Returns:
+        tuple: (taille du journal lu, liste des lots)
+    """
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return 0, []
+    base = list(base)
+    batches = []
+    for line in content.split(b'\n')[:-1]:
+        try:
+            record = json.loads(line.decode('utf-8'))
+        except ValueError:
+            continue
+        if record.get('base') == base:
+            batches.append(record['ops'])
+    return len(content), batches
+
+
+def replay(data, batches):
+    """Applique les lots du journal aux données vis, dans l'ordre"""
+    node_index = item_index(data.setdefault('nodes', []))
+    edge_index = item_index(data.setdefault('edges', []))
+    for ops in batches:
+        apply_ops(data, ops, node_index, edge_index)
+    compact_data(data)
+    return data
@@ -1,45 +1,1064 @@
 import os
+import re
 import json
+import math
+import mmap
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows : les écrivains ne sont sérialisés qu'au sein du processus
+    fcntl = None
+
+try:
+    from ..algorithms.engine import ArcList, copy_costs, csr_index, index_graph, set_arc_cost, typecode
+    from ..algorithms.landmarks import build_landmarks, DEFAULT_LANDMARKS
+    from .metrics import phase
+    from .weights import DEFAULT_WEIGHT, parse_edge_weights, parse_weight
+    from .change_log import normalize_ops, check_ops, apply_ops, compact_data, item_index, append_log, read_log, replay
+except ImportError:
+    from engine import ArcList, copy_costs, csr_index, index_graph, set_arc_cost, typecode
+    from landmarks import build_landmarks, DEFAULT_LANDMARKS
+    from metrics import phase
+    from weights import DEFAULT_WEIGHT, parse_edge_weights, parse_weight
+    from change_log import normalize_ops, check_ops, apply_ops, compact_data, item_index, append_log, read_log, replay
 
 GRAPH_FILE = os.path.join(os.path.dirname(__file__), '..', 'graph_data.json')
+GRAPH_BIN_FILE = os.path.join(os.path.dirname(__file__), '..', 'graph_data.bin')
+
+# Graphes nommés : graphs/<id>.json (ou .bin) ; le graphe 'default' reste dans GRAPH_FILE
+GRAPHS_DIR = os.path.join(os.path.dirname(__file__), '..', 'graphs')
+DEFAULT_GRAPH = 'default'
+GRAPH_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Budget (octets approximatifs) des graphes compilés gardés en mémoire
+MEMORY_BUDGET = int(os.environ.get('DANTZIG_GRAPH_MEMORY_BYTES', 512 * 1024 * 1024))
+
+# Coût mémoire approximatif d'un arc et d'un sommet des données vis décodées
+VIS_ARC_BYTES = 400
+VIS_NODE_BYTES = 300
+# Coût d'un sommet interné (identifiant dans la liste des sommets et la table des positions),
+# les tableaux de l'index étant comptés à leur taille exacte
+NODE_BYTES = 100
+
+# Stockage du graphe : 'json' (graph_data.json) ou 'binary' (graph_data.bin, CSR mappé en mémoire)
+STORAGE = os.environ.get('DANTZIG_GRAPH_STORAGE', 'json')
+
+# Fichier binaire du graphe (voir write_sections)
+BINARY_MAGIC = b'DZG1'
+BINARY_ARRAYS = ('offsets', 'targets', 'costs', 'arc_ids', 'slots', 'rank')
+# Arcs entrants (index['reverse']), en sections 'reverse_<nom>' ; un fichier qui ne les a
+# pas encore les reconstruit au premier usage
+REVERSE_ARRAYS = ('offsets', 'sources', 'slots', 'costs')
+
+# Index de repères (ALT) persisté à côté du graphe : <graphe>.landmarks
+LANDMARKS_MAGIC = b'DZL1'
+# Nombre de repères recalculés en arrière-plan après chaque sauvegarde (0 : seulement à la demande)
+LANDMARKS_ON_SAVE = int(os.environ.get('DANTZIG_LANDMARKS_ON_SAVE', 0))
+
+# Journal des lots de modifications (patch_graph) à côté du graphe : <graphe>.log. Il est
+# compacté dans le fichier principal quand il dépasse cette fraction de sa taille (et ce minimum)
+LOG_COMPACT_RATIO = float(os.environ.get('DANTZIG_LOG_COMPACT_RATIO', 0.5))
+LOG_COMPACT_MIN_BYTES = int(os.environ.get('DANTZIG_LOG_COMPACT_MIN_BYTES', 1024 * 1024))
+
+# Graphes compilés gardés en mémoire, du moins au plus récemment utilisé. Une entrée
+# (signature, données vis, graphe compilé) reste valable tant que (inode, mtime, taille)
+# du fichier et la taille de son journal ne changent pas ; elle est remplacée d'un bloc
+# pour rester cohérente.
+_entries = OrderedDict()
+_entry_sizes = {}
+_graph_stats = {}
+_load_locks = {}
+_patch_locks = {}
+_compacting = set()
+_cache_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+def atomic_save(path, write):
+    """
+    Remplace path de façon atomique, les écrivains passant un par un
+
+    write(f) remplit un fichier temporaire du même dossier, synchronisé sur
+    disque puis renommé sur path : un lecteur ouvre l'ancien fichier ou le
+    nouveau, jamais un fichier partiel, et n'attend jamais. Les écrivains
+    (threads et processus) sont sérialisés par un verrou sur path + '.lock',
+    qui garde aussi le compteur de générations.
 
+    Returns:
+        int: Génération du fichier écrit (1, 2, ...)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with _write_lock, open(f"{path}.lock", 'a+') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        lock.seek(0)
+        previous = lock.read().strip()
+        generation = int(previous) + 1 if previous.isdigit() else 1
 
-def save_graph_data(data):
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.graph-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                mode = os.stat(path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        _fsync_directory(directory)
+
+        lock.seek(0)
+        lock.truncate()
+        lock.write(str(generation))
+        lock.flush()
+    return generation
+
+
+def _fsync_directory(directory):
+    """Rend le renommage durable (sans effet là où un dossier ne peut pas être ouvert)"""
     try:
-        with open(GRAPH_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-        return True
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def save_graph_data(data, graph_id=None):
+    """
+    Sauvegarde un graphe dans le stockage actif, sans jamais exposer un fichier à moitié écrit
+
+    Args:
+        data: Données vis du graphe
+        graph_id: Graphe nommé (None pour le graphe par défaut)
+
+    Returns:
+        int: Génération de la sauvegarde, ou None en cas d'erreur
+    """
+    try:
+        graph_id = _graph_id(graph_id)
+        with _patch_lock(graph_id):
+            generation = _write_storage(graph_id, data)
+            # Les lots du journal portaient sur l'ancien fichier
+            _remove_file(_log_path(graph_id))
+        invalidate_graph_cache(graph_id)
+        # Les repères de l'ancienne version ne servent plus
+        _remove_file(_landmarks_path(graph_id))
+        if LANDMARKS_ON_SAVE > 0:
+            threading.Thread(target=build_graph_landmarks, args=(graph_id, LANDMARKS_ON_SAVE),
+                             daemon=True).start()
+        return generation
     except Exception as e:
         print(f"Erreur sauvegarde: {e}")
+        return None
+
+
+def _write_storage(graph_id, data):
+    """Écrit les données vis dans le fichier du stockage actif ; renvoie la génération écrite"""
+    json_path, bin_path = _graph_paths(graph_id)
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    if STORAGE == 'binary':
+        return write_binary_graph(bin_path, data)
+    payload = json.dumps(data, indent=2).encode('utf-8')
+    return atomic_save(json_path, lambda f: f.write(payload))
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
         return False
 
 
-def load_graph_data():
-    if not os.path.exists(GRAPH_FILE):
+def load_graph_data(graph_id=None):
+    """Données vis lues sur disque (sans passer par le cache)"""
+    _, data, graph = _read_storage(_graph_id(graph_id))
+    return graph.vis_data() if graph is not None else data
+
+
+def parse_coordinates(node):
+    """Position (x, y) d'un nœud vis, ou None s'il n'en a pas de numérique"""
+    x, y = node.get('x'), node.get('y')
+    if type(x) in (int, float) and type(y) in (int, float):
+        return (x, y)
+    return None
+
+
+def convert_to_dantzig_format(vis_data):
+    """
+    Compile les données vis : sommets internés en entiers et arcs rangés dans l'index CSR
+
+    Les poids sont lus par parse_edge_weights ; son rapport de validation est
+    gardé dans graph['weights'].
+
+    Returns:
+        CompiledGraph: Graphe compilé, ou None si les données sont vides ou invalides
+    """
+    if not vis_data:
         return None
     try:
-        with open(GRAPH_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        nodes = [n['id'] for n in vis_data.get('nodes', [])]
+        declared = len(nodes)
+        position = {}
+        for i, node in enumerate(nodes):
+            position.setdefault(node, i)
+        edges = vis_data.get('edges', [])
+        costs, report = parse_edge_weights(edges)
+        if report['invalid']:
+            print(f"Poids illisibles sur {report['invalid']} arête(s), poids {DEFAULT_WEIGHT} appliqué: {report['examples']}")
+        sources = array('i', bytes(4 * len(edges)))
+        targets = array('i', bytes(4 * len(edges)))
+        for arc_idx, e in enumerate(edges):
+            for ends, node in ((sources, e['source']), (targets, e['target'])):
+                i = position.get(node)
+                if i is None:
+                    # Extrémité absente des nœuds déclarés : internée à la suite
+                    i = position[node] = len(nodes)
+                    nodes.append(node)
+                ends[arc_idx] = i
+        index = csr_index(nodes, position, sources, targets, costs)
+        graph = CompiledGraph(nodes[:declared] if len(nodes) > declared else nodes, index, vis_data)
+        graph['weights'] = report
+        return graph
+    except Exception as e:
+        print(f"Erreur conversion: {e}")
+        return None
+
+
+class NodeCoordinates(Mapping):
+    """
+    graph['coordinates'] : position (x, y) des nœuds qui en ont une, lue dans deux tableaux
+
+    Les coordonnées sont rangées par position entière (NaN si absentes)
+    plutôt qu'en un tuple par nœud.
+    """
+
+    __slots__ = ('position', 'xs', 'ys', 'count')
+
+    def __init__(self, position, vis_nodes):
+        self.position = position
+        self.xs = array('d', [math.nan]) * len(position)
+        self.ys = array('d', [math.nan]) * len(position)
+        for node in vis_nodes:
+            point = parse_coordinates(node)
+            if point is not None:
+                i = position[node['id']]
+                self.xs[i], self.ys[i] = point
+        self.count = sum(1 for x in self.xs if x == x)
+
+    def __getitem__(self, node):
+        i = self.position.get(node)
+        if i is None or self.xs[i] != self.xs[i]:
+            raise KeyError(node)
+        return (self.xs[i], self.ys[i])
+
+    def __iter__(self):
+        return (node for node, i in self.position.items() if self.xs[i] == self.xs[i])
+
+    def __len__(self):
+        return self.count
+
+
+class CompiledGraph(dict):
+    """
+    Graphe compilé : 'sommet' et l'index CSR (tableaux), les identifiants n'apparaissant qu'aux bords
+
+    'arc' est une vue sur l'index (ArcList), sans tuple stocké ; 'coordinates',
+    'edge_index', 'node_index' et 'adjacence' ne sont construits qu'au premier
+    accès, à partir de l'index et des données vis.
+    """
+
+    LAZY_KEYS = ('arc', 'adjacence', 'edge_index', 'node_index', 'coordinates')
+
+    def __init__(self, nodes, index, vis=None):
+        super().__init__()
+        self._vis = vis
+        self['sommet'] = nodes
+        self['index'] = index
+
+    def vis_data(self):
+        return self._vis
+
+    def derive(self, index, vis):
+        """
+        Nouveau graphe de même classe sur un autre index et d'autres données vis
+
+        Les autres clés sont reprises telles quelles, sauf les vues construites
+        sur l'ancien index ('arc', 'adjacence') ; ce graphe n'est pas modifié.
+        """
+        graph = type(self).__new__(type(self))
+        graph.__dict__.update(self.__dict__)
+        graph._vis = vis
+        dict.update(graph, {key: value for key, value in self.items() if key not in ('arc', 'adjacence')})
+        dict.__setitem__(graph, 'index', index)
+        return graph
+
+    def __setitem__(self, key, value):
+        if key == 'arc' and not isinstance(value, ArcList):
+            # Arcs remplacés par une liste : l'index sera reconstruit à partir d'elle
+            self.pop('index', None)
+            self.pop('adjacence', None)
+        super().__setitem__(key, value)
+
+    def __missing__(self, key):
+        if key not in self.LAZY_KEYS:
+            raise KeyError(key)
+        index = index_graph(self)
+        if key == 'arc':
+            value = ArcList(index)
+        elif key == 'coordinates':
+            value = NodeCoordinates(index['position'], self.vis_data().get('nodes', []))
+        elif key == 'edge_index':
+            value = item_index(self.vis_data().get('edges', []))
+        elif key == 'node_index':
+            value = item_index(self.vis_data().get('nodes', []))
+        else:
+            value = {node: [] for node in self['sommet']}
+            for arc_idx, (u, v, cost) in enumerate(self['arc']):
+                value.setdefault(u, []).append((v, cost, arc_idx))
+        self[key] = value
+        return value
+
+
+def write_binary_graph(path, data):
+    """
+    Écrit le graphe au format binaire : index CSR, identifiants des sommets et données vis
+
+    Le fichier est écrit à côté puis renommé (atomic_save) : les processus
+    qui ont mappé l'ancien fichier continuent de le lire sans erreur.
+
+    Returns:
+        int: Génération du fichier écrit
+    """
+    graph = convert_to_dantzig_format(data)
+    index = index_graph(graph)
+    sections = {name: index[name] for name in BINARY_ARRAYS}
+    sections.update({f'reverse_{name}': index['reverse'][name] for name in REVERSE_ARRAYS})
+    sections['node_ids'] = json.dumps(index['nodes'], ensure_ascii=False).encode('utf-8')
+    sections['vis'] = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    header = {'sommet': len(graph['sommet']), 'negative': index['negative'], 'weights': graph['weights']}
+    return write_sections(path, BINARY_MAGIC, header, sections)
+
+
+def write_sections(path, magic, header, sections):
+    """
+    Écrit un fichier à sections (atomic_save) : magic, longueur (uint32) de
+    l'en-tête JSON, en-tête, puis chaque section alignée sur 8 octets
+
+    Args:
+        header: Dictionnaire JSON, complété par 'sections' : {nom: (typecode, décalage, longueur)}
+        sections: {nom: tableau (array ou memoryview) ou octets}
+
+    Returns:
+        int: Génération du fichier écrit
+    """
+    layout = {}
+    offset = 0
+    for name, values in sections.items():
+        code = 'B' if isinstance(values, (bytes, bytearray)) else typecode(values)
+        layout[name] = (code, offset, len(values))
+        offset += -(-len(values) * struct.calcsize(code) // 8) * 8
+    header = json.dumps(dict(header, sections=layout)).encode('utf-8')
+    header += b' ' * (-(len(magic) + 4 + len(header)) % 8)
+
+    def write(f):
+        f.write(magic + struct.pack('<I', len(header)) + header)
+        for values in sections.values():
+            data_bytes = bytes(values) if isinstance(values, (bytes, bytearray)) else values.tobytes()
+            f.write(data_bytes + b'\0' * (-len(data_bytes) % 8))
+
+    return atomic_save(path, write)
+
+
+def map_sections(f, magic):
+    """
+    Mappe un fichier écrit par write_sections (copie à l'écriture)
+
+    Returns:
+        tuple: (mmap, en-tête, {nom: memoryview typée sur la section})
+    """
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if mapped[:len(magic)] != magic:
+        raise ValueError("en-tête binaire invalide")
+    start = len(magic) + 4
+    (header_size,) = struct.unpack('<I', mapped[len(magic):start])
+    header = json.loads(mapped[start:start + header_size].decode('utf-8'))
+    base = start + header_size
+    view = memoryview(mapped)
+    sections = {}
+    for name, (code, offset, length) in header['sections'].items():
+        size = length * struct.calcsize(code)
+        sections[name] = view[base + offset:base + offset + size].cast(code)
+    return mapped, header, sections
+
+
+class MappedGraph(CompiledGraph):
+    """
+    Graphe compilé lu depuis le fichier binaire mappé en mémoire
+
+    L'index CSR est fait de vues sur les pages du fichier (copie à l'écriture :
+    les processus partagent les pages tant qu'aucun coût n'est modifié).
+    Les données vis ne sont décodées qu'au premier besoin.
+    """
+
+    def __init__(self, mapped, header, sections):
+        nodes = json.loads(bytes(sections['node_ids']).decode('utf-8'))
+        position = {}
+        for i, node in enumerate(nodes):
+            position.setdefault(node, i)
+        index = {name: sections[name] for name in BINARY_ARRAYS}
+        if all(f'reverse_{name}' in sections for name in REVERSE_ARRAYS):
+            index['reverse'] = {name: sections[f'reverse_{name}'] for name in REVERSE_ARRAYS}
+        index.update({'nodes': nodes, 'position': position, 'negative': header['negative']})
+        super().__init__(nodes[:header['sommet']], index)
+        if 'weights' in header:
+            self['weights'] = header['weights']
+        self._mapped = mapped
+        self._vis_bytes = sections['vis']
+
+    def vis_data(self):
+        """Données vis du graphe (décodées une seule fois)"""
+        if self._vis is None:
+            self._vis = json.loads(bytes(self._vis_bytes).decode('utf-8'))
+        return self._vis
+
+
+def load_binary_graph(path):
+    """
+    Mappe un fichier binaire écrit par write_binary_graph
+
+    Returns:
+        MappedGraph: Graphe compilé, ou None si le fichier est absent ou invalide
+    """
+    try:
+        with open(path, 'rb') as f:
+            return _map_binary(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Erreur lecture binaire: {e}")
+        return None
+
+
+def _map_binary(f):
+    return MappedGraph(*map_sections(f, BINARY_MAGIC))
+
+
+def import_graph_json(json_path, path=None):
+    """Convertit un fichier JSON vis en fichier binaire (par défaut celui du graphe 'default')"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    write_binary_graph(path or GRAPH_BIN_FILE, data)
+
+
+def export_graph_json(json_path, graph_id=None):
+    """Écrit les données vis d'un graphe dans un fichier JSON (pour le client React)"""
+    data = get_graph_data(graph_id)
+    if data is None:
+        return False
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return True
+
+
+def valid_graph_id(graph_id):
+    """Un identifiant de graphe sert de nom de fichier : lettres, chiffres, '-' et '_'"""
+    return isinstance(graph_id, str) and GRAPH_ID_PATTERN.match(graph_id) is not None
+
+
+def _graph_id(graph_id):
+    if graph_id is None:
+        return DEFAULT_GRAPH
+    if not valid_graph_id(graph_id):
+        raise ValueError(f"Identifiant de graphe invalide: {graph_id!r}")
+    return graph_id
+
+
+def _graph_paths(graph_id):
+    """(fichier JSON, fichier binaire) d'un graphe"""
+    if graph_id == DEFAULT_GRAPH:
+        return GRAPH_FILE, GRAPH_BIN_FILE
+    base = os.path.join(GRAPHS_DIR, graph_id)
+    return f"{base}.json", f"{base}.bin"
+
+
+def _log_path(graph_id):
+    return os.path.splitext(_graph_paths(graph_id)[0])[0] + '.log'
+
+
+def _log_size(graph_id):
+    try:
+        return os.stat(_log_path(graph_id)).st_size
+    except OSError:
+        return 0
+
+
+@contextmanager
+def _patch_lock(graph_id):
+    """Sérialise les écritures du journal d'un graphe et de son fichier principal (threads et processus)"""
+    with _cache_lock:
+        lock = _patch_locks.setdefault(graph_id, threading.Lock())
+    path = f"{_log_path(graph_id)}.lock"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with lock, open(path, 'a') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _storage_file(graph_id=DEFAULT_GRAPH):
+    """Fichier du stockage actif ; en binaire, le fichier JSON est importé s'il est seul présent"""
+    json_path, bin_path = _graph_paths(graph_id)
+    if STORAGE != 'binary':
+        return json_path
+    if not os.path.exists(bin_path) and os.path.exists(json_path):
+        try:
+            import_graph_json(json_path, bin_path)
+        except Exception as e:
+            print(f"Erreur import JSON: {e}")
+    return bin_path
+
+
+def _signature(st):
+    # L'inode change à chaque sauvegarde (renommage), même à mtime et taille égaux
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _file_signature(graph_id=DEFAULT_GRAPH):
+    """(inode, mtime, taille) du fichier principal, suivis de la taille du journal"""
+    try:
+        st = os.stat(_storage_file(graph_id))
+    except OSError:
+        return None
+    return _signature(st) + (_log_size(graph_id),)
+
+
+def _read_storage(graph_id=DEFAULT_GRAPH):
+    """
+    Lit le fichier du stockage actif ; renvoie (signature, données vis, graphe mappé)
+
+    En JSON, le graphe mappé est None ; en binaire, ce sont les données vis qui
+    ne sont pas décodées (elles le sont à la demande). La signature est prise
+    sur le fichier ouvert : un remplacement concurrent ne peut pas la
+    désaccorder du contenu lu. Les lots du journal sont rejoués sur les
+    données vis (un graphe binaire est alors recompilé à partir d'elles).
+    """
+    data = graph = None
+    try:
+        with open(_storage_file(graph_id), 'rb') as f:
+            signature = _signature(os.fstat(f.fileno()))
+            if STORAGE == 'binary':
+                graph = _map_binary(f)
+            else:
+                data = json.loads(f.read().decode('utf-8'))
+        log_size, batches = read_log(_log_path(graph_id), signature)
+        if batches:
+            if graph is not None:
+                data, graph = graph.vis_data(), None
+            with phase('replay'):
+                replay(data, batches)
+    except FileNotFoundError:
+        return None, None, None
     except Exception as e:
         print(f"Erreur lecture: {e}")
+        return None, None, None
+    return signature + (log_size,), data, graph
+
+
+def approx_graph_size(graph):
+    """Taille mémoire approximative (octets) d'un graphe compilé et de ses données vis décodées"""
+    if not graph:
+        return 0
+    index = graph['index']
+    size = len(index['nodes']) * NODE_BYTES
+    if isinstance(graph, MappedGraph):
+        # Pages du fichier mappé, tableaux CSR compris
+        size += len(graph._mapped)
+    else:
+        arrays = list(index.values()) + list(index.get('reverse', {}).values())
+        size += sum(values.itemsize * len(values) for values in arrays if isinstance(values, array))
+    if graph._vis is not None:
+        size += len(graph['sommet']) * VIS_NODE_BYTES + len(index['slots']) * VIS_ARC_BYTES
+    return size
+
+
+def _stats(graph_id):
+    """Compteurs d'un graphe (créés au premier usage) ; appelé sous _cache_lock"""
+    stats = _graph_stats.get(graph_id)
+    if stats is None:
+        stats = {
+            'hits': 0, 'misses': 0, 'evictions': 0,
+            'load_seconds': 0.0, 'last_load_seconds': None,
+            'computes': 0, 'compute_seconds': 0.0,
+        }
+        _graph_stats[graph_id] = stats
+    return stats
+
+
+def invalidate_graph_cache(graph_id=None):
+    """Oublie le graphe compilé graph_id (tous les graphes si None)"""
+    with _cache_lock:
+        if graph_id is None:
+            _entries.clear()
+            _entry_sizes.clear()
+        else:
+            _entries.pop(graph_id, None)
+            _entry_sizes.pop(graph_id, None)
+
+
+def _store_entry(graph_id, entry):
+    """
+    Mémorise l'entrée d'un graphe puis évince les moins récemment utilisés au-delà du budget
+
+    Seul le graphe qui vient d'être mémorisé est épargné. Un graphe modifié par
+    patch_graph peut être évincé comme les autres : ses lots sont écrits dans
+    le journal avant d'être publiés, et le prochain chargement les rejoue sur
+    le fichier principal (voir _read_storage).
+
+    Appelé sous _cache_lock.
+    """
+    _entries[graph_id] = entry
+    _entries.move_to_end(graph_id)
+    _entry_sizes[graph_id] = approx_graph_size(entry[2])
+    total = sum(_entry_sizes.values())
+    for other in list(_entries):
+        if total <= MEMORY_BUDGET:
+            break
+        if other == graph_id:
+            continue
+        del _entries[other]
+        total -= _entry_sizes.pop(other)
+        _stats(other)['evictions'] += 1
+
+
+def _current_entry(graph_id=None):
+    """Renvoie (signature, données, graphe), rechargé et recompilé si le fichier a changé ou a été évincé"""
+    graph_id = _graph_id(graph_id)
+    signature = _file_signature(graph_id)
+    with _cache_lock:
+        stats = _stats(graph_id)
+        entry = _entries.get(graph_id)
+        if signature is not None and entry is not None and entry[0] == signature:
+            _entries.move_to_end(graph_id)
+            stats['hits'] += 1
+            return entry
+
+    # Un seul chargement à la fois par graphe ; les autres graphes restent servis.
+    # Les écritures (patch_graph, compact_graph) prennent aussi ce verrou le temps
+    # de publier leur entrée : la signature relue ici est celle de l'entrée publiée.
+    with _load_lock(graph_id):
+        signature = _file_signature(graph_id)
+        with _cache_lock:
+            entry = _entries.get(graph_id)
+            if signature is not None and entry is not None and entry[0] == signature:
+                _entries.move_to_end(graph_id)
+                stats['hits'] += 1
+                return entry
+            stats['misses'] += 1
+
+        t0 = time.perf_counter()
+        with phase('load_graph'):
+            signature, data, graph = _read_storage(graph_id)
+        if graph is None:
+            with phase('convert'):
+                graph = convert_to_dantzig_format(data)
+        if graph:
+            # (graphe, inode, mtime, taille, taille du journal)
+            graph['graph_id'] = graph_id
+            graph['version'] = (graph_id,) + signature
+        elapsed = time.perf_counter() - t0
+
+        entry = (signature if graph else None, data, graph)
+        with _cache_lock:
+            stats['load_seconds'] += elapsed
+            stats['last_load_seconds'] = elapsed
+            # Ne mémoriser que des données lues intégralement
+            if graph:
+                _store_entry(graph_id, entry)
+            else:
+                _entries.pop(graph_id, None)
+                _entry_sizes.pop(graph_id, None)
+        return entry
+
+
+def is_resident(graph_id=None):
+    """
+    Vrai si le graphe est en mémoire, à jour et ses données vis décodées
+
+    Sa lecture ne prend alors ni le verrou de chargement ni ne lit le fichier
+    (seuls stat du fichier et du journal) : le serveur ASGI s'en sert pour
+    servir /load-graph sur la boucle d'événements.
+    """
+    try:
+        graph_id = _graph_id(graph_id)
+    except ValueError:
+        return False
+    json_path, bin_path = _graph_paths(graph_id)
+    try:
+        st = os.stat(bin_path if STORAGE == 'binary' else json_path)
+    except OSError:
+        return False
+    signature = _signature(st) + (_log_size(graph_id),)
+    with _cache_lock:
+        entry = _entries.get(graph_id)
+    if entry is None or entry[0] != signature:
+        return False
+    return entry[1] is not None or getattr(entry[2], '_vis', None) is not None
+
+
+def _load_lock(graph_id):
+    with _cache_lock:
+        return _load_locks.setdefault(graph_id, threading.Lock())
+
+
+def _vis_data(entry):
+    """Données vis d'une entrée du cache ; décodées à la demande pour un graphe binaire"""
+    signature, data, graph = entry
+    if data is None and isinstance(graph, MappedGraph):
+        return graph.vis_data()
+    return data
+
+
+def get_graph_data(graph_id=None):
+    """Données vis du graphe (lecture seule) depuis le cache mémoire"""
+    return _vis_data(_current_entry(graph_id))
+
+
+def get_compiled_graph(graph_id=None):
+    """Graphe compilé (sommets, arcs, adjacence, version) depuis le cache mémoire"""
+    return _current_entry(graph_id)[2]
+
+
+def list_graphs():
+    """Identifiants des graphes enregistrés sur disque"""
+    graph_ids = set()
+    if os.path.exists(GRAPH_FILE) or os.path.exists(GRAPH_BIN_FILE):
+        graph_ids.add(DEFAULT_GRAPH)
+    if os.path.isdir(GRAPHS_DIR):
+        for name in os.listdir(GRAPHS_DIR):
+            graph_id, ext = os.path.splitext(name)
+            if ext in ('.json', '.bin') and valid_graph_id(graph_id):
+                graph_ids.add(graph_id)
+    return sorted(graph_ids)
+
+
+def delete_graph(graph_id):
+    """
+    Supprime un graphe nommé (fichiers et entrée en mémoire)
+
+    Returns:
+        bool: False si le graphe n'existe pas ou est le graphe par défaut
+    """
+    graph_id = _graph_id(graph_id)
+    if graph_id == DEFAULT_GRAPH:
+        return False
+    removed = False
+    for path in _graph_paths(graph_id) + (_log_path(graph_id),):
+        removed = _remove_file(path) or removed
+        _remove_file(f"{path}.lock")
+    landmarks_path = _landmarks_path(graph_id)
+    _remove_file(landmarks_path)
+    _remove_file(f"{landmarks_path}.lock")
+    invalidate_graph_cache(graph_id)
+    with _cache_lock:
+        _graph_stats.pop(graph_id, None)
+    return removed
+
+
+def timed_compute(graph, compute):
+    """Exécute compute() et ajoute sa durée aux statistiques du graphe"""
+    t0 = time.perf_counter()
+    try:
+        with phase('compute'):
+            return compute()
+    finally:
+        graph_id = graph.get('graph_id')
+        if graph_id is not None:
+            with _cache_lock:
+                stats = _stats(graph_id)
+                stats['computes'] += 1
+                stats['compute_seconds'] += time.perf_counter() - t0
+
+
+def _landmarks_path(graph_id):
+    return os.path.splitext(_graph_paths(graph_id)[0])[0] + '.landmarks'
+
+
+def landmarks_report(graph, landmarks):
+    """Description d'un index de repères : sommets, temps de construction, mémoire et version"""
+    nodes = index_graph(graph)['nodes']
+    return {
+        'k': len(landmarks['landmarks']),
+        'landmarks': [nodes[x] for x in landmarks['landmarks']],
+        'build_seconds': landmarks['build_seconds'],
+        'bytes': landmarks['bytes'],
+        'version': list(landmarks['version']),
+    }
+
+
+def build_graph_landmarks(graph_id=None, k=DEFAULT_LANDMARKS):
+    """
+    Construit l'index de repères de la version courante d'un graphe et l'écrit à côté de son fichier
+
+    Returns:
+        dict: Rapport (landmarks_report), ou None si le graphe est introuvable
+              ou a changé pendant la construction
+    """
+    graph_id = _graph_id(graph_id)
+    graph = get_compiled_graph(graph_id)
+    if not graph:
+        return None
+    try:
+        landmarks = build_landmarks(graph, k)
+    except ValueError as e:
+        print(f"Erreur repères: {e}")
+        return None
+    if landmarks['version'] != graph['version']:
         return None
+    sections = {}
+    for i, (fwd, bwd) in enumerate(zip(landmarks['forward'], landmarks['backward'])):
+        sections[f'forward{i}'] = fwd
+        sections[f'backward{i}'] = bwd
+    header = {key: landmarks[key] for key in ('landmarks', 'build_seconds', 'bytes', 'version')}
+    write_sections(_landmarks_path(graph_id), LANDMARKS_MAGIC, header, sections)
+    index_graph(graph)['landmarks'] = (graph['version'], landmarks)
+    return landmarks_report(graph, landmarks)
 
 
-def convert_to_dantzig_format(vis_data):
-    if not vis_data:
+def _load_landmarks(graph_id):
+    try:
+        with open(_landmarks_path(graph_id), 'rb') as f:
+            _, header, sections = map_sections(f, LANDMARKS_MAGIC)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Erreur lecture repères: {e}")
         return None
+    k = len(header['landmarks'])
+    return {
+        'landmarks': header['landmarks'],
+        'forward': [sections[f'forward{i}'] for i in range(k)],
+        'backward': [sections[f'backward{i}'] for i in range(k)],
+        'build_seconds': header['build_seconds'],
+        'bytes': header['bytes'],
+        'version': tuple(header['version']),
+    }
+
+
+def get_landmarks(graph):
+    """
+    Index de repères à jour pour ce graphe, relu depuis le disque au premier appel
+
+    Un index construit pour une autre version du graphe (sauvegarde,
+    modification en mémoire) est ignoré.
+
+    Returns:
+        dict: Index de repères (build_landmarks), ou None
+    """
+    index = index_graph(graph)
+    memo = index.get('landmarks')
+    if memo is None or memo[0] != graph['version']:
+        landmarks = _load_landmarks(graph.get('graph_id', DEFAULT_GRAPH))
+        if landmarks is not None and landmarks['version'] != graph['version']:
+            landmarks = None
+        memo = (graph['version'], landmarks)
+        index['landmarks'] = memo
+    return memo[1]
+
+
+def patch_graph(ops, graph_id=None):
+    """
+    Applique un lot d'ajouts, modifications et suppressions de nœuds et d'arêtes
+
+    Le lot (voir change_log.normalize_ops) est vérifié en entier avant tout
+    effet, ajouté au journal du graphe en une écriture, sans réécrire le
+    fichier principal, puis publié sous une nouvelle entrée : les changements
+    de poids sur une copie des coûts de l'index (la structure est partagée),
+    tout autre changement par une seule recompilation. L'entrée précédente
+    n'est jamais modifiée. Le journal est compacté en arrière-plan
+    (compact_graph) quand il dépasse LOG_COMPACT_RATIO de la taille du fichier.
+
+    Returns:
+        dict: 'old_version', 'version', 'structural', 'arcs' (liste de
+              (ancien arc, nouvel arc) des poids changés sans recompiler), 'applied'
+              (opérations) et 'log_bytes' ; None si le graphe est introuvable
+
+    Raises:
+        PatchError: si le lot est mal formé ou ne s'applique pas au graphe
+    """
+    graph_id = _graph_id(graph_id)
+    ops = normalize_ops(ops)
+    with _patch_lock(graph_id):
+        entry = _current_entry(graph_id)
+        signature, _, graph = entry
+        if not graph:
+            return None
+        data = _vis_data(entry)
+        node_index, edge_index = graph['node_index'], graph['edge_index']
+        check_ops(ops, node_index, edge_index)
+
+        structural = any(op['op'] != 'update' for op in ops)
+        coordinates = False
+        changed = {}
+        for op in ops:
+            if 'node' in op:
+                coordinates = coordinates or 'x' in op['node'] or 'y' in op['node']
+                continue
+            item = op['edge']
+            arc_idx = edge_index.get(item['id'])
+            edge = data['edges'][arc_idx] if arc_idx is not None else {}
+            if any(end in item and item[end] != edge.get(end) for end in ('source', 'target')):
+                structural = True
+            elif 'label' in item and not structural:
+                old_arc = changed[arc_idx][0] if arc_idx in changed else graph['arc'][arc_idx]
+                changed[arc_idx] = (old_arc, old_arc[:2] + (parse_weight(item['label']),))
+
+        with _load_lock(graph_id):
+            return _publish_patch(graph_id, entry, data, ops, structural, coordinates, changed)
+
+
+def _publish_patch(graph_id, entry, data, ops, structural, coordinates, changed):
+    """Journalise un lot vérifié et publie la nouvelle entrée (sous les verrous de patch_graph)"""
+    signature, _, graph = entry
+    node_index, edge_index = graph['node_index'], graph['edge_index']
+    log_bytes = append_log(_log_path(graph_id), signature[:3], ops)
+    signature = signature[:3] + (log_bytes,)
+    old_version = graph['version']
+    version = (graph_id,) + signature
+
+    if structural:
+        # Copie des listes : les lecteurs de l'ancienne entrée ne voient pas le lot
+        data = dict(data, nodes=list(data.get('nodes', [])), edges=list(data.get('edges', [])))
+        apply_ops(data, ops, dict(node_index), dict(edge_index))
+        compact_data(data)
+        with phase('convert'):
+            graph = convert_to_dantzig_format(data)
+        graph['graph_id'] = graph_id
+        graph['version'] = version
+        changed = {}
+        with _cache_lock:
+            _store_entry(graph_id, (signature, data, graph))
+    else:
+        # Copie à l'écriture : l'entrée publiée n'est jamais modifiée, les calculs
+        # en cours sur l'ancienne version la voient entière jusqu'au bout
+        data = dict(data, nodes=list(data.get('nodes', [])), edges=list(data.get('edges', [])))
+        # Des modifications seules ne touchent pas aux index {id: position}
+        apply_ops(data, ops, node_index, edge_index)
+        index = copy_costs(graph['index'])
+        for arc_idx, (_, new_arc) in changed.items():
+            set_arc_cost(index, arc_idx, new_arc[2])
+        adjacence = graph.get('adjacence')
+        graph = graph.derive(index, data)
+        if adjacence is not None:
+            adjacence = dict(adjacence)
+            for arc_idx, (old_arc, new_arc) in changed.items():
+                successors = adjacence[old_arc[0]] = list(adjacence[old_arc[0]])
+                for i, (tgt, _, idx) in enumerate(successors):
+                    if idx == arc_idx:
+                        successors[i] = (tgt, new_arc[2], idx)
+            graph['adjacence'] = adjacence
+        if coordinates:
+            graph.pop('coordinates', None)
+        graph['version'] = version
+        with _cache_lock:
+            _store_entry(graph_id, (signature, data, graph))
+
+    if log_bytes >= max(LOG_COMPACT_MIN_BYTES, LOG_COMPACT_RATIO * signature[2]):
+        with _cache_lock:
+            start = graph_id not in _compacting
+            _compacting.add(graph_id)
+        if start:
+            threading.Thread(target=compact_graph, args=(graph_id,), daemon=True).start()
+
+    return {
+        'old_version': old_version,
+        'version': version,
+        'structural': structural,
+        'arcs': list(changed.values()),
+        'applied': len(ops),
+        'log_bytes': log_bytes,
+    }
+
+
+def compact_graph(graph_id=None):
+    """
+    Réécrit le fichier principal d'un graphe avec les lots de son journal, puis efface le journal
+
+    Le graphe en mémoire est gardé tel quel, sous la même version : seul son
+    fichier change.
+
+    Returns:
+        int: Génération du fichier écrit, ou None s'il n'y avait rien à compacter
+    """
+    graph_id = _graph_id(graph_id)
     try:
-        nodes = [n['id'] for n in vis_data.get('nodes', [])]
-        arcs = []
-        for e in vis_data.get('edges', []):
-            src = e['source']
-            tgt = e['target']
-            try:
-                weight = int(e.get('label', '1'))
-            except:
-                weight = 1
-            arcs.append((src, tgt, weight))
-        return {'sommet': nodes, 'arc': arcs}
+        with _patch_lock(graph_id):
+            if not os.path.exists(_log_path(graph_id)):
+                return None
+            entry = _current_entry(graph_id)
+            if not entry[2]:
+                return None
+            with _load_lock(graph_id), phase('compact'):
+                generation = _write_storage(graph_id, _vis_data(entry))
+                _remove_file(_log_path(graph_id))
+                signature = _file_signature(graph_id)
+                with _cache_lock:
+                    if signature is not None and _entries.get(graph_id) is entry:
+                        _store_entry(graph_id, (signature,) + entry[1:])
+            return generation
     except Exception as e:
-        print(f"Erreur conversion: {e}")
+        print(f"Erreur compactage: {e}")
         return None
+    finally:
+        with _cache_lock:
+            _compacting.discard(graph_id)
+
+
+def get_graph_stats(graph_id):
+    """Compteurs, temps de chargement et de calcul et présence en mémoire d'un graphe"""
+    graph_id = _graph_id(graph_id)
+    with _cache_lock:
+        stats = dict(_stats(graph_id))
+        stats['resident'] = graph_id in _entries
+        stats['bytes'] = _entry_sizes.get(graph_id, 0)
+        stats['log_bytes'] = _log_size(graph_id)
+        entry = _entries.get(graph_id)
+        if entry is not None and entry[2]:
+            stats['weights'] = entry[2].get('weights')
+    return stats
+
+
+def get_cache_stats():
+    with _cache_lock:
+        graphs = {graph_id: dict(stats, resident=graph_id in _entries, bytes=_entry_sizes.get(graph_id, 0))
+                  for graph_id, stats in _graph_stats.items()}
+        return {
+            'hits': sum(stats['hits'] for stats in graphs.values()),
+            'misses': sum(stats['misses'] for stats in graphs.values()),
+            'cached': DEFAULT_GRAPH in _entries,
+            'resident_graphs': len(_entries),
+            'resident_bytes': sum(_entry_sizes.values()),
+            'memory_budget': MEMORY_BUDGET,
+            'graphs': graphs,
+        }
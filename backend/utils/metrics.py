@@ -0,0 +1,175 @@
+"""
+Compteurs et chronomètres par phase, exposés au format texte de Prometheus
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Bornes (s) des histogrammes de durée
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return str(int(value))
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """
+    Métriques du processus : compteurs, histogrammes et jauges calculées à la lecture
+
+    Les noms suivent la convention Prometheus (suffixe _total pour les
+    compteurs, _seconds pour les durées) ; les labels sont passés en mots-clés.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+
+    def inc(self, name, value=1, help='', **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._help.setdefault(name, ('counter', help))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, help='', **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._help.setdefault(name, ('histogram', help))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def gauge(self, name, read, help=''):
+        """Jauge lue à chaque rendu : read() renvoie une valeur, ou un dict {((label, valeur), ...): valeur}"""
+        with self._lock:
+            self._help[name] = ('gauge', help)
+            self._gauges[name] = read
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0)
+
+    def render(self):
+        """Texte d'exposition Prometheus (version 0.0.4)"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+            gauges = dict(self._gauges)
+            helps = dict(self._help)
+
+        lines = []
+
+        def header(name):
+            kind, text = helps[name]
+            if text:
+                lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for name in sorted({name for name, _ in counters}):
+            header(name)
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for name in sorted({name for name, _ in histograms}):
+            header(name)
+            for (key_name, labels), (buckets, total, count) in sorted(histograms.items()):
+                if key_name != name:
+                    continue
+                for bound, n in zip(BUCKETS, buckets):
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {n}')
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        for name in sorted(gauges):
+            try:
+                value = gauges[name]()
+            except Exception:
+                continue
+            header(name)
+            if isinstance(value, dict):
+                for labels, v in value.items():
+                    lines.append(f'{name}{_format_labels(_labels(dict(labels)))} {_format_value(v)}')
+            else:
+                lines.append(f'{name} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+_local = threading.local()
+
+
+def count(name, value=1, **labels):
+    """Incrémente le compteur dantzig_<name>_total"""
+    registry.inc(f'dantzig_{name}_total', value, **labels)
+
+
+@contextmanager
+def phase(name):
+    """
+    Chronomètre une phase : histogramme dantzig_phase_seconds{phase=name}
+
+    Si la requête en cours a demandé Server-Timing (start_timing), la durée
+    est aussi ajoutée à sa liste.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        registry.observe('dantzig_phase_seconds', elapsed, 'Durée des phases de traitement', phase=name)
+        timings = getattr(_local, 'timings', None)
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def start_timing():
+    """Commence à relever les phases du thread courant (pour l'en-tête Server-Timing)"""
+    _local.timings = []
+
+
+def stop_timing():
+    """Arrête le relevé du thread courant et renvoie les (phase, secondes) relevées"""
+    timings = getattr(_local, 'timings', None)
+    _local.timings = None
+    return timings or []
+
+
+def server_timing(timings):
+    """Valeur d'en-tête Server-Timing : durée totale (ms) de chaque phase, dans l'ordre d'apparition"""
+    totals = {}
+    for name, elapsed in timings:
+        totals[name] = totals.get(name, 0.0) + elapsed
+    return ', '.join(f'{name};dur={elapsed * 1000:.3f}' for name, elapsed in totals.items())
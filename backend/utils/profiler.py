@@ -0,0 +1,101 @@
+"""
+Profileur par échantillonnage : piles des threads relevées à intervalle régulier, au format « folded »
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Intervalle d'échantillonnage par défaut (s)
+DEFAULT_INTERVAL = float(os.environ.get('DANTZIG_PROFILE_INTERVAL', 0.005))
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Relève les piles d'appels de tous les threads depuis un thread d'arrière-plan
+
+    Chaque pile est comptée sous la forme « thread;appelant;...;appelé n », le
+    format « folded » lu tel quel par flamegraph.pl ou speedscope. Le coût est
+    celui d'un parcours des piles par échantillon, sans instrumenter le code.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stacks = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+        self.interval = DEFAULT_INTERVAL
+        self.samples = 0
+        self.started_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, interval=None):
+        """Démarre l'échantillonnage (les piles déjà relevées sont effacées)"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.interval = interval or DEFAULT_INTERVAL
+            self._stacks.clear()
+            self.samples = 0
+            self.started_at = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='dantzig-profiler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return False
+        self._stop.set()
+        thread.join()
+        return True
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            sample = Counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f'thread-{ident}'))
+                sample[';'.join(reversed(stack))] += 1
+            with self._lock:
+                self._stacks.update(sample)
+                self.samples += 1
+
+    def folded(self):
+        """Piles relevées, une par ligne : « pile nombre », des plus fréquentes aux plus rares"""
+        with self._lock:
+            return ''.join(f'{stack} {n}\n' for stack, n in self._stacks.most_common())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'running': self._thread is not None,
+                'interval': self.interval,
+                'samples': self.samples,
+                'stacks': len(self._stacks),
+                'started_at': self.started_at,
+            }
+
+
+profiler = SamplingProfiler()
+
+if os.environ.get('DANTZIG_PROFILE') == '1':
+    profiler.start()
@@ -0,0 +1,113 @@
+"""
+Cache LRU des résultats de Dantzig par source : (version du graphe, mode, départ, moteur) -> résultat
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+
+def approx_result_size(result):
+    """Taille approximative en octets d'un triplet (lambda_values, predecessors, Ek_steps) ou d'un arbre en dict de tableaux"""
+    if isinstance(result, dict):
+        return sys.getsizeof(result) + sum(sys.getsizeof(values) for values in result.values())
+    lambda_values, predecessors, Ek_steps = result
+    size = sys.getsizeof(lambda_values) + sys.getsizeof(predecessors) + sys.getsizeof(Ek_steps)
+    order = getattr(Ek_steps, 'order', None)
+    if order is not None:
+        # Ek_steps compact : seul l'ordre de marquage est stocké
+        return size + sys.getsizeof(order)
+    for step in Ek_steps.values():
+        size += sys.getsizeof(step)
+    return size
+
+
+class ResultCache:
+    """
+    Cache LRU borné en nombre d'entrées et en octets approximatifs
+
+    Args:
+        max_entries: Nombre maximal de résultats gardés
+        max_bytes: Taille totale approximative maximale
+        sizeof: Fonction d'estimation de la taille d'un résultat
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, sizeof=approx_result_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Renvoie le résultat en cache, sinon le calcule avec compute() et le mémorise"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def items(self):
+        """Copie des couples (clé, résultat), du moins au plus récemment utilisé"""
+        with self._lock:
+            return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('DANTZIG_CACHE_MAX_ENTRIES', 128)),
+    max_bytes=int(os.environ.get('DANTZIG_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+)
@@ -0,0 +1,83 @@
+"""
+Aides communes aux routes des deux applications Flask (app.py et main.py)
+"""
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    from .graph_manager import timed_compute
+    from .metrics import phase
+    from .result_cache import result_cache
+    from .single_flight import single_flight
+except ImportError:
+    from graph_manager import timed_compute
+    from metrics import phase
+    from result_cache import result_cache
+    from single_flight import single_flight
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    Sérialisation JSON de Flask chronométrée (phase 'serialize')
+
+    Installée par app.json = TimedJSONProvider(app) : jsonify et app.json.dumps
+    passent tous par dumps, chaque route mesure donc sa sérialisation.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with phase('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def requested_bounds():
+    """
+    Bornes ?max_cost= et ?max_hops= d'une recherche limitée au voisinage du départ
+
+    Returns:
+        tuple: (max_cost, max_hops), None pour une borne absente
+
+    Raises:
+        ValueError: si une borne est négative
+    """
+    max_cost = request.args.get('max_cost', None, type=float)
+    max_hops = request.args.get('max_hops', None, type=int)
+    if max_cost is not None and not max_cost >= 0:
+        raise ValueError("max_cost doit être positif ou nul")
+    if max_hops is not None and max_hops < 0:
+        raise ValueError("max_hops doit être positif ou nul")
+    return max_cost, max_hops
+
+
+def cached_dantzig(algorithms):
+    """
+    Construit run_dantzig_cached pour les algorithmes d'une application
+
+    Args:
+        algorithms: {mode: fonction(graph, start, engine=..., direction=...)},
+                    par exemple {'min': init_dantzig_min, 'max': init_dantzig_max}
+
+    Returns:
+        function: run_dantzig_cached(graph, mode, start, engine='heap', direction='forward')
+    """
+    def run_dantzig_cached(graph, mode, start, engine='heap', direction='forward'):
+        """
+        Exécute Dantzig depuis start en réutilisant le résultat déjà calculé pour cette version du graphe
+
+        direction='reverse' donne l'arbre des plus courts chemins vers start,
+        mis en cache sous le mode '<mode>-reverse'.
+        """
+        algorithm = algorithms[mode]
+        options = {'engine': engine}
+        if direction != 'forward':
+            options['direction'] = direction
+        if engine == 'reference':
+            # La référence sert à recouper : toujours recalculée
+            return algorithm(graph, start, **options)
+        key = (graph['version'], mode if direction == 'forward' else f'{mode}-{direction}', start, engine)
+        # Les requêtes simultanées sur la même clé attendent le calcul déjà lancé plutôt que de le refaire
+        return single_flight.do(key, lambda: result_cache.get_or_compute(
+            key, lambda: timed_compute(graph, lambda: algorithm(graph, start, **options))
+        ))
+
+    return run_dantzig_cached
@@ -0,0 +1,66 @@
+"""
+Regroupement des calculs identiques simultanés : une seule exécution, un résultat partagé
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Exécute compute() une seule fois par clé tant qu'un calcul est en cours
+
+    Les appels arrivant pendant ce calcul attendent sa fin et reçoivent le même
+    résultat (ou la même exception). Rien n'est gardé une fois le calcul
+    terminé : la mise en cache reste l'affaire de ResultCache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.computations = 0
+        self.shared = 0
+
+    def do(self, key, compute):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.computations += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'computations': self.computations,
+                'shared': self.shared,
+                'in_flight': len(self._calls),
+            }
+
+
+single_flight = SingleFlight()
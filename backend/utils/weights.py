@@ -0,0 +1,171 @@
+"""
+Lecture typée des poids des arêtes (libellés vis) : entiers, flottants, ou flottants
+arrondis à un nombre fixe de décimales à la lecture
+"""
+
+import math
+import os
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from ..algorithms.engine import cost_array
+except ImportError:
+    from engine import cost_array
+
+# Poids d'une arête sans libellé, ou dont le libellé est illisible
+DEFAULT_WEIGHT = 1
+
+# Décimales gardées pour les poids non entiers (arrondi décimal au plus proche pair) ;
+# non défini : le libellé est lu tel quel en flottant. L'arrondi n'a lieu qu'à la
+# lecture : le poids est ensuite stocké en float64 ('d') et les sommes des algorithmes
+# restent des sommes flottantes (0.1 + 0.2 != 0.3), pas de l'arithmétique à virgule fixe
+WEIGHT_DECIMALS = int(os.environ['DANTZIG_WEIGHT_DECIMALS']) if os.environ.get('DANTZIG_WEIGHT_DECIMALS') else None
+
+# Refuser la sauvegarde d'un graphe dont des poids sont illisibles
+STRICT_WEIGHTS = os.environ.get('DANTZIG_STRICT_WEIGHTS') == '1'
+
+# À partir de ce nombre de libellés, la lecture passe par NumPy
+NUMPY_MIN_LABELS = 10000
+
+# Libellés illisibles cités dans le rapport
+MAX_EXAMPLES = 10
+
+
+class WeightError(ValueError):
+    """Libellé de poids illisible (ni entier, ni nombre décimal fini)"""
+
+
+def _missing(label):
+    return label is None or label == ''
+
+
+def parse_weight(label, decimals=WEIGHT_DECIMALS):
+    """
+    Poids d'une arête à partir de son libellé
+
+    Args:
+        label: Libellé vis (texte ou nombre JSON) ; absent ou vide : DEFAULT_WEIGHT
+        decimals: Décimales gardées pour un poids non entier (None : flottant tel quel) ;
+                  le libellé est arrondi en décimal puis converti en float
+
+    Returns:
+        int | float: int pour un entier, float sinon (y compris avec decimals)
+
+    Raises:
+        WeightError: si le libellé n'est pas un nombre fini
+    """
+    if _missing(label):
+        return DEFAULT_WEIGHT
+    if isinstance(label, bool):
+        raise WeightError(f"Poids illisible: {label!r}")
+    if isinstance(label, int):
+        return label
+    text = repr(label) if isinstance(label, float) else str(label).strip()
+    if not isinstance(label, float):
+        try:
+            return int(text)
+        except ValueError:
+            pass
+    try:
+        if decimals is not None:
+            value = Decimal(text).quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_EVEN)
+        else:
+            value = float(text)
+    except (ValueError, InvalidOperation):
+        raise WeightError(f"Poids illisible: {label!r}") from None
+    value = float(value)
+    if not math.isfinite(value):
+        raise WeightError(f"Poids non fini: {label!r}")
+    return value
+
+
+def _report(costs, edge_count, fractional, defaulted, invalid, examples):
+    return {
+        'edges': edge_count,
+        'fractional': fractional,
+        'defaulted': defaulted,
+        'invalid': invalid,
+        'examples': examples,
+        'storage': 'int64' if costs.typecode == 'q' else 'float64',
+    }
+
+
+def _parse_numpy(labels):
+    """Lecture vectorisée d'une liste de textes ; None si un libellé demande la lecture détaillée"""
+    if not all(type(label) is str for label in labels):
+        return None
+    text = np.array(labels)
+    missing = text == ''
+    text[missing] = str(DEFAULT_WEIGHT)
+    fractional = 0
+    try:
+        values = text.astype(np.int64)
+    except (ValueError, OverflowError):
+        try:
+            values = text.astype(np.float64)
+        except ValueError:
+            return None
+        if not np.isfinite(values).all():
+            return None
+        fractional = int((values != np.floor(values)).sum())
+    return cost_array(values), fractional, int(missing.sum())
+
+
+def parse_weights(labels, decimals=WEIGHT_DECIMALS):
+    """
+    Poids de toutes les arêtes, avec un rapport de validation
+
+    Les libellés illisibles reçoivent DEFAULT_WEIGHT et sont signalés dans le
+    rapport. Les grandes listes de textes sont lues d'un bloc par NumPy ; la
+    lecture libellé par libellé ne sert qu'en présence de valeurs à signaler,
+    de nombres JSON ou de décimales fixées.
+
+    Args:
+        labels: Libellé de chaque arête
+        decimals: Voir parse_weight
+
+    Returns:
+        tuple: (coûts en array 'q' (int64) ou 'd' (float64), rapport {'edges',
+               'fractional', 'defaulted', 'invalid', 'examples', 'storage'})
+    """
+    labels = list(labels)
+    if np is not None and decimals is None and len(labels) >= NUMPY_MIN_LABELS:
+        parsed = _parse_numpy(labels)
+        if parsed is not None:
+            costs, fractional, defaulted = parsed
+            return costs, _report(costs, len(labels), fractional, defaulted, 0, [])
+
+    weights = []
+    defaulted = invalid = 0
+    examples = []
+    for i, label in enumerate(labels):
+        if _missing(label):
+            defaulted += 1
+        try:
+            weights.append(parse_weight(label, decimals))
+        except WeightError:
+            invalid += 1
+            if len(examples) < MAX_EXAMPLES:
+                examples.append({'index': i, 'label': label})
+            weights.append(DEFAULT_WEIGHT)
+    costs = cost_array(weights)
+    fractional = sum(1 for weight in weights if isinstance(weight, float) and not weight.is_integer())
+    return costs, _report(costs, len(labels), fractional, defaulted, invalid, examples)
+
+
+def parse_edge_weights(edges, decimals=WEIGHT_DECIMALS):
+    """Poids des arêtes vis (parse_weights), les libellés illisibles étant cités avec l'identifiant de leur arête"""
+    costs, report = parse_weights([e.get('label') for e in edges], decimals)
+    for example in report['examples']:
+        example['edge'] = edges[example.pop('index')].get('id')
+    return costs, report
+
+
+def validate_weights(vis_data):
+    """Rapport de validation des poids de données vis"""
+    return parse_edge_weights((vis_data or {}).get('edges', []))[1]
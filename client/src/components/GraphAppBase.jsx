@@ -89,7 +89,8 @@ export default function GraphAppBase({ mode }) {
             resetStepState();
         } catch (err) {
             console.error(err);
-            setError("Erreur dans l'algorithme ou le backend.");
+            // Message du backend s'il y en a un (ex. circuit détecté en mode max)
+            setError(err.response?.data?.error || "Erreur dans l'algorithme ou le backend.");
         }
     };
 